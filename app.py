@@ -13,6 +13,8 @@ from config.mail import mail                     # ← mail config
 from errors.handlers import register_error_handlers  # ← moved into errors/
 from routes import register_blueprints
 from routes.web import register_web_blueprints   # ← modular web sub-blueprints
+from utils.json_provider import FastJSONProvider
+from middleware.compression import DEFAULT_MIMETYPES, CompressionMiddleware
 
 
 def create_app(config_name: str | None = None) -> Flask:
@@ -21,6 +23,7 @@ def create_app(config_name: str | None = None) -> Flask:
     settings = get_settings(env)
 
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config["SECRET_KEY"] = settings.SECRET_KEY
     app.config["SESSION_COOKIE_HTTPONLY"] = True
     app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
@@ -37,6 +40,19 @@ def create_app(config_name: str | None = None) -> Flask:
     app.config["MAIL_USERNAME"] = settings.MAIL_USERNAME
     app.config["MAIL_PASSWORD"] = settings.MAIL_PASSWORD
     app.config["MAIL_DEFAULT_SENDER"] = settings.MAIL_DEFAULT_SENDER
+
+    # Result cache settings
+    app.config["CACHE_MAXSIZE"] = settings.CACHE_MAXSIZE
+    app.config["CACHE_TTL"] = settings.CACHE_TTL
+    app.config["COUNT_CACHE_TTL"] = settings.COUNT_CACHE_TTL
+    app.config["COUNT_ESTIMATE_MIN"] = settings.COUNT_ESTIMATE_MIN
+    app.config["SUGGEST_INDEX_TTL"] = settings.SUGGEST_INDEX_TTL
+    app.config["INDEX_REBUILD_IN_BACKGROUND"] = settings.INDEX_REBUILD_IN_BACKGROUND
+
+    # Upload storage and serving
+    app.config["UPLOAD_FOLDER"] = os.path.abspath(settings.UPLOAD_FOLDER)
+    app.config["UPLOADS_MAX_AGE"] = settings.UPLOADS_MAX_AGE
+    app.config["USE_X_SENDFILE"] = settings.UPLOADS_X_SENDFILE
     
     if settings.cors_origins_list:
         app.config["CORS_ORIGINS"] = settings.cors_origins_list
@@ -80,11 +96,22 @@ def create_app(config_name: str | None = None) -> Flask:
     register_web_blueprints(app)   # Web UI blueprints (modular)
     register_error_handlers(app)
 
+    if settings.COMPRESSION_ENABLED:
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=settings.COMPRESSION_MIN_SIZE,
+            level=settings.COMPRESSION_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+            mimetypes=settings.COMPRESSION_MIMETYPES.split(",") if settings.COMPRESSION_MIMETYPES else DEFAULT_MIMETYPES,
+        )
+
     with app.app_context():
         from models import (  # noqa: F401 – register models for flask-migrate
             User, Category, Product, ProductImage,
             CartItem, Order, OrderItem, Review, WishlistItem,
         )
+        from services import suggest_index
+        suggest_index.warm()
 
 
     return app
@@ -44,6 +44,32 @@ class BaseConfig(BaseSettings):
     MAIL_PASSWORD: str = ""
     MAIL_DEFAULT_SENDER: str = "noreply@resend.dev"
 
+    # In-process result caches (product listings, facets): entries per cache, seconds
+    CACHE_MAXSIZE: int = 512
+    CACHE_TTL: int = 60
+    # include_total=estimate: seconds a cached count is reused; Postgres planner
+    # estimates above COUNT_ESTIMATE_MIN rows are used instead of an exact COUNT
+    COUNT_CACHE_TTL: int = 30
+    COUNT_ESTIMATE_MIN: int = 10000
+    # Autocomplete prefix index: seconds before a per-process rebuild
+    SUGGEST_INDEX_TTL: int = 300
+    # Rebuild derived indexes (autocomplete, similar products) in a background
+    # thread; requests keep using the previous data meanwhile. Off = inline.
+    INDEX_REBUILD_IN_BACKGROUND: bool = True
+    # Uploaded images: directory, max-age (s) for content-hash names, and whether
+    # to hand file bodies to the front proxy with X-Sendfile
+    UPLOAD_FOLDER: str = "uploads"
+    UPLOADS_MAX_AGE: int = 31536000
+    UPLOADS_X_SENDFILE: bool = False
+    # Response compression (gzip; brotli too when the brotli package is installed).
+    # Bodies under COMPRESSION_MIN_SIZE bytes and other content types are sent as-is.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Comma-separated; empty = middleware.compression.DEFAULT_MIMETYPES
+    COMPRESSION_MIMETYPES: str = ""
+
     @property
     def cors_origins_list(self) -> List[str]:
         """CORS_ORIGINS as a list (from comma-separated string in .env)."""
@@ -68,6 +94,7 @@ class TestingConfig(BaseConfig):
     DATABASE_URL: str = "sqlite:///:memory:"
     SECRET_KEY: str = "test-secret"
     JWT_SECRET_KEY: str = "test-jwt-secret"
+    INDEX_REBUILD_IN_BACKGROUND: bool = False
 
 
 class ProductionConfig(BaseConfig):
@@ -1 +1 @@
-"""Middleware (e.g. admin_required in Phase 2)."""
+"""Middleware: auth decorators, rate limiting, response compression."""
@@ -0,0 +1,174 @@
+"""
+WSGI response compression (gzip, and brotli when the ``brotli`` package is installed).
+
+The encoding is negotiated from Accept-Encoding (q-values honoured, br preferred
+over gzip). Only compressible content types are touched; bodies with a known
+length below the size threshold, already-encoded bodies, partial content and
+``Cache-Control: no-transform`` pass through unchanged. Responses without a
+Content-Length (streamed exports, generators) are compressed chunk by chunk with
+a flush after each, so clients still receive data as it is produced.
+"""
+
+import zlib
+from typing import Callable, Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    "text/html", "text/css", "text/plain", "text/csv", "text/xml",
+    "application/json", "application/javascript", "application/x-ndjson",
+    "application/xml", "image/svg+xml",
+)
+_SKIP_STATUSES = ("204", "206", "304")
+
+
+def _accepted(header: str) -> dict[str, float]:
+    """Accept-Encoding as {coding: q}."""
+    codings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[name.strip().lower()] = q
+    return codings
+
+
+class _Gzip:
+    def __init__(self, level: int) -> None:
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._z.compress(data) + self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int) -> None:
+        self._c = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._c.process(data) + self._c.finish()
+
+
+class CompressionMiddleware:
+    """Wrap a WSGI app (``app.wsgi_app``) to compress responses."""
+
+    def __init__(
+        self,
+        app: Callable,
+        min_size: int = 1024,
+        level: int = 6,
+        brotli_quality: int = 4,
+        mimetypes: Iterable[str] = DEFAULT_MIMETYPES,
+    ) -> None:
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = frozenset(m.strip().lower() for m in mimetypes if m.strip())
+
+    def _negotiate(self, header: str) -> Optional[str]:
+        accepted = _accepted(header)
+        wildcard = accepted.get("*", 0)
+        options = ("br", "gzip") if brotli is not None else ("gzip",)
+        best = max(options, key=lambda c: (accepted.get(c, wildcard), c == "br"))
+        return best if accepted.get(best, wildcard) > 0 else None
+
+    def _compressor(self, encoding: str):
+        return _Brotli(self.brotli_quality) if encoding == "br" else _Gzip(self.level)
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        captured: dict = {}
+
+        def _capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return _unsupported_write
+
+        body = self.app(environ, _capture)
+        status, headers = captured["status"], captured["headers"]
+        names = {k.lower(): v for k, v in headers}
+        mimetype = names.get("content-type", "").split(";")[0].strip().lower()
+        if mimetype not in self.mimetypes:
+            start_response(status, headers, captured["exc_info"])
+            return body
+        headers = _add_vary(headers)
+
+        encoding = self._negotiate(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        length = names.get("content-length")
+        if (
+            encoding is None
+            or environ.get("REQUEST_METHOD") == "HEAD"
+            or status[:3] in _SKIP_STATUSES
+            or "content-encoding" in names
+            or "no-transform" in names.get("cache-control", "").lower()
+            or (length is not None and int(length) < self.min_size)
+        ):
+            start_response(status, headers, captured["exc_info"])
+            return body
+
+        headers = [(k, v) for k, v in headers if k.lower() != "content-length"]
+        headers = _weaken_etag(headers)
+        headers.append(("Content-Encoding", encoding))
+        compressor = self._compressor(encoding)
+        if length is not None:
+            # buffered response: compress in one go and keep a Content-Length
+            try:
+                data = compressor.finish(b"".join(body))
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+            headers.append(("Content-Length", str(len(data))))
+            start_response(status, headers, captured["exc_info"])
+            return [data]
+        start_response(status, headers, captured["exc_info"])
+        return _stream(body, compressor)
+
+
+def _stream(body: Iterable[bytes], compressor) -> Iterator[bytes]:
+    try:
+        for chunk in body:
+            if chunk:
+                out = compressor.chunk(chunk)
+                if out:
+                    yield out
+        yield compressor.finish()
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+
+
+def _add_vary(headers: list) -> list:
+    for i, (k, v) in enumerate(headers):
+        if k.lower() == "vary":
+            if "accept-encoding" not in v.lower():
+                headers = list(headers)
+                headers[i] = (k, f"{v}, Accept-Encoding")
+            return headers
+    return [*headers, ("Vary", "Accept-Encoding")]
+
+
+def _weaken_etag(headers: list) -> list:
+    """Encoded bytes differ from the identity body, so a strong ETag becomes weak."""
+    return [
+        (k, f"W/{v}" if k.lower() == "etag" and not v.startswith("W/") else v)
+        for k, v in headers
+    ]
+
+
+def _unsupported_write(data: bytes) -> None:
+    raise RuntimeError("CompressionMiddleware does not support the WSGI write() callable")
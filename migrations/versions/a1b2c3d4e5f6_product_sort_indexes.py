@@ -0,0 +1,50 @@
+"""product sold_count and catalog sort indexes
+
+Revision ID: a1b2c3d4e5f6
+Revises: f9a0b1c2d3e4
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1b2c3d4e5f6'
+down_revision = 'f9a0b1c2d3e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sold_count', sa.Integer(), server_default='0', nullable=False))
+        # superseded by ix_products_active_created_at_id (queries always filter is_active)
+        batch_op.drop_index('ix_products_created_at_id')
+        batch_op.create_index('ix_products_active_created_at_id', ['is_active', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_active_price_id', ['is_active', 'price', 'id'], unique=False)
+        batch_op.create_index('ix_products_active_rating_id', ['is_active', 'rating_avg', 'id'], unique=False,
+                              postgresql_ops={'rating_avg': 'DESC NULLS LAST', 'id': 'DESC'})
+        batch_op.create_index('ix_products_active_sold_count_id', ['is_active', 'sold_count', 'id'], unique=False)
+        batch_op.create_index('ix_products_category_active_created_at', ['category_id', 'is_active', 'created_at'], unique=False)
+        batch_op.create_index('ix_products_category_active_price', ['category_id', 'is_active', 'price'], unique=False)
+
+    # Backfill units sold from non-cancelled orders
+    op.execute(
+        "UPDATE products SET sold_count = ("
+        " SELECT coalesce(sum(oi.quantity), 0) FROM order_items oi"
+        " JOIN orders o ON o.id = oi.order_id"
+        " WHERE oi.product_id = products.id AND o.status != 'cancelled')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_category_active_price')
+        batch_op.drop_index('ix_products_category_active_created_at')
+        batch_op.drop_index('ix_products_active_sold_count_id')
+        batch_op.drop_index('ix_products_active_rating_id')
+        batch_op.drop_index('ix_products_active_price_id')
+        batch_op.drop_index('ix_products_active_created_at_id')
+        batch_op.create_index('ix_products_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.drop_column('sold_count')
@@ -0,0 +1,42 @@
+"""product full-text search index
+
+Revision ID: b7c1d2e3f4a5
+Revises: 4e21b8a9e5f7
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c1d2e3f4a5'
+down_revision = '4e21b8a9e5f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin "
+            "(to_tsvector('english'::regconfig, (coalesce(name, '') || ' ') || coalesce(description, '')))"
+        )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts "
+            "USING fts5(name, description, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO products_fts (rowid, name, description) "
+            "SELECT id, name, coalesce(description, '') FROM products"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,37 @@
+"""product content-similarity table
+
+Revision ID: c4d5e6f7a8b9
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d5e6f7a8b9'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_similarities',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('similar_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'rank')
+    )
+    with op.batch_alter_table('product_similarities', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_similarities_similar_id'), ['similar_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('product_similarities', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_similarities_similar_id'))
+
+    op.drop_table('product_similarities')
@@ -0,0 +1,51 @@
+"""product rating aggregates
+
+Revision ID: d5e6f7a8b9c0
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e6f7a8b9c0'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+_BUCKETS = ['rating_count_1', 'rating_count_2', 'rating_count_3', 'rating_count_4', 'rating_count_5']
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_avg', sa.Float(), nullable=True))
+        for name in _BUCKETS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_products_rating_avg'), ['rating_avg'], unique=False)
+
+    # Backfill from existing reviews
+    buckets = ", ".join(
+        f"{name} = (SELECT count(*) FROM reviews r WHERE r.product_id = products.id AND r.rating = {star})"
+        for star, name in enumerate(_BUCKETS, start=1)
+    )
+    op.execute(
+        "UPDATE products SET "
+        "rating_sum = (SELECT coalesce(sum(r.rating), 0) FROM reviews r WHERE r.product_id = products.id), "
+        "rating_count = (SELECT count(*) FROM reviews r WHERE r.product_id = products.id), "
+        "rating_avg = (SELECT avg(r.rating * 1.0) FROM reviews r WHERE r.product_id = products.id), "
+        + buckets
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_rating_avg'))
+        for name in reversed(_BUCKETS):
+            batch_op.drop_column(name)
+        batch_op.drop_column('rating_avg')
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
@@ -0,0 +1,40 @@
+"""content-addressed stored images
+
+Revision ID: d6e7f8a9b0c1
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6e7f8a9b0c1'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_images',
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('ext', sa.String(length=10), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('digest')
+    )
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('digest', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_product_images_digest'), ['digest'], unique=False)
+        batch_op.create_foreign_key('fk_product_images_digest', 'stored_images', ['digest'], ['digest'])
+
+
+def downgrade():
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_product_images_digest', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_product_images_digest'))
+        batch_op.drop_column('digest')
+
+    op.drop_table('stored_images')
@@ -0,0 +1,48 @@
+"""category closure table
+
+Revision ID: e7f8a9b0c1d2
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f8a9b0c1d2'
+down_revision = 'd5e6f7a8b9c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    with op.batch_alter_table('category_closure', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_category_closure_descendant_id'), ['descendant_id'], unique=False)
+
+    # Backfill from the parent_id adjacency list
+    op.execute(
+        "WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS ("
+        " SELECT id, id, 0 FROM categories"
+        " UNION ALL"
+        " SELECT c.parent_id, t.descendant_id, t.depth + 1"
+        " FROM tree t JOIN categories c ON c.id = t.ancestor_id"
+        " WHERE c.parent_id IS NOT NULL"
+        ") INSERT INTO category_closure (ancestor_id, descendant_id, depth)"
+        " SELECT ancestor_id, descendant_id, depth FROM tree"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('category_closure', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_category_closure_descendant_id'))
+
+    op.drop_table('category_closure')
@@ -0,0 +1,32 @@
+"""per-product name trigram count for fuzzy similarity
+
+Revision ID: e8f9a0b1c2d3
+Revises: d6e7f8a9b0c1
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8f9a0b1c2d3'
+down_revision = 'd6e7f8a9b0c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_trigram_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing posting list
+    op.execute(
+        "UPDATE products SET name_trigram_count = "
+        "(SELECT count(*) FROM product_trigrams t WHERE t.product_id = products.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('name_trigram_count')
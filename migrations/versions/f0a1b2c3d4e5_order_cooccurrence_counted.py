@@ -0,0 +1,45 @@
+"""per-order cooccurrence_counted flag replaces the recommendation watermark
+
+Revision ID: f0a1b2c3d4e5
+Revises: e8f9a0b1c2d3
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0a1b2c3d4e5'
+down_revision = 'e8f9a0b1c2d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cooccurrence_counted', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.create_index(batch_op.f('ix_orders_cooccurrence_counted'), ['cooccurrence_counted'], unique=False)
+
+    # Orders up to the old watermark are already in product_cooccurrence
+    op.execute(
+        "UPDATE orders SET cooccurrence_counted = true WHERE id <= "
+        "(SELECT coalesce(max(last_order_id), 0) FROM recommendation_state)"
+    )
+    op.drop_table('recommendation_state')
+
+
+def downgrade():
+    op.create_table('recommendation_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('last_order_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        "INSERT INTO recommendation_state (id, last_order_id) "
+        "SELECT 1, coalesce(max(id), 0) FROM orders WHERE cooccurrence_counted = true"
+    )
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_cooccurrence_counted'))
+        batch_op.drop_column('cooccurrence_counted')
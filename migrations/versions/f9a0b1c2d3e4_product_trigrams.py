@@ -0,0 +1,53 @@
+"""product name trigram table for fuzzy search
+
+Revision ID: f9a0b1c2d3e4
+Revises: e7f8a9b0c1d2
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f9a0b1c2d3e4'
+down_revision = 'e7f8a9b0c1d2'
+branch_labels = None
+depends_on = None
+
+
+def _trigrams(value):
+    grams = set()
+    for word in re.findall(r'\w+', value.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def upgrade():
+    trigrams = op.create_table('product_trigrams',
+    sa.Column('trigram', sa.String(length=3), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('trigram', 'product_id')
+    )
+    with op.batch_alter_table('product_trigrams', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_trigrams_product_id'), ['product_id'], unique=False)
+
+    # Backfill from existing product names
+    rows = [
+        {'trigram': g, 'product_id': pid}
+        for pid, name in op.get_bind().execute(sa.text('SELECT id, name FROM products'))
+        for g in _trigrams(name)
+    ]
+    if rows:
+        op.bulk_insert(trigrams, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('product_trigrams', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_trigrams_product_id'))
+
+    op.drop_table('product_trigrams')
@@ -2,22 +2,33 @@
 
 from database import db
 from .user import User
-from .category import Category
-from .product import Product, ProductImage
+from .category import Category, CategoryClosure
+from .product import Product, ProductImage, ProductTrigram, StoredImage
 from .cart import CartItem
 from .order import Order, OrderItem
 from .review import Review
 from .wishlist import WishlistItem
+from .recommendation import (
+    ProductCooccurrence,
+    ProductRecommendation,
+    ProductSimilarity,
+)
 
 __all__ = [
     "db",
     "User",
     "Category",
+    "CategoryClosure",
     "Product",
     "ProductImage",
+    "ProductTrigram",
+    "StoredImage",
     "CartItem",
     "Order",
     "OrderItem",
     "Review",
     "WishlistItem",
+    "ProductCooccurrence",
+    "ProductRecommendation",
+    "ProductSimilarity",
 ]
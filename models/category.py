@@ -20,3 +20,20 @@ class Category(db.Model):
 
     parent = db.relationship("Category", remote_side=[id], backref="children")
     products = db.relationship("Product", backref="category", lazy="select")
+
+
+class CategoryClosure(db.Model):
+    """Closure table: one row per (ancestor, descendant) pair, including self at depth 0.
+
+    Maintained by category_service; lets "everything under X" be one indexed join.
+    """
+
+    __tablename__ = "category_closure"
+
+    ancestor_id = db.Column(
+        db.Integer, db.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id = db.Column(
+        db.Integer, db.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    depth = db.Column(db.Integer, nullable=False)
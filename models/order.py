@@ -15,6 +15,10 @@ class Order(db.Model):
     status = db.Column(db.String(50), nullable=False, default="pending", index=True)
     total = db.Column(db.Numeric(10, 2), nullable=False)
     payment_intent_id = db.Column(db.String(255), nullable=True)
+    # Folded into product_cooccurrence by recommendation_service (claimed once, in commit order)
+    cooccurrence_counted = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false(), index=True
+    )
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -24,6 +28,12 @@ class Order(db.Model):
         "OrderItem", backref="order", lazy="select", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # keyset pagination: (created_at, id) seek, per user and global
+        db.Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        db.Index("ix_orders_created_at_id", "created_at", "id"),
+    )
+
 
 class OrderItem(db.Model):
     """Order line: product snapshot (quantity, price at time of order)."""
@@ -1,7 +1,9 @@
-"""Product and ProductImage models."""
+"""Product, ProductImage and StoredImage models."""
 
 from datetime import datetime
 
+from sqlalchemy import DDL, event, func, literal_column
+
 from database import db
 
 
@@ -20,6 +22,19 @@ class Product(db.Model):
         db.Integer, db.ForeignKey("categories.id"), nullable=False, index=True
     )
     is_active = db.Column(db.Boolean, default=True, nullable=False, index=True)
+    # Denormalized review aggregates, maintained by review_service
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_avg = db.Column(db.Float, nullable=True, index=True)  # NULL until first review
+    rating_count_1 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_2 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_3 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_4 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Units sold in non-cancelled orders (popularity sort), maintained by order flows
+    sold_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Distinct name trigrams (product_trigrams rows), for fuzzy similarity; maintained by search_index
+    name_trigram_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -37,6 +52,61 @@ class Product(db.Model):
         "ProductImage", backref="product", lazy="select", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Catalog sorts over active products (see product_service.SORT_OPTIONS); the
+        # newest index also serves keyset pagination's (created_at, id) seek
+        db.Index("ix_products_active_created_at_id", "is_active", "created_at", "id"),
+        db.Index("ix_products_active_price_id", "is_active", "price", "id"),
+        db.Index(
+            "ix_products_active_rating_id", "is_active", "rating_avg", "id",
+            postgresql_ops={"rating_avg": "DESC NULLS LAST", "id": "DESC"},
+        ),
+        db.Index("ix_products_active_sold_count_id", "is_active", "sold_count", "id"),
+        # Same sorts within a category (subcategory filter / closure join)
+        db.Index("ix_products_category_active_created_at", "category_id", "is_active", "created_at"),
+        db.Index("ix_products_category_active_price", "category_id", "is_active", "price"),
+    )
+
+    @property
+    def rating_histogram(self) -> dict[int, int]:
+        """Review count per star (1–5)."""
+        return {star: getattr(self, f"rating_count_{star}") or 0 for star in range(1, 6)}
+
+
+# Full-text search index over name + description (see services/search_index.py).
+# PostgreSQL: GIN expression index, maintained by the database itself.
+# SQLite: standalone FTS5 table keyed by product id, synced by product_service.
+# Literals (not bind params) so queries match the GIN index expression exactly.
+_EMPTY = literal_column("''")
+PRODUCT_SEARCH_VECTOR = func.to_tsvector(
+    literal_column("'english'::regconfig"),
+    func.coalesce(Product.name, _EMPTY).op("||")(literal_column("' '"))
+    .op("||")(func.coalesce(Product.description, _EMPTY)),
+)
+
+event.listen(
+    Product.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin "
+        "(to_tsvector('english'::regconfig, "
+        "(coalesce(name, '') || ' ') || coalesce(description, '')))"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Product.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts "
+        "USING fts5(name, description, tokenize='unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
+
 
 class ProductImage(db.Model):
     """Product image; url or path and sort order."""
@@ -49,3 +119,33 @@ class ProductImage(db.Model):
     )
     url = db.Column(db.String(500), nullable=False)
     sort_order = db.Column(db.Integer, nullable=False, default=0)
+    # Set for uploaded files (content-addressed storage); NULL for external URLs
+    digest = db.Column(
+        db.String(64), db.ForeignKey("stored_images.digest"), nullable=True, index=True
+    )
+
+
+class StoredImage(db.Model):
+    """Uploaded image stored once under its SHA-256; ref_count = ProductImage rows using it."""
+
+    __tablename__ = "stored_images"
+
+    digest = db.Column(db.String(64), primary_key=True)
+    ext = db.Column(db.String(10), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ProductTrigram(db.Model):
+    """Trigram posting list over product names (pg_trgm-style), for fuzzy search."""
+
+    __tablename__ = "product_trigrams"
+
+    trigram = db.Column(db.String(3), primary_key=True)
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
@@ -0,0 +1,47 @@
+"""Recommendation models: co-occurrence counts and top-K neighbour lists."""
+
+from database import db
+
+
+class ProductCooccurrence(db.Model):
+    """Sparse product x product matrix: orders containing both products (both directions stored)."""
+
+    __tablename__ = "product_cooccurrence"
+
+    product_id = db.Column(
+        db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    other_id = db.Column(
+        db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    orders = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ProductRecommendation(db.Model):
+    """Top-K co-purchased products per product, ranked 1..K; read by one PK range scan."""
+
+    __tablename__ = "product_recommendations"
+
+    product_id = db.Column(
+        db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank = db.Column(db.Integer, primary_key=True)
+    recommended_id = db.Column(
+        db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    score = db.Column(db.Integer, nullable=False)
+
+
+class ProductSimilarity(db.Model):
+    """Top-K content-similar products (TF-IDF cosine, same category) per product, ranked 1..K."""
+
+    __tablename__ = "product_similarities"
+
+    product_id = db.Column(
+        db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank = db.Column(db.Integer, primary_key=True)
+    similar_id = db.Column(
+        db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    score = db.Column(db.Float, nullable=False)
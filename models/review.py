@@ -24,4 +24,6 @@ class Review(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "product_id", name="uq_review_user_product"),
+        # keyset pagination: (created_at, id) seek per product
+        db.Index("ix_reviews_product_id_created_at_id", "product_id", "created_at", "id"),
     )
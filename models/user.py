@@ -33,6 +33,11 @@ class User(db.Model):
         "WishlistItem", backref="user", lazy="select", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # keyset pagination: (created_at, id) seek
+        db.Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
     def set_password(self, password: str) -> None:
         """Hash and set password."""
         from utils.security import hash_password
@@ -10,6 +10,7 @@ from .orders import orders_bp
 from .reviews import reviews_bp
 from .wishlist import wishlist_bp
 from .admin import admin_bp
+from .uploads import uploads_bp
 
 
 def register_blueprints(app) -> None:
@@ -24,3 +25,4 @@ def register_blueprints(app) -> None:
     app.register_blueprint(reviews_bp)
     app.register_blueprint(wishlist_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(uploads_bp)
@@ -6,10 +6,12 @@ from http import HTTPStatus
 from sqlalchemy import func
 from database import db
 from models import User, Order, OrderItem, Product, CartItem
+from schemas import dump_orders
 
 from middleware.auth import admin_required
 from services import order_service, user_service
 from utils.responses import success_response, error_response
+from utils.pagination import pagination_args
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
 
@@ -96,31 +98,21 @@ def list_all_orders():
       - name: per_page
         in: query
         type: integer
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset mode; pass empty for the first page, then next_cursor
+      - name: include_total
+        in: query
+        type: boolean
     responses:
       200:
         description: Paginated orders
     """
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
-    result = order_service.get_all_orders_admin(page=page, per_page=per_page)
+    result = order_service.get_all_orders_admin(**pagination_args())
     orders = result.pop("orders")
 
-    def _order_dict(o):
-        return {
-            "id": o.id,
-            "user_id": o.user_id,
-            "status": o.status,
-            "total": str(o.total),
-            "payment_intent_id": o.payment_intent_id,
-            "created_at": o.created_at.isoformat() if o.created_at else None,
-            "order_items": [
-                {"id": oi.id, "order_id": oi.order_id, "product_id": oi.product_id, "quantity": oi.quantity, "price": str(oi.price)}
-                for oi in o.order_items
-            ],
-        }
-    return success_response(
-        data={"orders": [_order_dict(o) for o in orders], **result}
-    )
+    return success_response(data={"orders": dump_orders(orders), **result})
 
 
 @admin_bp.route("/orders/<int:order_id>/cancel", methods=["POST"])
@@ -144,23 +136,13 @@ def cancel_order(order_id: int):
       400:
         description: Order already cancelled or delivered
     """
-    order = db.session.get(Order, order_id)
-    if not order:
-        return error_response(f"Order {order_id} not found", HTTPStatus.NOT_FOUND)
-    if order.status in ("cancelled", "delivered"):
-        return error_response(
-            f"Cannot cancel an order with status '{order.status}'",
-            HTTPStatus.BAD_REQUEST,
-        )
-    # Restore stock for each line item
-    for oi in order.order_items:
-        product = db.session.get(Product, oi.product_id)
-        if product:
-            product.stock += oi.quantity
-    order.status = "cancelled"
-    db.session.commit()
-    db.session.refresh(order)
-    return success_response(data=_order_dict(order))
+    try:
+        order = order_service.cancel_order(order_id)
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(data=dump_orders([order])[0])
 
 
 @admin_bp.route("/orders/<int:order_id>", methods=["DELETE"])
@@ -205,13 +187,18 @@ def list_users():
       - name: per_page
         in: query
         type: integer
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset mode; pass empty for the first page, then next_cursor
+      - name: include_total
+        in: query
+        type: boolean
     responses:
       200:
         description: Paginated user list
     """
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
-    result = user_service.get_all_paginated(page=page, per_page=per_page)
+    result = user_service.get_all_paginated(**pagination_args())
     return success_response(data=result)
 
 
@@ -1,37 +1,17 @@
-"""Cart routes: get, add, update item, remove item, clear."""
+"""Cart routes: get, add, update item, bulk update, remove item, clear."""
 
 from flask import Blueprint, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from http import HTTPStatus
 from pydantic import ValidationError
 
-from schemas import CartItemAdd, CartItemUpdate
+from schemas import CartBulkUpdate, CartItemAdd, CartItemUpdate, dump_cart
 from services import cart_service
 from utils.responses import success_response, error_response
 
 cart_bp = Blueprint("cart", __name__, url_prefix="/api/v1/cart")
 
 
-def _serialize_cart(data: dict) -> dict:
-    """Build cart response with items and total."""
-    items = []
-    for item in data["items"]:
-        d = {
-            "id": item.id,
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "created_at": item.created_at.isoformat() if item.created_at else None,
-            "product": {
-                "id": item.product.id,
-                "name": item.product.name,
-                "price": str(item.product.price),
-                "sku": item.product.sku,
-            },
-        }
-        items.append(d)
-    return {"items": items, "total": str(data["total"])}
-
-
 @cart_bp.route("", methods=["GET"])
 @jwt_required()
 def get_cart():
@@ -45,7 +25,7 @@ def get_cart():
     """
     user_id = int(get_jwt_identity())
     data = cart_service.get_cart(user_id)
-    return success_response(data=_serialize_cart(data))
+    return success_response(data=dump_cart(data))
 
 
 @cart_bp.route("/items", methods=["POST"])
@@ -127,6 +107,52 @@ def update_item(cart_item_id: int):
     return success_response(data={"id": item.id, "product_id": item.product_id, "quantity": item.quantity})
 
 
+@cart_bp.route("/items", methods=["PATCH"])
+@jwt_required()
+def bulk_update_items():
+    """Change many cart lines in one transaction.
+    ---
+    tags: [cart]
+    security: [Bearer: []]
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required: [items]
+          properties:
+            items:
+              type: array
+              description: Up to 100 changes, applied in order
+              items:
+                type: object
+                required: [product_id]
+                properties:
+                  product_id: { type: integer }
+                  quantity: { type: integer }
+                  op: { type: string, enum: [set, add, remove], default: set }
+    responses:
+      200:
+        description: Updated cart (all changes applied)
+      400:
+        description: Validation failed or insufficient stock (nothing applied)
+      404:
+        description: Product not found (nothing applied)
+    """
+    try:
+        body = CartBulkUpdate.model_validate(request.get_json())
+    except ValidationError as e:
+        return error_response("Validation failed", HTTPStatus.BAD_REQUEST, e.errors())
+    user_id = int(get_jwt_identity())
+    try:
+        cart = cart_service.bulk_update(user_id, body.items)
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(data=dump_cart(cart))
+
+
 @cart_bp.route("/items/<int:cart_item_id>", methods=["DELETE"])
 @jwt_required()
 def remove_item(cart_item_id: int):
@@ -28,6 +28,31 @@ def list_categories():
     )
 
 
+@categories_bp.route("/tree", methods=["GET"])
+def category_tree():
+    """Category hierarchy as nested nodes (public); optional root_id for one subtree.
+    ---
+    tags: [categories]
+    parameters:
+      - name: root_id
+        in: query
+        type: integer
+    responses:
+      200:
+        description: Nested categories with children
+      404:
+        description: Root not found
+    """
+    root_id = request.args.get("root_id", type=int)
+    try:
+        tree = category_service.get_tree(root_id)
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(data=tree)
+
+
 @categories_bp.route("/<int:category_id>", methods=["GET"])
 def get_category(category_id: int):
     """Get category by id (public).
@@ -4,34 +4,18 @@ from flask import Blueprint, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from http import HTTPStatus
 
-from schemas import OrderResponse, OrderItemResponse, OrderStatusUpdate
+from schemas import OrderStatusUpdate, dump_orders
 from services import order_service
 from middleware.auth import admin_required
 from utils.responses import success_response, error_response
+from utils.pagination import pagination_args
 
 orders_bp = Blueprint("orders", __name__, url_prefix="/api/v1/orders")
 
 
 def _order_to_dict(order) -> dict:
     """Serialize order with items."""
-    return {
-        "id": order.id,
-        "user_id": order.user_id,
-        "status": order.status,
-        "total": str(order.total),
-        "payment_intent_id": order.payment_intent_id,
-        "created_at": order.created_at.isoformat() if order.created_at else None,
-        "order_items": [
-            {
-                "id": oi.id,
-                "order_id": oi.order_id,
-                "product_id": oi.product_id,
-                "quantity": oi.quantity,
-                "price": str(oi.price),
-            }
-            for oi in order.order_items
-        ],
-    }
+    return dump_orders([order])[0]
 
 
 @orders_bp.route("", methods=["POST"])
@@ -71,18 +55,23 @@ def list_orders():
       - name: per_page
         in: query
         type: integer
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset mode; pass empty for the first page, then next_cursor
+      - name: include_total
+        in: query
+        type: boolean
     responses:
       200:
         description: Paginated orders
     """
     user_id = int(get_jwt_identity())
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
-    result = order_service.get_user_orders(user_id, page=page, per_page=per_page)
+    result = order_service.get_user_orders(user_id, **pagination_args())
     orders = result.pop("orders")
     return success_response(
         data={
-            "orders": [_order_to_dict(o) for o in orders],
+            "orders": dump_orders(orders),
             **result,
         }
     )
@@ -1,16 +1,29 @@
 """Product routes: list (search), get, create, update, delete, image upload (admin for write)."""
 
-import os
-from flask import Blueprint, request, current_app
+from flask import Blueprint, Response, request, stream_with_context
 from http import HTTPStatus
 from pydantic import ValidationError
-from werkzeug.utils import secure_filename
 
-from schemas import ProductCreate, ProductUpdate, ProductResponse, ProductImageCreate
-from services import product_service
+from schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductResponse,
+    ProductImageCreate,
+    ProductBatchRequest,
+    dump_products,
+)
+from services import (
+    export_service,
+    import_service,
+    product_service,
+    recommendation_service,
+    similarity_service,
+    suggest_index,
+)
 from middleware.auth import admin_required
 from flask_jwt_extended import jwt_required
 from utils.responses import success_response, error_response
+from utils.pagination import pagination_args
 
 products_bp = Blueprint("products", __name__, url_prefix="/api/v1/products")
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
@@ -29,6 +42,10 @@ def list_products():
       - name: q
         in: query
         type: string
+      - name: fuzzy
+        in: query
+        type: boolean
+        description: Typo-tolerant (trigram) matching for q
       - name: category_id
         in: query
         type: integer
@@ -38,37 +55,201 @@ def list_products():
       - name: per_page
         in: query
         type: integer
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset mode; pass empty for the first page, then next_cursor
+      - name: sort
+        in: query
+        type: string
+        enum: [newest, price_asc, price_desc, rating, popularity]
+        description: Default is search relevance, then newest
+      - name: include_total
+        in: query
+        type: string
+        enum: ["true", "false", "estimate"]
+      - name: facets
+        in: query
+        type: boolean
+        description: Include category, price-range and availability counts
+      - name: expand
+        in: query
+        type: string
+        description: Comma-separated related data to embed per product (images, category)
     responses:
       200:
-        description: Paginated products
+        description: Paginated products (with ETag)
+      304:
+        description: Not modified (If-None-Match matched)
     """
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
-    search = request.args.get("q", "").strip() or None
-    category_id = request.args.get("category_id", type=int)
-    min_price = request.args.get("min_price", type=float)
-    max_price = request.args.get("max_price", type=float)
-    min_rating = request.args.get("min_rating", type=float)
-    in_stock_only = request.args.get("in_stock_only", "false").lower() == "true"
-    result = product_service.get_all_paginated(
-        page=page,
-        per_page=per_page,
-        search=search,
-        category_id=category_id,
-        min_price=min_price,
-        max_price=max_price,
-        min_rating=min_rating,
-        in_stock_only=in_stock_only,
+    filters = {
+        "search": request.args.get("q", "").strip() or None,
+        "fuzzy": request.args.get("fuzzy", "false").lower() == "true",
+        "category_id": request.args.get("category_id", type=int),
+        "min_price": request.args.get("min_price", type=float),
+        "max_price": request.args.get("max_price", type=float),
+        "min_rating": request.args.get("min_rating", type=float),
+        "in_stock_only": request.args.get("in_stock_only", "false").lower() == "true",
+    }
+    data, etag = product_service.get_listing(
+        expand=[e.strip() for e in request.args.get("expand", "").split(",") if e.strip()],
+        facets=request.args.get("facets", "false").lower() == "true",
+        sort=request.args.get("sort") or None,
+        **pagination_args(),
+        **filters,
     )
-    products = result.pop("products")
+    resp, status = success_response(data=data)
+    resp.status_code = status
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
+
+
+@products_bp.route("/suggest", methods=["GET"])
+def suggest_products():
+    """Autocomplete product names and SKUs by prefix, most popular first (public).
+    ---
+    tags: [products]
+    parameters:
+      - name: prefix
+        in: query
+        type: string
+        required: true
+      - name: limit
+        in: query
+        type: integer
+        description: Max suggestions (default 10, max 20)
+    responses:
+      200:
+        description: Suggestions (id, name, sku)
+    """
+    prefix = request.args.get("prefix", "")
+    limit = max(1, min(request.args.get("limit", 10, type=int), 20))
+    return success_response(data={"suggestions": suggest_index.suggest(prefix, limit)})
+
+
+@products_bp.route("/batch", methods=["POST"])
+def batch_products():
+    """Fetch many products by ids and/or SKUs in one call (public).
+    ---
+    tags: [products]
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            ids: { type: array, items: { type: integer } }
+            skus: { type: array, items: { type: string } }
+    responses:
+      200:
+        description: Products in request order, plus missing ids/skus
+      400:
+        description: No keys, or more than 200 ids or skus
+    """
+    try:
+        data = ProductBatchRequest.model_validate(request.get_json() or {})
+    except ValidationError as e:
+        return error_response("Validation failed", HTTPStatus.BAD_REQUEST, e.errors())
+    if not data.ids and not data.skus:
+        return error_response("Provide ids or skus", HTTPStatus.BAD_REQUEST)
+    products, missing = product_service.get_many(data.ids, data.skus)
     return success_response(
         data={
-            "products": [ProductResponse.model_validate(p).model_dump() for p in products],
-            **result,
+            "products": dump_products(products),
+            "missing": missing,
         }
     )
 
 
+@products_bp.route("/import", methods=["POST"])
+@jwt_required()
+@admin_required
+def import_products():
+    """Bulk upsert products (by SKU) from a CSV or NDJSON file (admin).
+    ---
+    tags: [products]
+    security: [Bearer: []]
+    consumes: [multipart/form-data, text/csv, application/x-ndjson]
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        description: CSV (header row) or NDJSON; or send the file as the raw request body
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        description: Defaults to the file extension / Content-Type
+    responses:
+      200:
+        description: Report (processed, created, updated, failed, per-row errors)
+      400:
+        description: Missing file or unknown format
+    """
+    file = request.files.get("file")
+    if file is not None:
+        stream, filename, content_type = file.stream, file.filename, file.mimetype
+    else:
+        stream, filename, content_type = request.stream, None, request.mimetype
+    fmt = request.args.get("format") or import_service.detect_format(filename, content_type)
+    if fmt is None:
+        return error_response("Cannot tell the file format; pass ?format=csv|ndjson", HTTPStatus.BAD_REQUEST)
+    try:
+        report = import_service.import_products(import_service.iter_rows(stream, fmt))
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(data=report)
+
+
+@products_bp.route("/export", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_products():
+    """Stream the catalog (including inactive products) as NDJSON or CSV (admin).
+    ---
+    tags: [products]
+    security: [Bearer: []]
+    produces: [application/x-ndjson, text/csv]
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+      - name: category_id
+        in: query
+        type: integer
+        description: Only this category and its descendants
+      - name: updated_since
+        in: query
+        type: string
+        description: ISO-8601; only products updated at or after this time
+    responses:
+      200:
+        description: Streamed export, ordered by id
+      400:
+        description: Invalid format or updated_since
+    """
+    fmt = request.args.get("format", "ndjson")
+    try:
+        chunks = export_service.export_products(
+            fmt,
+            category_id=request.args.get("category_id", type=int),
+            updated_since=export_service.parse_since(request.args.get("updated_since")),
+        )
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=products.{fmt}"},
+    )
+
+
 @products_bp.route("/<int:product_id>", methods=["GET"])
 def get_product(product_id: int):
     """Get product by id (public).
@@ -94,6 +275,84 @@ def get_product(product_id: int):
     return success_response(data=ProductResponse.model_validate(p).model_dump())
 
 
+@products_bp.route("/<int:product_id>/recommendations", methods=["GET"])
+def product_recommendations(product_id: int):
+    """Products frequently bought together with this one (public).
+    ---
+    tags: [products]
+    parameters:
+      - name: product_id
+        in: path
+        type: integer
+        required: true
+      - name: limit
+        in: query
+        type: integer
+        description: Max products (default and max 10)
+    responses:
+      200:
+        description: Co-purchased products, best first; score = orders containing both
+      404:
+        description: Not found
+    """
+    limit = max(1, min(request.args.get("limit", recommendation_service.TOP_K, type=int),
+                       recommendation_service.TOP_K))
+    try:
+        rows = recommendation_service.get_for_product(product_id, limit)
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(
+        data={
+            "product_id": product_id,
+            "recommendations": [
+                {**data, "score": score}
+                for data, (_, score) in zip(dump_products(p for p, _ in rows), rows)
+            ],
+        }
+    )
+
+
+@products_bp.route("/<int:product_id>/similar", methods=["GET"])
+def similar_products(product_id: int):
+    """Products in the same category with the most similar name/description (public).
+    ---
+    tags: [products]
+    parameters:
+      - name: product_id
+        in: path
+        type: integer
+        required: true
+      - name: limit
+        in: query
+        type: integer
+        description: Max products (default and max 10)
+    responses:
+      200:
+        description: Similar products, best first; score = TF-IDF cosine similarity
+      404:
+        description: Not found
+    """
+    limit = max(1, min(request.args.get("limit", similarity_service.TOP_K, type=int),
+                       similarity_service.TOP_K))
+    try:
+        rows = similarity_service.get_for_product(product_id, limit)
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(
+        data={
+            "product_id": product_id,
+            "similar": [
+                {**data, "score": score}
+                for data, (_, score) in zip(dump_products(p for p, _ in rows), rows)
+            ],
+        }
+    )
+
+
 @products_bp.route("", methods=["POST"])
 @jwt_required()
 @admin_required
@@ -135,6 +394,57 @@ def create_product():
     )
 
 
+@products_bp.route("", methods=["PATCH"])
+@jwt_required()
+@admin_required
+def bulk_update_products():
+    """Bulk price/stock/active update in one transaction (admin).
+    ---
+    tags: [products]
+    security: [Bearer: []]
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required: [items]
+          properties:
+            items:
+              type: array
+              description: Up to 1000 rows, each with exactly one of id or sku
+              items:
+                type: object
+                properties:
+                  id: { type: integer }
+                  sku: { type: string }
+                  price: { type: number }
+                  stock: { type: integer }
+                  is_active: { type: boolean }
+    responses:
+      200:
+        description: One result per row (updated, not_found or invalid)
+      400:
+        description: Missing items or too many rows
+    """
+    body = request.get_json(silent=True) or {}
+    items = body.get("items")
+    if not isinstance(items, list) or not items:
+        return error_response("items must be a non-empty list", HTTPStatus.BAD_REQUEST)
+    try:
+        results = product_service.bulk_update(items)
+    except Exception as e:
+        if hasattr(e, "status_code"):
+            return error_response(e.message, e.status_code)
+        raise
+    return success_response(
+        data={
+            "updated": sum(r["status"] == "updated" for r in results),
+            "failed": sum(r["status"] != "updated" for r in results),
+            "results": results,
+        }
+    )
+
+
 @products_bp.route("/<int:product_id>", methods=["PUT"])
 @jwt_required()
 @admin_required
@@ -245,14 +555,9 @@ def add_product_image(product_id: int):
         return error_response("No file or url provided", HTTPStatus.BAD_REQUEST)
     if not allowed_file(file.filename):
         return error_response("Invalid file type", HTTPStatus.BAD_REQUEST)
-    filename = secure_filename(file.filename)
-    upload_dir = current_app.config.get("UPLOAD_FOLDER", os.path.join(os.getcwd(), "uploads"))
-    os.makedirs(upload_dir, exist_ok=True)
-    path = os.path.join(upload_dir, f"product_{product_id}_{filename}")
-    file.save(path)
-    url = f"/uploads/product_{product_id}_{filename}"
+    ext = file.filename.rsplit(".", 1)[1].lower()
     try:
-        img = product_service.add_image(product_id, url, 0)
+        img = product_service.add_uploaded_image(product_id, file.stream, ext)
     except Exception as e:
         if hasattr(e, "status_code"):
             return error_response(e.message, e.status_code)
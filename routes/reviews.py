@@ -5,10 +5,11 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 from http import HTTPStatus
 from pydantic import ValidationError
 
-from schemas import ReviewCreate, ReviewResponse
+from schemas import ReviewCreate, ReviewResponse, dump_reviews
 from services import review_service
 from middleware.auth import admin_required
 from utils.responses import success_response, error_response
+from utils.pagination import pagination_args
 
 reviews_bp = Blueprint("reviews", __name__, url_prefix="/api/v1/products")
 
@@ -29,17 +30,22 @@ def list_reviews(product_id: int):
       - name: per_page
         in: query
         type: integer
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset mode; pass empty for the first page, then next_cursor
+      - name: include_total
+        in: query
+        type: boolean
     responses:
       200:
         description: Paginated reviews
     """
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
-    result = review_service.get_by_product(product_id, page=page, per_page=per_page)
+    result = review_service.get_by_product(product_id, **pagination_args())
     reviews = result.pop("reviews")
     return success_response(
         data={
-            "reviews": [ReviewResponse.model_validate(r).model_dump() for r in reviews],
+            "reviews": dump_reviews(reviews),
             **result,
         }
     )
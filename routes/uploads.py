@@ -0,0 +1,60 @@
+"""Uploaded file serving (product images) under /uploads.
+
+Files go through ``send_from_directory``: the body is handed to the server's
+``wsgi.file_wrapper`` (sendfile where supported) or, with UPLOADS_X_SENDFILE,
+left to the front proxy via ``X-Sendfile``. Responses carry a strong ETag and
+Last-Modified and honour If-None-Match / If-Modified-Since and Range.
+"""
+
+import os
+import re
+
+from flask import Blueprint, current_app, send_from_directory
+
+from services.image_store import upload_folder
+
+uploads_bp = Blueprint("uploads", __name__)
+
+# Content-hash names (hex digest + extension) never change content once written
+_IMMUTABLE_NAME = re.compile(r"^[0-9a-f]{32,}\.[A-Za-z0-9]+$")
+
+
+@uploads_bp.route("/uploads/<path:filename>", methods=["GET"])
+def serve_upload(filename: str):
+    """Serve an uploaded file.
+    ---
+    tags: [uploads]
+    parameters:
+      - in: path
+        name: filename
+        type: string
+        required: true
+      - in: header
+        name: Range
+        type: string
+        description: Byte range, e.g. bytes=0-1023 (206 Partial Content)
+    responses:
+      200:
+        description: File body
+      206:
+        description: Requested byte range
+      304:
+        description: Not modified (ETag / Last-Modified match)
+      404:
+        description: No such file
+    """
+    immutable = bool(_IMMUTABLE_NAME.match(os.path.basename(filename)))
+    resp = send_from_directory(
+        upload_folder(),
+        filename,
+        conditional=True,
+        # the digest in the name already identifies the content
+        etag=os.path.splitext(os.path.basename(filename))[0] if immutable else True,
+        max_age=current_app.config.get("UPLOADS_MAX_AGE", 31536000) if immutable else 0,
+    )
+    if immutable:
+        resp.cache_control.immutable = True
+    else:
+        # names like product_<id>_<name> can be overwritten: always revalidate
+        resp.cache_control.no_cache = True
+    return resp
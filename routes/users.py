@@ -9,6 +9,7 @@ from schemas import UserUpdate, UserResponse
 from services import user_service
 from middleware.auth import admin_required
 from utils.responses import success_response, error_response
+from utils.pagination import pagination_args
 
 users_bp = Blueprint("users", __name__, url_prefix="/api/v1/users")
 
@@ -78,13 +79,18 @@ def list_users():
       - name: per_page
         in: query
         type: integer
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset mode; pass empty for the first page, then next_cursor
+      - name: include_total
+        in: query
+        type: boolean
     responses:
       200:
         description: Paginated user list
     """
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
-    result = user_service.get_all_paginated(page=page, per_page=per_page)
+    result = user_service.get_all_paginated(**pagination_args())
     return success_response(data=result)
 
 
@@ -5,7 +5,7 @@ from sqlalchemy import func
 
 from config.database import db
 from models import User, Order, OrderItem, Product
-from services import order_service, user_service
+from services import order_service, product_service, user_service
 from routes.web.utils import require_login, require_admin
 
 admin_web_bp = Blueprint(
@@ -195,19 +195,8 @@ def admin_cancel_order(order_id):
     if guard:
         return guard
     try:
-        order = db.session.get(Order, order_id)
-        if not order:
-            flash("Order not found.", "error")
-        elif order.status in ("cancelled", "delivered"):
-            flash(f"Cannot cancel an order with status '{order.status}'.", "error")
-        else:
-            for oi in order.order_items:
-                product = db.session.get(Product, oi.product_id)
-                if product:
-                    product.stock += oi.quantity
-            order.status = "cancelled"
-            db.session.commit()
-            flash(f"Order #{order_id} cancelled and stock restored.", "success")
+        order_service.cancel_order(order_id)
+        flash(f"Order #{order_id} cancelled and stock restored.", "success")
     except Exception as e:
         flash(getattr(e, "message", "Could not cancel order."), "error")
     return redirect(url_for("web_admin.admin_orders"))
@@ -275,6 +264,7 @@ def admin_update_stock(product_id):
         else:
             product.stock = new_stock
             db.session.commit()
+            product_service.invalidate_products([product_id], stock_changed=True)
             flash(f"Stock for '{product.name}' updated to {new_stock}.", "success")
     except Exception as e:
         flash(getattr(e, "message", "Could not update stock."), "error")
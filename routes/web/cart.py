@@ -2,8 +2,9 @@
 
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 
+from schemas import CartBulkOp
 from services import cart_service, order_service
-from errors.exceptions import ProductNotFoundError, OrderNotFoundError
+from errors.exceptions import ProductNotFoundError, OrderNotFoundError, ValidationError
 from routes.web.utils import require_login
 
 cart_web_bp = Blueprint(
@@ -59,6 +60,29 @@ def cart_update(item_id: int):
     return redirect(url_for("web_cart.cart_view"))
 
 
+@cart_web_bp.route("/cart/update", methods=["POST"])
+def cart_update_all():
+    """Save every quantity field (``qty_<product_id>``) of the cart page in one transaction."""
+    guard = require_login()
+    if guard:
+        return guard
+
+    ops = []
+    for key in request.form:
+        quantity = request.form.get(key, type=int)
+        if key.startswith("qty_") and key[4:].isdigit() and quantity is not None:
+            ops.append(CartBulkOp(product_id=int(key[4:]), quantity=max(quantity, 0)))
+    if ops:
+        try:
+            cart_service.bulk_update(session["user_id"], ops)
+        except ProductNotFoundError:
+            flash("Product not found.", "error")
+        except ValidationError as e:
+            flash(e.message, "error")
+
+    return redirect(url_for("web_cart.cart_view"))
+
+
 @cart_web_bp.route("/cart/remove/<int:item_id>", methods=["POST"])
 def cart_remove(item_id: int):
     guard = require_login()
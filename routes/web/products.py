@@ -26,9 +26,13 @@ def products_list():
     max_price = request.args.get("max_price", type=float)
     in_stock = request.args.get("in_stock") == "1"
     min_rating = request.args.get("min_rating", type=int)
+    sort = request.args.get("sort") or None
+    if sort not in product_service.SORT_OPTIONS:
+        sort = None
 
     try:
-        result = product_service.get_all_paginated(
+        result, _ = product_service.get_listing(
+            expand=("images",),
             page=page,
             per_page=12,
             search=search or None,
@@ -38,6 +42,7 @@ def products_list():
             max_price=max_price,
             in_stock_only=in_stock,
             min_rating=min_rating,
+            sort=sort,
         )
         categories = category_service.get_all()
     except Exception:
@@ -59,6 +64,8 @@ def products_list():
         max_price=max_price,
         in_stock=in_stock,
         min_rating=min_rating,
+        sort=sort,
+        sort_options=product_service.SORT_OPTIONS,
     )
 
 
@@ -70,14 +77,14 @@ def product_detail(product_id: int):
 
     try:
         product = product_service.get_by_id(product_id)
-        # Load reviews
-        rev_result = review_service.get_by_product(product_id, page=1, per_page=50)
+        # Load reviews for display; rating summary comes from the product aggregates
+        rev_result = review_service.get_by_product(
+            product_id, page=1, per_page=50, with_count=False
+        )
         reviews = rev_result.get("reviews", [])
-        
-        # Calculate rating
-        review_count = len(reviews)
-        avg_rating = sum(r.rating for r in reviews) / review_count if review_count > 0 else 0
-        
+        review_count = product.rating_count
+        avg_rating = product.rating_avg or 0
+
     except ProductNotFoundError:
         flash("Product not found.", "error")
         return redirect(url_for("web_products.products_list"))
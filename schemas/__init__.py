@@ -10,11 +10,21 @@ from .product import (
     ProductResponse,
     ProductImageCreate,
     ProductImageResponse,
+    ProductBatchRequest,
+    ProductBulkUpdateItem,
+)
+from .cart import (
+    CartItemAdd,
+    CartItemUpdate,
+    CartItemResponse,
+    CartResponse,
+    CartBulkOp,
+    CartBulkUpdate,
 )
-from .cart import CartItemAdd, CartItemUpdate, CartItemResponse, CartResponse
 from .order import OrderResponse, OrderItemResponse, OrderStatusUpdate
 from .review import ReviewCreate, ReviewResponse
 from .wishlist import WishlistAdd, WishlistItemResponse
+from .serializers import dump_cart, dump_orders, dump_products, dump_reviews, dump_users
 
 __all__ = [
     "LoginRequest",
@@ -32,10 +42,14 @@ __all__ = [
     "ProductResponse",
     "ProductImageCreate",
     "ProductImageResponse",
+    "ProductBatchRequest",
+    "ProductBulkUpdateItem",
     "CartItemAdd",
     "CartItemUpdate",
     "CartItemResponse",
     "CartResponse",
+    "CartBulkOp",
+    "CartBulkUpdate",
     "OrderResponse",
     "OrderItemResponse",
     "OrderStatusUpdate",
@@ -43,4 +57,9 @@ __all__ = [
     "ReviewResponse",
     "WishlistAdd",
     "WishlistItemResponse",
+    "dump_cart",
+    "dump_orders",
+    "dump_products",
+    "dump_reviews",
+    "dump_users",
 ]
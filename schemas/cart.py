@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -18,6 +19,20 @@ class CartItemUpdate(BaseModel):
     quantity: int = Field(..., ge=0)
 
 
+class CartBulkOp(BaseModel):
+    """One bulk cart change: set the quantity (0 removes), add to it, or remove the line."""
+
+    product_id: int
+    quantity: int = Field(0, ge=0)
+    op: Literal["set", "add", "remove"] = "set"
+
+
+class CartBulkUpdate(BaseModel):
+    """Bulk cart change request."""
+
+    items: list[CartBulkOp] = Field(..., min_length=1, max_length=100)
+
+
 class CartItemProductRef(BaseModel):
     id: int
     name: str
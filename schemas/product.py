@@ -44,6 +44,23 @@ class ProductUpdate(BaseModel):
     is_active: bool | None = None
 
 
+class ProductBatchRequest(BaseModel):
+    """Batch lookup by ids and/or SKUs."""
+
+    ids: list[int] = Field(default_factory=list, max_length=200)
+    skus: list[str] = Field(default_factory=list, max_length=200)
+
+
+class ProductBulkUpdateItem(BaseModel):
+    """One row of a bulk price/stock update; identified by id or sku."""
+
+    id: int | None = None
+    sku: str | None = Field(None, min_length=1, max_length=50)
+    price: Decimal | None = Field(None, ge=0)
+    stock: int | None = Field(None, ge=0)
+    is_active: bool | None = None
+
+
 class CategoryRef(BaseModel):
     id: int
     name: str
@@ -62,4 +79,6 @@ class ProductResponse(BaseModel):
     sku: str
     category_id: int
     is_active: bool
+    rating_avg: float | None = None
+    rating_count: int = 0
     created_at: datetime
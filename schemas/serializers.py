@@ -0,0 +1,49 @@
+"""Precompiled bulk serializers for list responses.
+
+Each ``TypeAdapter(list[...])`` validates a whole page of ORM objects in one call
+into the pydantic core, instead of one ``model_validate(...).model_dump()`` round
+trip per row. Values stay Python objects (Decimal, datetime); the app JSON
+provider encodes them.
+"""
+
+from typing import Iterable
+
+from pydantic import TypeAdapter
+
+from .cart import CartResponse
+from .order import OrderResponse
+from .product import ProductResponse
+from .review import ReviewResponse
+from .user import UserResponse
+
+_products = TypeAdapter(list[ProductResponse])
+_orders = TypeAdapter(list[OrderResponse])
+_reviews = TypeAdapter(list[ReviewResponse])
+_users = TypeAdapter(list[UserResponse])
+_cart = TypeAdapter(CartResponse)
+
+
+def _dump_many(adapter: TypeAdapter, objs: Iterable) -> list[dict]:
+    return adapter.dump_python(adapter.validate_python(list(objs), from_attributes=True))
+
+
+def dump_products(products: Iterable) -> list[dict]:
+    return _dump_many(_products, products)
+
+
+def dump_orders(orders: Iterable) -> list[dict]:
+    """Orders with their ``order_items``."""
+    return _dump_many(_orders, orders)
+
+
+def dump_reviews(reviews: Iterable) -> list[dict]:
+    return _dump_many(_reviews, reviews)
+
+
+def dump_users(users: Iterable) -> list[dict]:
+    return _dump_many(_users, users)
+
+
+def dump_cart(cart: dict) -> dict:
+    """``{"items": [CartItem, ...], "total": ...}`` as CartResponse."""
+    return _cart.dump_python(_cart.validate_python(cart, from_attributes=True))
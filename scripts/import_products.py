@@ -0,0 +1,54 @@
+"""Bulk upsert products (keyed by SKU) from a CSV or NDJSON file, streaming.
+
+    python scripts/import_products.py catalog.csv
+    python scripts/import_products.py catalog.ndjson --chunk-size 5000
+
+CSV needs a header row with name, price, sku, category_id (and optionally
+description, stock, is_active); NDJSON has one such object per line.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Ensure project root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def import_products(path: str, fmt: str | None = None, chunk_size: int = 1000) -> int:
+    """Import ``path``; print progress and the error report; return the failed-row count."""
+    from app import create_app
+    from services import import_service
+
+    fmt = fmt or import_service.detect_format(path)
+    if fmt is None:
+        sys.exit("Cannot tell the file format; pass --format csv|ndjson")
+
+    def progress(report: dict) -> None:
+        print(
+            f"\r{report['processed']} rows: {report['created']} created, "
+            f"{report['updated']} updated, {report['failed']} failed",
+            end="", flush=True,
+        )
+
+    app = create_app()
+    with app.app_context(), open(path, "rb") as f:
+        report = import_service.import_products(
+            import_service.iter_rows(f, fmt), chunk_size=chunk_size, progress=progress
+        )
+    print()
+    for error in report["errors"]:
+        print(json.dumps(error), file=sys.stderr)
+    if report["errors_truncated"]:
+        print("(more errors not shown)", file=sys.stderr)
+    return report["failed"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(1 if import_products(args.path, args.format, args.chunk_size) else 0)
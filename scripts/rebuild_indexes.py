@@ -0,0 +1,32 @@
+"""Rebuild derived search/index tables from the primary tables. Safe to re-run."""
+
+import sys
+from pathlib import Path
+
+# Ensure project root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def rebuild_indexes() -> None:
+    """Recompute every derived index."""
+    from app import create_app
+    from services import (
+        search_index, review_service, category_service, recommendation_service, similarity_service,
+    )
+
+    app = create_app()
+    with app.app_context():
+        count = search_index.rebuild()
+        print(f"Search + trigram index: {count} products indexed.")
+        count = category_service.rebuild_closure()
+        print(f"Category closure: {count} ancestor/descendant rows.")
+        count = review_service.recompute_rating_aggregates()
+        print(f"Rating aggregates: {count} rated products recomputed.")
+        count = recommendation_service.rebuild()
+        print(f"Recommendations: {count} co-purchased product pairs.")
+        count = similarity_service.rebuild()
+        print(f"Similar products: {count} neighbour rows.")
+
+
+if __name__ == "__main__":
+    rebuild_indexes()
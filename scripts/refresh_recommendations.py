@@ -0,0 +1,30 @@
+"""Refresh "frequently bought together" lists from new orders (run periodically, e.g. cron).
+
+    python scripts/refresh_recommendations.py          # fold in orders not yet counted
+    python scripts/refresh_recommendations.py --full   # recompute from all orders
+"""
+
+import sys
+from pathlib import Path
+
+# Ensure project root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def refresh_recommendations(full: bool = False) -> None:
+    """Incrementally (or fully) refresh co-occurrence counts and top-K lists."""
+    from app import create_app
+    from services import recommendation_service
+
+    app = create_app()
+    with app.app_context():
+        if full:
+            count = recommendation_service.rebuild()
+            print(f"Recommendations rebuilt: {count} co-purchased product pairs.")
+        else:
+            count = recommendation_service.refresh()
+            print(f"Recommendations refreshed: {count} new orders folded in.")
+
+
+if __name__ == "__main__":
+    refresh_recommendations(full="--full" in sys.argv[1:])
@@ -12,6 +12,7 @@ def seed() -> None:
     from app import create_app
     from database import db
     from models import User, Category
+    from services import category_service
     from utils.security import hash_password
     from sqlalchemy.exc import OperationalError
 
@@ -40,6 +41,7 @@ def seed() -> None:
         admin.password_hash = hash_password("admin123")
         db.session.add(admin)
         db.session.commit()
+        category_service.rebuild_closure()
         print("Seed done: 2 categories, 1 admin (admin@example.com / admin123).")
 
 
@@ -12,6 +12,7 @@ def seed_products():
     from app import create_app
     from database import db
     from models import Product, Category
+    from services import search_index
     from decimal import Decimal
 
     app = create_app("development")
@@ -56,6 +57,7 @@ def seed_products():
 
         db.session.add_all(products)
         db.session.commit()
+        search_index.rebuild()
         print(f"Seeded {len(products)} demo products across Electronics & Clothing.")
 
 
@@ -1,9 +1,16 @@
 """Base service helpers (safe commit, pagination)."""
 
+import base64
+import binascii
+from datetime import datetime
 from typing import Any
+from flask import current_app
 from database import db
+from sqlalchemy import tuple_
 from sqlalchemy.exc import SQLAlchemyError
-from exceptions import DatabaseError
+from exceptions import DatabaseError, ValidationError
+from utils.cache import app_cache
+from utils.pagination import COUNT_ESTIMATE
 
 
 class BaseService:
@@ -19,14 +26,131 @@ class BaseService:
             raise DatabaseError(f"{error_message}: {str(e)}")
 
     @staticmethod
-    def pagination_dict(total: int, page: int, per_page: int) -> dict[str, Any]:
+    def pagination_dict(
+        total: int, page: int, per_page: int, total_is_estimate: bool = False
+    ) -> dict[str, Any]:
         """Return pagination metadata."""
         pages = (total + per_page - 1) // per_page if per_page else 0
         return {
             "total": total,
+            "total_is_estimate": total_is_estimate,
             "page": page,
             "per_page": per_page,
             "pages": pages,
             "has_next": page < pages,
             "has_prev": page > 1,
         }
+
+    @staticmethod
+    def _planner_estimate(statement) -> int | None:
+        """Row estimate from the Postgres planner (EXPLAIN); None on other backends."""
+        dialect = db.session.get_bind().dialect
+        if dialect.name != "postgresql":
+            return None
+        compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        plan = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def count(q, with_count: bool | str = True) -> tuple[int | None, bool]:
+        """Return (total, total_is_estimate) for a query.
+
+        ``with_count`` False skips counting; True counts exactly. ``COUNT_ESTIMATE``
+        reuses a count cached for the same SQL and parameters (``COUNT_CACHE_TTL``),
+        and on a miss takes the Postgres planner estimate when it is large
+        (``COUNT_ESTIMATE_MIN``); small or non-Postgres sets are counted exactly.
+        """
+        if not with_count:
+            return None, False
+        q = q.order_by(None)
+        if with_count != COUNT_ESTIMATE:
+            return q.count(), False
+        statement = q.statement
+        compiled = statement.compile(dialect=db.session.get_bind().dialect)
+        key = (str(compiled), repr(sorted(compiled.params.items())))
+        cache = app_cache("counts", ttl=current_app.config.get("COUNT_CACHE_TTL", 30))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True
+        total = BaseService._planner_estimate(statement)
+        is_estimate = total is not None and total >= current_app.config.get("COUNT_ESTIMATE_MIN", 10000)
+        if not is_estimate:
+            total = q.count()
+        cache.set(key, total)
+        return total, is_estimate
+
+    @staticmethod
+    def paginate(
+        q, page: int, per_page: int, with_count: bool | str = True
+    ) -> tuple[list, dict[str, Any]]:
+        """Offset-paginate an ordered query; return (items, pagination metadata).
+
+        Without ``with_count`` no COUNT is issued: one extra row is fetched to
+        derive ``has_next`` and ``total``/``pages`` are None. See ``count`` for
+        ``with_count=COUNT_ESTIMATE``.
+        """
+        offset = (page - 1) * per_page
+        if with_count:
+            total, is_estimate = BaseService.count(q, with_count)
+            items = q.offset(offset).limit(per_page).all()
+            return items, BaseService.pagination_dict(total, page, per_page, is_estimate)
+        rows = q.offset(offset).limit(per_page + 1).all()
+        return rows[:per_page], {
+            "total": None,
+            "total_is_estimate": False,
+            "page": page,
+            "per_page": per_page,
+            "pages": None,
+            "has_next": len(rows) > per_page,
+            "has_prev": page > 1,
+        }
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, row_id: int) -> str:
+        """Opaque keyset cursor for a (created_at, id) position."""
+        raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        """Inverse of encode_cursor; raise ValidationError if malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+            created_at, row_id = raw.split("|")
+            return datetime.fromisoformat(created_at), int(row_id)
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            raise ValidationError("Invalid cursor", field="cursor")
+
+    @staticmethod
+    def keyset_paginate(
+        q, model, per_page: int, cursor: str | None = None, with_count: bool | str = False
+    ) -> tuple[list, dict[str, Any]]:
+        """Seek-paginate ``q`` newest-first on (created_at, id); return (items, metadata).
+
+        An empty/None ``cursor`` starts at the newest row. Each page is a range scan
+        on a (…, created_at, id) index instead of an OFFSET, so deep pages cost the
+        same as the first. ``total`` is only counted when ``with_count`` is set.
+        """
+        per_page = max(per_page, 1)  # a 0-row page would have no last row to resume from
+        total, is_estimate = BaseService.count(q, with_count)
+        if cursor:
+            created_at, row_id = BaseService.decode_cursor(cursor)
+            q = q.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+        rows = (
+            q.order_by(None)
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        last = items[-1] if has_next else None
+        return items, {
+            "total": total,
+            "total_is_estimate": is_estimate,
+            "per_page": per_page,
+            "next_cursor": BaseService.encode_cursor(last.created_at, last.id) if last else None,
+            "has_next": has_next,
+        }
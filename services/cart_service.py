@@ -1,9 +1,17 @@
 """Cart service: add, update, remove, get, clear. Validates stock."""
 
+from datetime import datetime
 from decimal import Decimal
+from typing import List
+
+from sqlalchemy import and_, delete, func, literal, select, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import contains_eager
+
 from database import db
 from models import CartItem, Product
-from exceptions import ProductNotFoundError
+from schemas import CartBulkOp
+from exceptions import ProductNotFoundError, ValidationError
 from validators import CartValidator
 from services.base_service import BaseService
 
@@ -17,45 +25,126 @@ def _verify_product_exists(product_id: int) -> Product:
 
 
 def get_cart(user_id: int) -> dict:
-    """Return cart items and total for user."""
-    items = CartItem.query.filter_by(user_id=user_id).all()
-    total = sum((item.product.price * item.quantity) for item in items)
-    return {"items": items, "total": total}
+    """Return cart items (with ``product`` loaded) and total for user, in one query.
 
+    Lines are joined to their products and the total is a window SUM over the
+    same rows, so cart size does not change the number of round trips.
+    """
+    total = type_coerce(func.sum(Product.price * CartItem.quantity).over(), db.Numeric(12, 2))
+    rows = (
+        db.session.query(CartItem, total)
+        .join(CartItem.product)
+        .options(contains_eager(CartItem.product))
+        .filter(CartItem.user_id == user_id)
+        .order_by(CartItem.id)
+        .all()
+    )
+    return {
+        "items": [item for item, _ in rows],
+        "total": rows[0][1] if rows else Decimal("0.00"),
+    }
 
-def add_item(user_id: int, product_id: int, quantity: int = 1) -> CartItem:
-    """Add or update quantity; validate stock. Raise ProductNotFoundError or ValidationError."""
-    product = _verify_product_exists(product_id)
-    CartValidator.validate_quantity(quantity, product.stock)
-    existing = CartItem.query.filter_by(user_id=user_id, product_id=product_id).first()
-    if existing:
-        new_qty = existing.quantity + quantity
-        CartValidator.validate_quantity(new_qty, product.stock)
-        existing.quantity = new_qty
-        db.session.commit()
-        db.session.refresh(existing)
-        return existing
-    item = CartItem(user_id=user_id, product_id=product_id, quantity=quantity)
-    db.session.add(item)
+
+def _line_stock():
+    """Scalar subquery: stock of the cart line's product, correlated to ``cart_items``."""
+    return (
+        select(Product.stock)
+        .where(Product.id == CartItem.product_id)
+        .correlate_except(Product)
+        .scalar_subquery()
+    )
+
+
+def _insert():
+    """INSERT INTO cart_items for the bound dialect (both support ON CONFLICT)."""
+    dialect = db.session.get_bind().dialect.name
+    return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(CartItem)
+
+
+def _upsert_statement(user_id: int, product_id: int, quantity: int):
+    """INSERT ... SELECT ... ON CONFLICT (user_id, product_id) DO UPDATE ... RETURNING.
+
+    The SELECT only yields a row when the product exists with enough stock, and
+    the DO UPDATE only fires when the summed quantity still fits in stock, so a
+    rejected add returns no row and changes nothing.
+    """
+    now = datetime.utcnow()
+    stmt = _insert().from_select(
+        ["user_id", "product_id", "quantity", "created_at", "updated_at"],
+        select(literal(user_id), Product.id, literal(quantity), literal(now), literal(now))
+        .where(Product.id == product_id, Product.stock >= quantity),
+    )
+    new_quantity = CartItem.quantity + stmt.excluded.quantity
+    return stmt.on_conflict_do_update(
+        index_elements=[CartItem.user_id, CartItem.product_id],
+        set_={"quantity": new_quantity, "updated_at": now},
+        where=select(Product.stock).where(Product.id == product_id).scalar_subquery() >= new_quantity,
+    ).returning(CartItem)
+
+
+def _insufficient_stock(available: int, requested: int) -> ValidationError:
+    """The stock-guarded statement matched no row: the requested quantity did not fit."""
+    return ValidationError(
+        f"Insufficient stock: available {available}, requested {requested}", field="quantity"
+    )
+
+
+def _commit_returning(item: CartItem | None) -> CartItem | None:
+    """Commit, handing back the RETURNING row detached so reading it needs no reload."""
+    if item is not None:
+        db.session.expunge(item)
     db.session.commit()
-    db.session.refresh(item)
     return item
 
 
+def add_item(user_id: int, product_id: int, quantity: int = 1) -> CartItem:
+    """Add or update quantity; validate stock. Raise ProductNotFoundError or ValidationError.
+
+    One atomic upsert statement, so concurrent adds of the same product sum up
+    instead of racing the (user_id, product_id) unique constraint.
+    """
+    if quantity < 1:
+        raise ValidationError("Quantity must be at least 1", field="quantity")
+    item = db.session.scalars(
+        _upsert_statement(user_id, product_id, quantity),
+        execution_options={"populate_existing": True},
+    ).first()
+    if item is None:
+        db.session.rollback()
+        product = _verify_product_exists(product_id)
+        in_cart = db.session.query(CartItem.quantity).filter_by(
+            user_id=user_id, product_id=product_id
+        ).scalar() or 0
+        raise _insufficient_stock(product.stock, in_cart + quantity)
+    return _commit_returning(item)
+
+
 def update_quantity(user_id: int, cart_item_id: int, quantity: int) -> CartItem | None:
-    """Update cart item quantity; if 0, remove. Return item or None if removed."""
-    item = CartItem.query.filter_by(id=cart_item_id, user_id=user_id).first()
-    if not item:
-        return None
+    """Update cart item quantity; if 0, remove. Return item or None if removed.
+
+    The stock check is part of the UPDATE's WHERE clause (one statement).
+    """
     if quantity <= 0:
-        db.session.delete(item)
-        db.session.commit()
+        remove_item(user_id, cart_item_id)
         return None
-    CartValidator.validate_quantity(quantity, item.product.stock)
-    item.quantity = quantity
-    db.session.commit()
-    db.session.refresh(item)
-    return item
+    item = db.session.scalars(
+        update(CartItem)
+        .where(
+            CartItem.id == cart_item_id,
+            CartItem.user_id == user_id,
+            _line_stock() >= quantity,
+        )
+        .values(quantity=quantity, updated_at=datetime.utcnow())
+        .returning(CartItem),
+        execution_options={"populate_existing": True},
+    ).first()
+    if item is None:
+        db.session.rollback()
+        existing = CartItem.query.filter_by(id=cart_item_id, user_id=user_id).first()
+        if not existing:
+            return None
+        raise _insufficient_stock(existing.product.stock, quantity)
+    return _commit_returning(item)
 
 
 def remove_item(user_id: int, cart_item_id: int) -> bool:
@@ -72,3 +161,63 @@ def clear_cart(user_id: int) -> None:
     """Remove all cart items for user."""
     CartItem.query.filter_by(user_id=user_id).delete()
     db.session.commit()
+
+
+def bulk_update(user_id: int, ops: List[CartBulkOp]) -> dict:
+    """Apply ``(product_id, quantity, op)`` changes to the cart in one transaction.
+
+    ``op`` is "set" (quantity 0 removes the line), "add" or "remove"; ops run in
+    order, so several may target one product. Products and the user's current
+    lines are read with one joined query and every resulting quantity is checked
+    against stock before anything is written: the batch applies completely or
+    not at all. Writes are one DELETE plus one executemany upsert. Returns the
+    updated cart (``get_cart``).
+    """
+    product_ids = {op.product_id for op in ops}
+    rows = (
+        db.session.query(Product.id, Product.stock, CartItem.id, CartItem.quantity)
+        .outerjoin(CartItem, and_(CartItem.product_id == Product.id, CartItem.user_id == user_id))
+        .filter(Product.id.in_(product_ids))
+        .all()
+    )
+    stock = {pid: available for pid, available, _, _ in rows}
+    missing = product_ids - stock.keys()
+    if missing:
+        raise ProductNotFoundError(min(missing))
+    lines = {pid: line_id for pid, _, line_id, _ in rows if line_id is not None}
+    target = {pid: quantity for pid, _, line_id, quantity in rows if line_id is not None}
+    for op in ops:
+        current = target.get(op.product_id, 0)
+        if op.op == "remove":
+            target[op.product_id] = 0
+        elif op.op == "add":
+            target[op.product_id] = current + op.quantity
+        else:
+            target[op.product_id] = op.quantity
+
+    for pid in sorted(product_ids):
+        if target.get(pid, 0) > 0:
+            try:
+                CartValidator.validate_quantity(target[pid], stock[pid])
+            except ValidationError as e:
+                raise ValidationError(f"Product {pid}: {e.message}", field="items")
+
+    now = datetime.utcnow()
+    removed = [lines[pid] for pid, q in target.items() if q <= 0 and pid in lines]
+    upserts = [
+        {"user_id": user_id, "product_id": pid, "quantity": q, "created_at": now, "updated_at": now}
+        for pid, q in target.items() if q > 0 and pid in product_ids
+    ]
+    if removed:
+        db.session.execute(delete(CartItem).where(CartItem.id.in_(removed)))
+    if upserts:
+        stmt = _insert()
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CartItem.user_id, CartItem.product_id],
+                set_={"quantity": stmt.excluded.quantity, "updated_at": stmt.excluded.updated_at},
+            ),
+            upserts,
+        )
+    db.session.commit()
+    return get_cart(user_id)
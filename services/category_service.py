@@ -1,11 +1,15 @@
-"""Category service: CRUD and list."""
+"""Category service: CRUD, list, tree. Maintains the category_closure hierarchy index."""
+
+from typing import List, Optional
+
+from sqlalchemy import delete as sql_delete, insert, literal, select, true
 
-from typing import List
 from database import db
-from models import Category
+from models import Category, CategoryClosure
 from schemas import CategoryCreate, CategoryUpdate, CategoryResponse
-from exceptions import CategoryNotFoundError
+from exceptions import CategoryNotFoundError, ValidationError
 from services.base_service import BaseService
+from services.product_service import TAG_CATEGORIES, invalidate_listing_cache
 
 
 def get_all() -> List[Category]:
@@ -21,28 +25,144 @@ def get_by_id(category_id: int) -> Category:
     return cat
 
 
+def subtree_ids_query(category_id: int):
+    """SELECT of every category id under ``category_id`` (inclusive), via the closure table."""
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+def get_tree(root_id: Optional[int] = None) -> list[dict]:
+    """Return the category forest (or one subtree) as nested dicts, from a single query."""
+    q = Category.query
+    if root_id is not None:
+        get_by_id(root_id)
+        q = q.join(CategoryClosure, CategoryClosure.descendant_id == Category.id).filter(
+            CategoryClosure.ancestor_id == root_id
+        )
+    cats = q.order_by(Category.name).all()
+    nodes = {
+        c.id: {**CategoryResponse.model_validate(c).model_dump(), "children": []} for c in cats
+    }
+    roots = []
+    for c in cats:
+        parent = nodes.get(c.parent_id)
+        if parent is not None and c.id != root_id:
+            parent["children"].append(nodes[c.id])
+        else:
+            roots.append(nodes[c.id])
+    return roots
+
+
+def _link_to_parent(category_id: int, parent_id: Optional[int]) -> None:
+    """Insert closure rows for a new leaf: self at depth 0 plus every ancestor of parent."""
+    db.session.execute(
+        insert(CategoryClosure).values(ancestor_id=category_id, descendant_id=category_id, depth=0)
+    )
+    if parent_id is not None:
+        db.session.execute(
+            insert(CategoryClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(
+                    CategoryClosure.ancestor_id,
+                    literal(category_id),
+                    CategoryClosure.depth + 1,
+                ).where(CategoryClosure.descendant_id == parent_id),
+            )
+        )
+
+
+def _move_subtree(category_id: int, new_parent_id: Optional[int]) -> None:
+    """Re-hang the subtree rooted at ``category_id`` under ``new_parent_id`` (None = root)."""
+    subtree = subtree_ids_query(category_id)
+    # Cut links from old ancestors into the subtree; links inside the subtree stay.
+    db.session.execute(
+        sql_delete(CategoryClosure)
+        .where(CategoryClosure.descendant_id.in_(subtree))
+        .where(CategoryClosure.ancestor_id.notin_(subtree))
+        .execution_options(synchronize_session=False)
+    )
+    if new_parent_id is None:
+        return
+    above = select(CategoryClosure.ancestor_id, CategoryClosure.depth).where(
+        CategoryClosure.descendant_id == new_parent_id
+    ).subquery()
+    below = select(CategoryClosure.descendant_id, CategoryClosure.depth).where(
+        CategoryClosure.ancestor_id == category_id
+    ).subquery()
+    db.session.execute(
+        insert(CategoryClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+            .select_from(above)
+            .join(below, true()),
+        )
+    )
+
+
+def rebuild_closure() -> int:
+    """Rebuild category_closure from parent_id links; return number of rows written."""
+    parents = dict(db.session.query(Category.id, Category.parent_id).all())
+    rows = []
+    for cat_id in parents:
+        node, depth, seen = cat_id, 0, set()
+        while node is not None and node not in seen:
+            seen.add(node)
+            rows.append({"ancestor_id": node, "descendant_id": cat_id, "depth": depth})
+            node, depth = parents.get(node), depth + 1
+    db.session.execute(sql_delete(CategoryClosure))
+    if rows:
+        db.session.execute(insert(CategoryClosure), rows)
+    db.session.commit()
+    invalidate_listing_cache(TAG_CATEGORIES)
+    return len(rows)
+
+
 def create(data: CategoryCreate) -> Category:
     """Create category."""
+    if data.parent_id is not None:
+        get_by_id(data.parent_id)
     cat = Category(name=data.name.strip(), parent_id=data.parent_id)
     db.session.add(cat)
+    db.session.flush()
+    _link_to_parent(cat.id, cat.parent_id)
     db.session.commit()
+    invalidate_listing_cache(TAG_CATEGORIES)
     db.session.refresh(cat)
     return cat
 
 
 def update(category_id: int, data: CategoryUpdate) -> Category:
-    """Update category."""
+    """Update category; re-parenting moves the whole subtree."""
     cat = get_by_id(category_id)
     payload = data.model_dump(exclude_unset=True)
+    new_parent_id = payload.get("parent_id", cat.parent_id)
+    moved = new_parent_id != cat.parent_id
+    if moved and new_parent_id is not None:
+        get_by_id(new_parent_id)
+        in_subtree = db.session.execute(
+            subtree_ids_query(category_id).where(CategoryClosure.descendant_id == new_parent_id)
+        ).first()
+        if in_subtree:
+            raise ValidationError("A category cannot be moved under itself", field="parent_id")
     for k, v in payload.items():
         setattr(cat, k, v)
+    if moved:
+        _move_subtree(category_id, new_parent_id)
     db.session.commit()
+    invalidate_listing_cache(TAG_CATEGORIES)
     db.session.refresh(cat)
     return cat
 
 
 def delete(category_id: int) -> None:
-    """Delete category."""
+    """Delete category; its children become top-level categories."""
     cat = get_by_id(category_id)
+    for child in list(cat.children):
+        _move_subtree(child.id, None)
+    db.session.execute(
+        sql_delete(CategoryClosure)
+        .where((CategoryClosure.ancestor_id == category_id) | (CategoryClosure.descendant_id == category_id))
+        .execution_options(synchronize_session=False)
+    )
     db.session.delete(cat)
     db.session.commit()
+    invalidate_listing_cache(TAG_CATEGORIES)
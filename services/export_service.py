@@ -0,0 +1,97 @@
+"""Export service: stream the product catalog as NDJSON or CSV.
+
+Rows are read with ``yield_per`` (a server-side cursor where the driver supports
+it) and encoded batch by batch, so memory stays flat however large the catalog.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from database import db
+from exceptions import ValidationError
+from models import CategoryClosure, Product
+
+FORMATS = ("ndjson", "csv")
+BATCH_SIZE = 1000
+FIELDS = (
+    "id", "sku", "name", "description", "price", "stock", "category_id", "is_active",
+    "rating_avg", "rating_count", "created_at", "updated_at",
+)
+
+
+def parse_since(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO-8601 ``updated_since`` value; raise ValidationError if malformed.
+
+    Offsets (``Z``, ``+02:00``) are converted to naive UTC, as stored in the
+    timestamp columns; values without one are taken as UTC.
+    """
+    if not value:
+        return None
+    try:
+        since = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValidationError("updated_since must be an ISO-8601 datetime", field="updated_since")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def _rows(category_id: Optional[int], updated_since: Optional[datetime]) -> Iterator[dict]:
+    stmt = select(*(getattr(Product, f) for f in FIELDS)).order_by(Product.id)
+    if category_id is not None:
+        stmt = stmt.join(
+            CategoryClosure,
+            (CategoryClosure.descendant_id == Product.category_id)
+            & (CategoryClosure.ancestor_id == category_id),
+        )
+    if updated_since is not None:
+        stmt = stmt.where(Product.updated_at >= updated_since)
+    result = db.session.execute(stmt.execution_options(yield_per=BATCH_SIZE))
+    for row in result.mappings():
+        yield {
+            **row,
+            "price": str(row["price"]),
+            "created_at": row["created_at"].isoformat(),
+            "updated_at": row["updated_at"].isoformat(),
+        }
+
+
+def export_products(
+    fmt: str = "ndjson",
+    category_id: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+) -> Iterator[str]:
+    """Return an iterator over the encoded export, in chunks of BATCH_SIZE rows.
+
+    Arguments are validated up front; the query only runs once iteration starts.
+    CSV output starts with a header row.
+    """
+    if fmt not in FORMATS:
+        raise ValidationError(f"format must be one of: {', '.join(FORMATS)}", field="format")
+    return _encode(_rows(category_id, updated_since), fmt)
+
+
+def _encode(rows: Iterator[dict], fmt: str) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDS) if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+    n = 0
+    for row in rows:
+        if writer:
+            writer.writerow(row)
+        else:
+            buf.write(json.dumps(row, separators=(",", ":")))
+            buf.write("\n")
+        n += 1
+        if n % BATCH_SIZE == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
@@ -0,0 +1,139 @@
+"""Image store: content-addressed, deduplicated storage for uploaded images.
+
+An upload is streamed in CHUNK_SIZE pieces through SHA-256 into a temp file in
+the upload folder, then moved to ``<digest[:2]>/<digest>.<ext>``. Identical bytes
+are stored once whatever the client filename. ``stored_images.ref_count`` counts
+the ProductImage rows pointing at a file; the file is deleted when the last one
+goes. Names never change content, so their URLs can be cached as immutable.
+
+A row at ref_count 0 is only deleted by ``purge``, with a conditional DELETE
+that holds the row until the file is unlinked and the transaction commits.
+``store`` takes its reference on the same row, so a concurrent upload of the
+same bytes either revives the row first (and purge leaves the file alone) or
+waits for the purge and writes the file again.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import IO, Iterable
+
+from flask import current_app
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import StoredImage
+
+CHUNK_SIZE = 64 * 1024
+
+
+def upload_folder() -> str:
+    """Absolute path of the upload directory (UPLOAD_FOLDER, default ./uploads)."""
+    return os.path.abspath(current_app.config.get("UPLOAD_FOLDER") or "uploads")
+
+
+def relative_path(digest: str, ext: str) -> str:
+    return f"{digest[:2]}/{digest}.{ext}"
+
+
+def url_for_digest(digest: str, ext: str) -> str:
+    return f"/uploads/{relative_path(digest, ext)}"
+
+
+def _hash_to_temp(stream: IO[bytes], directory: str) -> tuple[str, str, int]:
+    """Copy ``stream`` into a temp file while hashing; return (temp path, digest, size)."""
+    sha = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := stream.read(CHUNK_SIZE):
+                sha.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp, sha.hexdigest(), size
+
+
+def store(stream: IO[bytes], ext: str) -> StoredImage:
+    """Store an upload (deduplicated) and take one reference to it.
+
+    The reference is flushed, not committed: the caller commits it together
+    with the ProductImage row that uses it.
+    """
+    root = upload_folder()
+    os.makedirs(root, exist_ok=True)
+    tmp, digest, size = _hash_to_temp(stream, root)
+    try:
+        if not _take_reference(digest):
+            try:
+                with db.session.begin_nested():
+                    db.session.add(StoredImage(digest=digest, ext=ext.lower(), size=size, ref_count=1))
+            except IntegrityError:  # stored concurrently by another request
+                _take_reference(digest)
+        stored = db.session.get(StoredImage, digest, populate_existing=True)
+        path = os.path.join(root, relative_path(digest, stored.ext))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return stored
+
+
+def _take_reference(digest: str) -> bool:
+    """Add one reference to an existing row (locking it); False if there is no row."""
+    result = db.session.execute(
+        update(StoredImage)
+        .where(StoredImage.digest == digest)
+        .values(ref_count=StoredImage.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def release(digests: Iterable[str]) -> list[str]:
+    """Drop one reference per digest.
+
+    Does not commit. Returns the digests left unreferenced; pass them to
+    ``purge`` after the commit.
+    """
+    unreferenced = []
+    for digest in digests:
+        count = db.session.execute(
+            update(StoredImage)
+            .where(StoredImage.digest == digest)
+            .values(ref_count=StoredImage.ref_count - 1)
+            .returning(StoredImage.ref_count)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if count is not None and count <= 0:
+            unreferenced.append(digest)
+    return unreferenced
+
+
+def purge(digests: Iterable[str]) -> None:
+    """Delete rows and files of ``digests`` that are still unreferenced, then commit.
+
+    The conditional DELETE re-checks ref_count under the row lock, so a digest
+    re-referenced since ``release`` is kept; the lock is held until the file is
+    gone. Missing files are ignored.
+    """
+    root = upload_folder()
+    for digest in digests:
+        ext = db.session.execute(
+            delete(StoredImage)
+            .where(StoredImage.digest == digest, StoredImage.ref_count <= 0)
+            .returning(StoredImage.ext)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if ext is not None:
+            try:
+                os.unlink(os.path.join(root, relative_path(digest, ext)))
+            except FileNotFoundError:
+                pass
+    db.session.commit()
@@ -0,0 +1,174 @@
+"""Import service: streaming bulk product upsert from CSV or NDJSON.
+
+Rows are parsed lazily and processed in chunks: each chunk is validated with
+ProductCreate, checked against categories and existing SKUs with one set lookup
+each, then written as one executemany INSERT (new SKUs) and one executemany
+UPDATE (existing SKUs, only the columns present in the row) and committed. Derived indexes are refreshed per chunk
+(search) or once at the end (autocomplete, similarity, listing caches).
+"""
+
+import codecs
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import insert, update
+
+from database import db
+from exceptions import ValidationError
+from models import Category, Product
+from schemas import ProductCreate
+from services import product_service, search_index, similarity_service, suggest_index
+from utils.responses import field_errors
+
+FORMATS = ("csv", "ndjson")
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+# Above this many changed products, similar lists are rebuilt wholesale
+_SIMILARITY_REFRESH_LIMIT = 1000
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Guess "csv" / "ndjson" from a filename extension or content type."""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or (content_type or "").startswith("text/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return None
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[dict[str, Any]]:
+    """Yield raw row dicts from a binary stream without reading it all into memory."""
+    if fmt not in FORMATS:
+        raise ValidationError(f"format must be one of: {', '.join(FORMATS)}", field="format")
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = {"__error__": f"Invalid JSON: {e.msg}"}
+        yield row if isinstance(row, dict) else {"__error__": "Expected a JSON object"}
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[tuple[int, dict]]]:
+    numbered = enumerate(rows, start=1)
+    while chunk := list(islice(numbered, size)):
+        yield chunk
+
+
+def _validate(row_no: int, row: dict, report: dict) -> Optional[ProductCreate]:
+    if "__error__" in row:
+        return _fail(report, row_no, None, [{"field": None, "message": row["__error__"]}])
+    # CSV gives "" for empty cells: treat as unset so schema defaults apply
+    cleaned = {k: v for k, v in row.items() if k is not None and v not in ("", None)}
+    try:
+        return ProductCreate.model_validate(cleaned)
+    except PydanticValidationError as e:
+        return _fail(report, row_no, cleaned.get("sku"), field_errors(e))
+
+
+def _fail(report: dict, row_no: int, sku: Optional[str], errors: list[dict]) -> None:
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row_no, "sku": sku, "errors": errors})
+    else:
+        report["errors_truncated"] = True
+    return None
+
+
+def _import_chunk(chunk: list[tuple[int, dict]], known_categories: set[int], report: dict) -> list[int]:
+    """Validate and upsert one chunk in one transaction; return ids of products written."""
+    valid: dict[str, tuple[int, ProductCreate]] = {}
+    for row_no, row in chunk:
+        data = _validate(row_no, row, report)
+        if data is not None:
+            valid[data.sku.strip()] = (row_no, data)  # a repeated SKU: last row wins
+
+    wanted = {d.category_id for _, d in valid.values()} - known_categories
+    if wanted:
+        known_categories.update(
+            cid for (cid,) in db.session.query(Category.id).filter(Category.id.in_(wanted))
+        )
+    for sku, (row_no, data) in list(valid.items()):
+        if data.category_id not in known_categories:
+            _fail(report, row_no, sku, [{"field": "category_id", "message": f"Category {data.category_id} not found"}])
+            del valid[sku]
+    if not valid:
+        return []
+
+    existing = dict(db.session.query(Product.sku, Product.id).filter(Product.sku.in_(list(valid))))
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for sku, (_, data) in valid.items():
+        values = {
+            "name": data.name.strip(),
+            "description": data.description.strip() if data.description else None,
+            "price": data.price,
+            "stock": data.stock,
+            "sku": sku,
+            "category_id": data.category_id,
+            "is_active": data.is_active,
+            "updated_at": now,
+        }
+        if sku in existing:
+            # only the columns present in the row; omitted ones keep their current value
+            present = data.model_fields_set | {"sku"}
+            updates.append({"id": existing[sku], **{k: v for k, v in values.items() if k in present or k == "updated_at"}})
+        else:
+            inserts.append(values)
+    if inserts:
+        db.session.execute(insert(Product), inserts)
+    if updates:
+        db.session.execute(update(Product), updates)
+    written = db.session.query(Product.id, Product.name, Product.description).filter(
+        Product.sku.in_(list(valid))
+    ).all()
+    search_index.index_products(written)
+    db.session.commit()
+    report["created"] += len(inserts)
+    report["updated"] += len(updates)
+    return [pid for pid, _, _ in written]
+
+
+def import_products(
+    rows: Iterable[dict],
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Upsert products (keyed by SKU) from raw row dicts; return a per-row report.
+
+    The report counts processed/created/updated/failed rows and lists failures as
+    ``{"row", "sku", "errors": [{"field", "message"}]}`` (first MAX_REPORTED_ERRORS).
+    ``progress`` is called with the running report after each chunk.
+    """
+    report = {"processed": 0, "created": 0, "updated": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    known_categories: set[int] = set()
+    changed: list[int] = []
+    for chunk in _chunks(rows, chunk_size):
+        try:
+            changed.extend(_import_chunk(chunk, known_categories, report))
+        except Exception:
+            db.session.rollback()
+            raise
+        report["processed"] += len(chunk)
+        if progress:
+            progress(report)
+
+    if changed:
+        product_service.invalidate_listing_cache()
+        suggest_index.reset()
+        if len(changed) > _SIMILARITY_REFRESH_LIMIT:
+            similarity_service.schedule_rebuild()
+        else:
+            similarity_service.schedule_refresh(changed)
+    return report
@@ -2,38 +2,56 @@
 
 import uuid
 from decimal import Decimal
-from typing import List
+
+from sqlalchemy import bindparam, delete, insert, select, update
 
 from database import db
 from models import Order, OrderItem, CartItem, Product
 from exceptions import OrderNotFoundError, ValidationError
 from validators import OrderValidator
 from services.base_service import BaseService
+from services.product_service import invalidate_products
+from services import suggest_index
 from models import User
 from config.mail import mail
 from flask_mail import Message
 from flask import current_app
 
 
-def _get_cart_items(user_id: int) -> List[CartItem]:
-    """Return cart items for user; raise ValidationError if empty."""
-    items = CartItem.query.filter_by(user_id=user_id).all()
-    OrderValidator.validate_cart_not_empty(items)
-    return items
+def _lock_cart_lines(user_id: int) -> list:
+    """Cart lines joined to their products in one query; rows are locked where supported.
 
+    Returns rows with product_id, quantity, price, stock and name, ordered by
+    product id so concurrent checkouts take row locks in the same order.
+    """
+    return (
+        db.session.query(
+            CartItem.product_id,
+            CartItem.quantity,
+            Product.price,
+            Product.stock,
+            Product.name,
+        )
+        .join(Product, Product.id == CartItem.product_id)
+        .filter(CartItem.user_id == user_id)
+        .order_by(CartItem.product_id)
+        .with_for_update(of=Product)
+        .all()
+    )
 
-def _verify_cart_stock(cart_items: List[CartItem]) -> None:
-    """Raise ValidationError if any cart item exceeds product stock."""
-    OrderValidator.validate_cart_stock(cart_items)
 
+def _orphaned_lines(user_id: int) -> list[int]:
+    """Product ids of the user's cart lines whose product no longer exists.
 
-def _calculate_cart_total(cart_items: List[CartItem]) -> Decimal:
-    """Return total price of all cart items."""
-    total = Decimal("0")
-    for ci in cart_items:
-        product = db.session.get(Product, ci.product_id)
-        total += product.price * ci.quantity
-    return total
+    ``_lock_cart_lines`` inner-joins (Postgres cannot lock the nullable side of an
+    outer join), so such lines would otherwise be dropped from the order silently.
+    """
+    return db.session.scalars(
+        select(CartItem.product_id)
+        .outerjoin(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == user_id, Product.id.is_(None))
+        .order_by(CartItem.product_id)
+    ).all()
 
 
 def _generate_payment_intent_id() -> str:
@@ -54,48 +72,82 @@ def _create_order_object(user_id: int, total: Decimal, payment_intent_id: str) -
     return order
 
 
-def _create_order_items_from_cart(order: Order, cart_items: List[CartItem]) -> None:
-    """Create OrderItem rows from cart items and add to session."""
-    for ci in cart_items:
-        product = db.session.get(Product, ci.product_id)
-        oi = OrderItem(
-            order_id=order.id,
-            product_id=product.id,
-            quantity=ci.quantity,
-            price=product.price,
-        )
-        db.session.add(oi)
+def _decrement_product_stock(lines: list) -> None:
+    """Take each line's quantity from stock with a conditional UPDATE.
 
+    ``UPDATE products SET stock = stock - :q ... WHERE id = :id AND stock >= :q``
+    matches no row when the stock is gone, which raises ValidationError; the
+    caller rolls back, so nothing of the order is kept.
+    """
+    for line in lines:
+        result = db.session.execute(
+            update(Product)
+            .where(Product.id == line.product_id, Product.stock >= line.quantity)
+            .values(
+                stock=Product.stock - line.quantity,
+                sold_count=Product.sold_count + line.quantity,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise ValidationError(
+                f"Insufficient stock for product {line.product_id}", field="stock"
+            )
 
-def _decrement_product_stock(cart_items: List[CartItem]) -> None:
-    """Decrement stock for each product in cart items."""
-    for ci in cart_items:
-        product = db.session.get(Product, ci.product_id)
-        product.stock -= ci.quantity
 
+def create_order(user_id: int, payment_intent_id: str | None = None) -> Order:
+    """Create order from cart; decrement stock, clear cart. Uses provided intent or simulates.
 
-def _clear_user_cart(user_id: int) -> None:
-    """Remove all cart items for user."""
-    CartItem.query.filter_by(user_id=user_id).delete()
+    Set-based and oversell-safe: one query reads the cart with its products
+    (``SELECT ... FOR UPDATE`` on Postgres), then each product's stock is taken
+    with a conditional decrement, order items are inserted in one executemany and
+    the cart is cleared with one DELETE, all in one transaction. If any decrement
+    finds less stock than ordered (another checkout got there first), the whole
+    order is rolled back and ValidationError is raised; stock never goes negative.
+    A cart line whose product has been deleted is rejected up front rather than
+    left out of the order.
+    """
+    OrderValidator.validate_products_exist(_orphaned_lines(user_id))
+    lines = _lock_cart_lines(user_id)
+    OrderValidator.validate_cart_not_empty(lines)
+    try:
+        OrderValidator.validate_cart_stock(lines)
+        total = sum((line.price * line.quantity for line in lines), Decimal("0"))
+        if not payment_intent_id:
+            payment_intent_id = _generate_payment_intent_id()
 
+        order = _create_order_object(user_id, total, payment_intent_id)
+        _decrement_product_stock(lines)
+        db.session.execute(
+            insert(OrderItem),
+            [
+                {
+                    "order_id": order.id,
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                    "price": line.price,
+                }
+                for line in lines
+            ],
+        )
+        db.session.execute(
+            delete(CartItem).where(
+                CartItem.user_id == user_id,
+                CartItem.product_id.in_([line.product_id for line in lines]),
+            )
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate_products([line.product_id for line in lines], stock_changed=True)
+    suggest_index.record_sales((line.product_id, line.quantity) for line in lines)
+    _send_confirmation(user_id, order, lines, total)
+    return order
 
-def create_order(user_id: int, payment_intent_id: str | None = None) -> Order:
-    """Create order from cart; decrement stock, clear cart. Uses provided intent or simulates."""
-    cart_items = _get_cart_items(user_id)
-    _verify_cart_stock(cart_items)
-    total = _calculate_cart_total(cart_items)
-    if not payment_intent_id:
-        payment_intent_id = _generate_payment_intent_id()
-
-    order = _create_order_object(user_id, total, payment_intent_id)
-    _create_order_items_from_cart(order, cart_items)
-    _decrement_product_stock(cart_items)
-    _clear_user_cart(user_id)
 
-    db.session.commit()
-    db.session.refresh(order)
-    
-    # Send Order Confirmation Email
+def _send_confirmation(user_id: int, order: Order, lines: list, total: Decimal) -> None:
+    """Send the order confirmation email; failures are logged, not raised."""
     user = db.session.get(User, user_id)
     if user and user.email:
         msg = Message(
@@ -106,12 +158,11 @@ def create_order(user_id: int, payment_intent_id: str | None = None) -> Order:
         
         # Build Item rows
         items_html = ""
-        for ci in cart_items:
-            product = db.session.get(Product, ci.product_id)
+        for line in lines:
             items_html += f"""
             <tr>
-                <td style="padding: 10px; border-bottom: 1px solid #eee;">{product.name} x {ci.quantity}</td>
-                <td style="padding: 10px; border-bottom: 1px solid #eee; text-align: right;">${(product.price * ci.quantity):,.2f}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #eee;">{line.name} x {line.quantity}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #eee; text-align: right;">${(line.price * line.quantity):,.2f}</td>
             </tr>
             """
             
@@ -138,17 +189,23 @@ def create_order(user_id: int, payment_intent_id: str | None = None) -> Order:
             mail.send(msg)
         except Exception as e:
             current_app.logger.error(f"Failed to send order confirmation email: {e}")
-            
-    return order
 
 
-def get_user_orders(user_id: int, page: int = 1, per_page: int = 20) -> dict:
-    """List orders for user; paginated."""
+def get_user_orders(
+    user_id: int,
+    page: int = 1,
+    per_page: int = 20,
+    cursor: str | None = None,
+    with_count: bool = True,
+) -> dict:
+    """List orders for user; paginated (keyset mode when ``cursor`` is not None)."""
     per_page = min(per_page, 100)
-    q = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc())
-    total = q.count()
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
-    pagination = BaseService.pagination_dict(total, page, per_page)
+    q = Order.query.filter_by(user_id=user_id)
+    if cursor is not None:
+        items, pagination = BaseService.keyset_paginate(q, Order, per_page, cursor, with_count)
+    else:
+        q = q.order_by(Order.created_at.desc(), Order.id.desc())
+        items, pagination = BaseService.paginate(q, page, per_page, with_count)
     return {"orders": items, **pagination}
 
 
@@ -163,22 +220,66 @@ def get_by_id(order_id: int, user_id: int | None = None, admin: bool = False) ->
 
 
 def update_status(order_id: int, status: str) -> Order:
-    """Admin: update order status. Valid: pending, processing, shipped, delivered, cancelled."""
+    """Admin: update order status. Valid: pending, processing, shipped, delivered, cancelled.
+
+    "cancelled" goes through ``cancel_order`` (stock and sold_count restored); a
+    cancelled order cannot be moved back to another status.
+    """
     valid = {"pending", "processing", "shipped", "delivered", "cancelled"}
-    if status.lower() not in valid:
+    status = status.lower()
+    if status not in valid:
         raise ValidationError(f"Invalid status; use one of {valid}", field="status")
+    if status == "cancelled":
+        return cancel_order(order_id)
     order = get_by_id(order_id, admin=True)
-    order.status = status.lower()
+    if order.status == "cancelled":
+        raise ValidationError("Cannot change the status of a cancelled order", field="status")
+    order.status = status
+    db.session.commit()
+    db.session.refresh(order)
+    return order
+
+
+def cancel_order(order_id: int) -> Order:
+    """Admin: cancel an order, putting its quantities back into stock and out of sold_count.
+
+    Raise OrderNotFoundError, or ValidationError if the order is already
+    cancelled or delivered. One executemany UPDATE for the products.
+    """
+    order = get_by_id(order_id, admin=True)
+    if order.status in ("cancelled", "delivered"):
+        raise ValidationError(f"Cannot cancel an order with status '{order.status}'", field="status")
+    lines = [(oi.product_id, oi.quantity) for oi in order.order_items if oi.product_id is not None]
+    if lines:
+        db.session.execute(
+            update(Product.__table__)
+            .where(Product.__table__.c.id == bindparam("pid"))
+            .values(
+                stock=Product.__table__.c.stock + bindparam("quantity"),
+                sold_count=Product.__table__.c.sold_count - bindparam("quantity"),
+            ),
+            [{"pid": pid, "quantity": quantity} for pid, quantity in lines],
+        )
+    order.status = "cancelled"
     db.session.commit()
+    invalidate_products([pid for pid, _ in lines], stock_changed=True)
+    suggest_index.record_sales((pid, -quantity) for pid, quantity in lines)
     db.session.refresh(order)
     return order
 
 
-def get_all_orders_admin(page: int = 1, per_page: int = 20) -> dict:
-    """Admin: list all orders."""
+def get_all_orders_admin(
+    page: int = 1,
+    per_page: int = 20,
+    cursor: str | None = None,
+    with_count: bool = True,
+) -> dict:
+    """Admin: list all orders (keyset mode when ``cursor`` is not None)."""
     per_page = min(per_page, 100)
-    q = Order.query.order_by(Order.created_at.desc())
-    total = q.count()
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
-    pagination = BaseService.pagination_dict(total, page, per_page)
+    q = Order.query
+    if cursor is not None:
+        items, pagination = BaseService.keyset_paginate(q, Order, per_page, cursor, with_count)
+    else:
+        q = q.order_by(Order.created_at.desc(), Order.id.desc())
+        items, pagination = BaseService.paginate(q, page, per_page, with_count)
     return {"orders": items, **pagination}
@@ -1,18 +1,70 @@
-"""Product service: CRUD, full search, pagination, image upload."""
+"""Product service: CRUD, full search, pagination, facets, cached listings, image upload."""
 
+import hashlib
+import json
+from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
-from sqlalchemy import func
+from typing import IO, Iterable, List, Optional
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import case, func, or_, update as sql_update
+from sqlalchemy.orm import selectinload
 
 from database import db
-from models import Product, ProductImage, Category, Review
-from schemas import ProductCreate, ProductUpdate
-from exceptions import ProductNotFoundError, CategoryNotFoundError, DuplicateSKUError
+from models import Product, ProductImage, Category, CategoryClosure
+from schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductImageResponse,
+    ProductBulkUpdateItem,
+    dump_products,
+)
+from exceptions import (
+    ProductNotFoundError,
+    CategoryNotFoundError,
+    DuplicateSKUError,
+    ValidationError,
+)
 from services.base_service import BaseService
+from services import image_store, search_index, similarity_service, suggest_index
+from utils.cache import app_cache, filter_signature
+from utils.responses import field_errors
+
+# Facet price ranges: [low, high); None = open-ended
+PRICE_BUCKETS: list[tuple[Decimal, Optional[Decimal]]] = [
+    (Decimal("0"), Decimal("25")),
+    (Decimal("25"), Decimal("50")),
+    (Decimal("50"), Decimal("100")),
+    (Decimal("100"), Decimal("250")),
+    (Decimal("250"), None),
+]
+
+# Listing/facet cache tags. Every entry carries TAG_LISTINGS plus product:<id> for
+# each product it shows; rating/category/stock tags mark entries whose filters or
+# counts depend on that data, so writes can drop just the entries they affect.
+TAG_LISTINGS = "products:list"
+TAG_RATINGS = "products:ratings"
+TAG_STOCK = "products:stock"
+TAG_CATEGORIES = "categories"
+_CACHES = ("product_listings", "product_facets")
+
+
+# sort= value -> ORDER BY; each is backed by an (is_active, <key>, id) index
+SORT_OPTIONS = {
+    "newest": (Product.created_at.desc(), Product.id.desc()),
+    "price_asc": (Product.price.asc(), Product.id.asc()),
+    "price_desc": (Product.price.desc(), Product.id.desc()),
+    "rating": (Product.rating_avg.desc().nulls_last(), Product.id.desc()),
+    "popularity": (Product.sold_count.desc(), Product.id.desc()),
+}
+
+# expand= values: Product relationships batch-loaded with the page (see serialize)
+EXPANDABLE = ("images", "category")
 
 
 def _build_query(
     search: Optional[str] = None,
+    fuzzy: bool = False,
     category_id: Optional[int] = None,
     subcategory_id: Optional[int] = None,
     min_price: Optional[float] = None,
@@ -20,17 +72,22 @@ def _build_query(
     min_rating: Optional[float] = None,
     in_stock_only: bool = False,
 ):
-    """Build product query with filters (private helper)."""
+    """Build product query with filters (private helper); search results come relevance-ordered.
+
+    ``fuzzy`` switches ``search`` to typo-tolerant trigram matching (similarity-ordered).
+    """
     q = Product.query.filter(Product.is_active == True)
-    if search:
-        q = q.filter(Product.name.ilike(f"%{search}%") | Product.description.ilike(f"%{search}%"))
-    
+    q = search_index.apply_fuzzy(q, search) if fuzzy else search_index.apply(q, search)
+
     if subcategory_id is not None:
         q = q.filter(Product.category_id == subcategory_id)
     elif category_id is not None:
-        # Fetching categories directly linked or those that are subcategories of this parent
-        subcats = db.session.query(Category.id).filter(Category.parent_id == category_id).subquery()
-        q = q.filter((Product.category_id == category_id) | Product.category_id.in_(subcats))
+        # Whole subtree at any depth: one join on the closure table's (ancestor, descendant) key
+        q = q.join(
+            CategoryClosure,
+            (CategoryClosure.descendant_id == Product.category_id)
+            & (CategoryClosure.ancestor_id == category_id),
+        )
     if min_price is not None:
         q = q.filter(Product.price >= Decimal(str(min_price)))
     if max_price is not None:
@@ -38,13 +95,7 @@ def _build_query(
     if in_stock_only:
         q = q.filter(Product.stock > 0)
     if min_rating is not None:
-        subq = (
-            db.session.query(Review.product_id, func.avg(Review.rating).label("avg_rating"))
-            .group_by(Review.product_id)
-            .having(func.avg(Review.rating) >= min_rating)
-            .subquery()
-        )
-        q = q.join(subq, Product.id == subq.c.product_id)
+        q = q.filter(Product.rating_avg >= min_rating)
     return q
 
 
@@ -76,21 +127,47 @@ def _create_product_object(data: ProductCreate) -> Product:
     )
 
 
+def _validate_listing_args(cursor: Optional[str], sort: Optional[str], expand: Iterable[str]) -> None:
+    """Raise ValidationError for an unknown sort/expand or a malformed/unsupported cursor."""
+    if sort is not None and sort not in SORT_OPTIONS:
+        raise ValidationError(f"sort must be one of: {', '.join(SORT_OPTIONS)}", field="sort")
+    unknown = set(expand) - set(EXPANDABLE)
+    if unknown:
+        raise ValidationError(f"expand must be any of: {', '.join(EXPANDABLE)}", field="expand")
+    if cursor is not None and sort not in (None, "newest"):
+        raise ValidationError("Cursor pagination only supports sort=newest", field="sort")
+    if cursor:
+        BaseService.decode_cursor(cursor)
+
+
 def get_all_paginated(
     page: int = 1,
     per_page: int = 20,
     search: Optional[str] = None,
+    fuzzy: bool = False,
     category_id: Optional[int] = None,
     subcategory_id: Optional[int] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_rating: Optional[float] = None,
     in_stock_only: bool = False,
+    cursor: Optional[str] = None,
+    with_count: bool = True,
+    sort: Optional[str] = None,
+    expand: Iterable[str] = (),
 ) -> dict:
-    """List products with filters and pagination."""
+    """List products with filters; page numbers, or keyset mode when ``cursor`` is not None.
+
+    ``sort`` is a SORT_OPTIONS key; unset means search relevance, then newest.
+    Keyset mode always pages newest-first (search relevance ordering is dropped).
+    ``expand`` relationships (EXPANDABLE keys) are loaded for the whole page in one
+    extra query each, not one per product.
+    """
+    _validate_listing_args(cursor, sort, expand)
     per_page = min(per_page, 100)
     q = _build_query(
         search=search, 
+        fuzzy=fuzzy,
         category_id=category_id, 
         subcategory_id=subcategory_id,
         min_price=min_price, 
@@ -98,12 +175,173 @@ def get_all_paginated(
         min_rating=min_rating, 
         in_stock_only=in_stock_only
     )
-    total = q.count()
-    items = q.order_by(Product.created_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
-    pagination = BaseService.pagination_dict(total, page, per_page)
+    if expand:
+        q = q.options(*(selectinload(getattr(Product, name)) for name in expand))
+    if cursor is not None:
+        items, pagination = BaseService.keyset_paginate(q, Product, per_page, cursor, with_count)
+    else:
+        if sort is not None:
+            q = q.order_by(None)
+        q = q.order_by(*SORT_OPTIONS[sort or "newest"])
+        items, pagination = BaseService.paginate(q, page, per_page, with_count)
     return {"products": items, **pagination}
 
 
+def _price_bucket_expr():
+    """SQL CASE mapping price to its PRICE_BUCKETS index."""
+    whens = [(Product.price < hi, i) for i, (_, hi) in enumerate(PRICE_BUCKETS) if hi is not None]
+    return case(*whens, else_=len(PRICE_BUCKETS) - 1)
+
+
+def _compute_facets(filters: dict) -> dict:
+    """Fold one GROUP BY (category, price bucket, in stock) into the three facets."""
+    bucket = _price_bucket_expr().label("price_bucket")
+    in_stock = case((Product.stock > 0, 1), else_=0).label("in_stock")
+    rows = (
+        _build_query(**filters)
+        .order_by(None)
+        .join(Category, Category.id == Product.category_id)
+        .with_entities(Product.category_id, Category.name, bucket, in_stock, func.count(Product.id))
+        .group_by(Product.category_id, Category.name, bucket, in_stock)
+        .all()
+    )
+    categories: dict[int, dict] = {}
+    price_counts = [0] * len(PRICE_BUCKETS)
+    availability = {"in_stock": 0, "out_of_stock": 0}
+    for category_id, category_name, bucket_idx, stocked, n in rows:
+        cat = categories.setdefault(category_id, {"id": category_id, "name": category_name, "count": 0})
+        cat["count"] += n
+        price_counts[bucket_idx] += n
+        availability["in_stock" if stocked else "out_of_stock"] += n
+    return {
+        "categories": sorted(categories.values(), key=lambda c: (-c["count"], c["name"])),
+        "price": [
+            {"min": str(lo), "max": str(hi) if hi is not None else None, "count": price_counts[i]}
+            for i, (lo, hi) in enumerate(PRICE_BUCKETS)
+        ],
+        "availability": availability,
+    }
+
+
+def get_facets(
+    search: Optional[str] = None,
+    fuzzy: bool = False,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    in_stock_only: bool = False,
+) -> dict:
+    """Category, price-bucket and availability counts for the filtered set.
+
+    One grouped query per distinct filter signature; results cached briefly.
+    """
+    filters = {
+        "search": search,
+        "fuzzy": fuzzy,
+        "category_id": category_id,
+        "subcategory_id": subcategory_id,
+        "min_price": min_price,
+        "max_price": max_price,
+        "min_rating": min_rating,
+        "in_stock_only": in_stock_only,
+    }
+    return app_cache("product_facets").get_or_set(
+        filter_signature(**filters),
+        lambda: _compute_facets(filters),
+        tags=_filter_tags(filters) | {TAG_STOCK, TAG_CATEGORIES},
+    )
+
+
+def _filter_tags(filters: dict) -> set[str]:
+    """Cache tags implied by a set of listing filters."""
+    tags = {TAG_LISTINGS}
+    if filters.get("min_rating") is not None:
+        tags.add(TAG_RATINGS)
+    if filters.get("in_stock_only"):
+        tags.add(TAG_STOCK)
+    if filters.get("category_id") is not None or filters.get("subcategory_id") is not None:
+        tags.add(TAG_CATEGORIES)
+    return tags
+
+
+def serialize(p: Product, expand: Iterable[str] = ()) -> dict:
+    """ProductResponse dict; ``expand`` may add "images" and/or "category"."""
+    return serialize_many([p], expand)[0]
+
+
+def serialize_many(products: List[Product], expand: Iterable[str] = ()) -> List[dict]:
+    """``serialize`` for a page of products, through the bulk ProductResponse adapter."""
+    rows = dump_products(products)
+    if "images" in expand or "category" in expand:
+        for data, p in zip(rows, products):
+            if "images" in expand:
+                data["images"] = [
+                    ProductImageResponse.model_validate(img).model_dump()
+                    for img in sorted(p.images, key=lambda i: (i.sort_order, i.id))
+                ]
+            if "category" in expand:
+                data["category"] = {"id": p.category.id, "name": p.category.name} if p.category else None
+    return rows
+
+
+def get_listing(expand: Iterable[str] = (), facets: bool = False, **params) -> tuple[dict, str]:
+    """Serialized, cached ``get_all_paginated`` page; return (data, etag).
+
+    ``params`` are get_all_paginated's arguments, validated before the cache is
+    consulted. The cache key is the normalized signature of the filters plus the
+    opaque ``cursor`` and ``sort`` values as given (``cursor=""``, the first keyset
+    page, differs from ``None``, offset mode). The returned dict is shared with the
+    cache and must not be mutated.
+    """
+    expand = tuple(sorted(set(expand)))
+    cursor, sort = params.get("cursor"), params.get("sort")
+    _validate_listing_args(cursor, sort, expand)
+    cache = app_cache("product_listings")
+    signature = filter_signature(
+        expand=expand, facets=facets, **{k: v for k, v in params.items() if k not in ("cursor", "sort")}
+    )
+    key = (signature, cursor, sort)
+    entry = cache.get(key)
+    if entry is None:
+        result = get_all_paginated(expand=expand, **params)
+        products = result.pop("products")
+        data = {"products": serialize_many(products, expand), **result}
+        filters = {
+            k: v for k, v in params.items()
+            if k not in ("page", "per_page", "cursor", "with_count", "sort")
+        }
+        if facets:
+            data["facets"] = get_facets(**filters)
+        body = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        entry = (data, hashlib.sha1(body).hexdigest())
+        tags = _filter_tags(filters) | {f"product:{p['id']}" for p in data["products"]}
+        if facets or params.get("sort") == "popularity":  # sold_count moves with stock
+            tags.add(TAG_STOCK)
+        if facets:
+            tags.add(TAG_CATEGORIES)
+        if params.get("sort") == "rating":
+            tags.add(TAG_RATINGS)
+        cache.set(key, entry, tags)
+    return entry
+
+
+def invalidate_listing_cache(*tags: str) -> None:
+    """Drop cached listings and facets carrying any of ``tags`` (default: all of them)."""
+    for name in _CACHES:
+        app_cache(name).invalidate(*(tags or (TAG_LISTINGS,)))
+
+
+def invalidate_products(product_ids: Iterable[int], stock_changed: bool = False) -> None:
+    """Drop cached listings showing any of ``product_ids`` (and stock-dependent ones if asked)."""
+    tags = [f"product:{pid}" for pid in product_ids]
+    if stock_changed:
+        tags.append(TAG_STOCK)
+    if tags:
+        invalidate_listing_cache(*tags)
+
+
 def get_by_id(product_id: int) -> Product:
     """Get product by id; raise ProductNotFoundError if missing."""
     p = db.session.get(Product, product_id)
@@ -112,14 +350,47 @@ def get_by_id(product_id: int) -> Product:
     return p
 
 
+def get_many(ids: Iterable[int] = (), skus: Iterable[str] = ()) -> tuple[List[Product], dict]:
+    """Look up many products with one IN query; return (products, missing).
+
+    Products come back in request order (ids first, then SKUs) without
+    duplicates; ``missing`` is ``{"ids": [...], "skus": [...]}``.
+    """
+    ids = list(dict.fromkeys(ids))
+    skus = list(dict.fromkeys(s.strip() for s in skus))
+    conds = []
+    if ids:
+        conds.append(Product.id.in_(ids))
+    if skus:
+        conds.append(Product.sku.in_(skus))
+    rows = Product.query.filter(or_(*conds)).all() if conds else []
+    by_id = {p.id: p for p in rows}
+    by_sku = {p.sku: p for p in rows}
+    found, seen = [], set()
+    for p in [by_id.get(i) for i in ids] + [by_sku.get(s) for s in skus]:
+        if p is not None and p.id not in seen:
+            seen.add(p.id)
+            found.append(p)
+    missing = {
+        "ids": [i for i in ids if i not in by_id],
+        "skus": [s for s in skus if s not in by_sku],
+    }
+    return found, missing
+
+
 def create(data: ProductCreate) -> Product:
     """Create product (admin)."""
     _verify_category_exists(data.category_id)
     _check_duplicate_sku(data.sku)
     product = _create_product_object(data)
     db.session.add(product)
+    db.session.flush()
+    search_index.index_product(product)
     db.session.commit()
+    invalidate_listing_cache()
     db.session.refresh(product)
+    suggest_index.index_product(product)
+    similarity_service.schedule_refresh([product.id])
     return product
 
 
@@ -138,16 +409,96 @@ def update(product_id: int, data: ProductUpdate) -> Product:
             setattr(p, k, v.strip() if v else v)
         else:
             setattr(p, k, v)
+    if "name" in payload or "description" in payload:
+        search_index.index_product(p)
     db.session.commit()
+    invalidate_listing_cache()
     db.session.refresh(p)
+    suggest_index.index_product(p)
+    if payload.keys() & {"name", "description", "category_id", "is_active"}:
+        similarity_service.schedule_refresh([p.id])
     return p
 
 
 def delete(product_id: int) -> None:
     """Delete product (admin)."""
     p = get_by_id(product_id)
+    search_index.remove_product(p.id)
+    digests = [img.digest for img in p.images if img.digest]
     db.session.delete(p)
+    db.session.flush()  # image rows go before the stored files they reference
+    unreferenced = image_store.release(digests)
     db.session.commit()
+    image_store.purge(unreferenced)
+    invalidate_listing_cache()
+    suggest_index.remove_product(product_id)
+    similarity_service.schedule_refresh([product_id])
+
+
+BULK_UPDATE_FIELDS = ("price", "stock", "is_active")
+MAX_BULK_UPDATE = 1000
+
+
+def bulk_update(items: list[dict]) -> list[dict]:
+    """Apply many (id|sku, price?, stock?, is_active?) rows in one transaction.
+
+    Keys are resolved with one lookup and the rows written as one executemany
+    UPDATE by primary key. Returns one result per input row, in order:
+    ``{"index", "id", "sku", "status": "updated" | "not_found" | "invalid", "errors"?}``.
+    """
+    if len(items) > MAX_BULK_UPDATE:
+        raise ValidationError(f"At most {MAX_BULK_UPDATE} rows per request", field="items")
+    results: list[dict] = []
+    parsed: list[tuple[dict, ProductBulkUpdateItem]] = []
+    for i, raw in enumerate(items):
+        result = {"index": i, "id": None, "sku": None}
+        results.append(result)
+        try:
+            row = ProductBulkUpdateItem.model_validate(raw)
+        except PydanticValidationError as e:
+            result.update(status="invalid", errors=field_errors(e))
+            continue
+        result.update(id=row.id, sku=row.sku)
+        if (row.id is None) == (row.sku is None):
+            result.update(status="invalid", errors=[{"field": "id", "message": "Give exactly one of id or sku"}])
+        elif not row.model_fields_set & set(BULK_UPDATE_FIELDS):
+            result.update(status="invalid", errors=[{"field": None, "message": "Nothing to update"}])
+        elif nulls := [k for k in BULK_UPDATE_FIELDS if k in row.model_fields_set and getattr(row, k) is None]:
+            result.update(status="invalid", errors=[{"field": k, "message": "May not be null"} for k in nulls])
+        else:
+            parsed.append((result, row))
+
+    ids = {row.id for _, row in parsed if row.id is not None}
+    skus = {row.sku.strip() for _, row in parsed if row.sku is not None}
+    found = (
+        db.session.query(Product.id, Product.sku)
+        .filter(or_(Product.id.in_(ids), Product.sku.in_(skus)))
+        .all()
+        if parsed else []
+    )
+    known_ids = {pid for pid, _ in found}
+    id_by_sku = {sku: pid for pid, sku in found}
+
+    now = datetime.utcnow()
+    updates: dict[int, dict] = {}
+    for result, row in parsed:
+        pid = row.id if row.id is not None else id_by_sku.get(row.sku.strip())
+        if pid not in known_ids:
+            result["status"] = "not_found"
+            continue
+        values = {k: getattr(row, k) for k in BULK_UPDATE_FIELDS if k in row.model_fields_set}
+        updates.setdefault(pid, {"id": pid, "updated_at": now}).update(values)
+        result.update(id=pid, status="updated")
+
+    if updates:
+        db.session.execute(sql_update(Product), list(updates.values()))
+        db.session.commit()
+        invalidate_listing_cache()
+        toggled = [pid for pid, v in updates.items() if "is_active" in v]
+        if toggled:
+            suggest_index.reset()
+            similarity_service.schedule_refresh(toggled)
+    return results
 
 
 def add_image(product_id: int, url: str, sort_order: int = 0) -> ProductImage:
@@ -156,5 +507,23 @@ def add_image(product_id: int, url: str, sort_order: int = 0) -> ProductImage:
     img = ProductImage(product_id=p.id, url=url, sort_order=sort_order)
     db.session.add(img)
     db.session.commit()
+    invalidate_products([p.id])
+    db.session.refresh(img)
+    return img
+
+
+def add_uploaded_image(product_id: int, stream: IO[bytes], ext: str, sort_order: int = 0) -> ProductImage:
+    """Store an uploaded file (content-addressed, deduplicated) and add it as an image."""
+    p = get_by_id(product_id)
+    stored = image_store.store(stream, ext)
+    img = ProductImage(
+        product_id=p.id,
+        url=image_store.url_for_digest(stored.digest, stored.ext),
+        sort_order=sort_order,
+        digest=stored.digest,
+    )
+    db.session.add(img)
+    db.session.commit()
+    invalidate_products([p.id])
     db.session.refresh(img)
     return img
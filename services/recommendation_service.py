@@ -0,0 +1,145 @@
+"""Recommendation service: "frequently bought together" from order_items co-occurrence.
+
+``product_cooccurrence`` is a sparse product x product matrix counting the orders
+that contain both products; pair counts come from one grouped self-join of
+``order_items`` on ``order_id``, so the counting runs set-based in the database.
+``product_recommendations`` keeps each product's TOP_K neighbours, picked with a
+window function, so serving a list is a single primary-key range read.
+``refresh`` folds in only orders not yet counted: it claims them by flipping
+``orders.cooccurrence_counted`` in one conditional UPDATE, so an order is picked
+up by the first run that can see it committed, whatever its id, and never twice.
+``rebuild`` recomputes everything (e.g. to drop cancelled orders).
+"""
+
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import aliased
+
+from database import db
+from models import (
+    Order,
+    OrderItem,
+    Product,
+    ProductCooccurrence,
+    ProductRecommendation,
+)
+from services.product_service import get_by_id as get_product
+
+TOP_K = 10
+_CLAIM_CHUNK = 1000
+
+
+def _pair_counts(*criteria):
+    """SELECT (product_id, other_id, orders) over non-cancelled orders matching ``criteria``."""
+    a, b = aliased(OrderItem), aliased(OrderItem)
+    return (
+        select(a.product_id, b.product_id.label("other_id"), func.count(func.distinct(a.order_id)))
+        .join(b, (b.order_id == a.order_id) & (b.product_id != a.product_id))
+        .join(Order, Order.id == a.order_id)
+        .where(Order.status != "cancelled", *criteria)
+        .group_by(a.product_id, b.product_id)
+    )
+
+
+def _claim_uncounted() -> list[tuple[int, str]]:
+    """Mark committed, not yet counted orders as counted; return their (id, status).
+
+    Rows already claimed by a concurrent run are locked, then skipped once it commits.
+    """
+    return db.session.execute(
+        update(Order)
+        .where(Order.cooccurrence_counted == False)
+        .values(cooccurrence_counted=True, updated_at=Order.updated_at)
+        .returning(Order.id, Order.status)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def _recompute_top_k(product_ids: Optional[Iterable[int]] = None) -> None:
+    """Rewrite the top-K lists of ``product_ids`` (all products when None)."""
+    ranked = select(
+        ProductCooccurrence.product_id,
+        ProductCooccurrence.other_id,
+        ProductCooccurrence.orders,
+        func.row_number()
+        .over(
+            partition_by=ProductCooccurrence.product_id,
+            order_by=(ProductCooccurrence.orders.desc(), ProductCooccurrence.other_id),
+        )
+        .label("rank"),
+    )
+    clear = delete(ProductRecommendation)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        ranked = ranked.where(ProductCooccurrence.product_id.in_(product_ids))
+        clear = clear.where(ProductRecommendation.product_id.in_(product_ids))
+    ranked = ranked.subquery()
+    db.session.execute(clear)
+    db.session.execute(
+        insert(ProductRecommendation).from_select(
+            ["product_id", "rank", "recommended_id", "score"],
+            select(ranked.c.product_id, ranked.c.rank, ranked.c.other_id, ranked.c.orders).where(
+                ranked.c.rank <= TOP_K
+            ),
+        )
+    )
+
+
+def rebuild() -> int:
+    """Recompute the whole co-occurrence matrix and every top-K list; return pairs stored."""
+    _claim_uncounted()
+    db.session.execute(delete(ProductCooccurrence))
+    db.session.execute(
+        insert(ProductCooccurrence).from_select(
+            ["product_id", "other_id", "orders"], _pair_counts(Order.cooccurrence_counted == True)
+        )
+    )
+    _recompute_top_k()
+    db.session.commit()
+    return db.session.query(func.count()).select_from(ProductCooccurrence).scalar()
+
+
+def refresh() -> int:
+    """Fold orders not yet counted into the matrix; return how many were added."""
+    new_orders = [order_id for order_id, status in _claim_uncounted() if status != "cancelled"]
+    pairs = Counter()
+    for i in range(0, len(new_orders), _CLAIM_CHUNK):
+        chunk = new_orders[i:i + _CLAIM_CHUNK]
+        for p, o, n in db.session.execute(_pair_counts(Order.id.in_(chunk))):
+            pairs[(p, o)] += n
+    if pairs:
+        touched = {p for p, _ in pairs}
+        existing = {
+            (row.product_id, row.other_id): row.orders
+            for row in ProductCooccurrence.query.filter(ProductCooccurrence.product_id.in_(touched))
+        }
+        updates = [
+            {"product_id": p, "other_id": o, "orders": existing[(p, o)] + n}
+            for (p, o), n in pairs.items() if (p, o) in existing
+        ]
+        inserts = [
+            {"product_id": p, "other_id": o, "orders": n}
+            for (p, o), n in pairs.items() if (p, o) not in existing
+        ]
+        if updates:
+            db.session.execute(update(ProductCooccurrence), updates)
+        if inserts:
+            db.session.execute(insert(ProductCooccurrence), inserts)
+        _recompute_top_k(touched)
+    db.session.commit()
+    return len(new_orders)
+
+
+def get_for_product(product_id: int, limit: int = TOP_K) -> List[tuple[Product, int]]:
+    """Active co-purchased products for ``product_id`` as (product, score), best first."""
+    get_product(product_id)
+    return (
+        db.session.query(Product, ProductRecommendation.score)
+        .join(ProductRecommendation, ProductRecommendation.recommended_id == Product.id)
+        .filter(ProductRecommendation.product_id == product_id, Product.is_active == True)
+        .order_by(ProductRecommendation.rank)
+        .limit(limit)
+        .all()
+    )
@@ -1,11 +1,17 @@
-"""Review service: create (purchaser only), list by product, update, delete."""
+"""Review service: create (purchaser only), list by product, update, delete.
+
+Keeps the denormalized rating aggregates on Product in step with the reviews table.
+"""
+
+from sqlalchemy import Float, case, cast, func, update
 
 from database import db
-from models import Review, Order, OrderItem
+from models import Review, Order, OrderItem, Product
 from schemas import ReviewCreate
 from exceptions import ProductNotFoundError, ValidationError
 from services.base_service import BaseService
 from services.product_service import get_by_id as get_product
+from services.product_service import TAG_RATINGS, invalidate_listing_cache
 
 
 def user_has_ordered_product(user_id: int, product_id: int) -> bool:
@@ -19,6 +25,74 @@ def user_has_ordered_product(user_id: int, product_id: int) -> bool:
     )
 
 
+def _apply_rating(product_id: int, rating: int, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one rating from the product aggregates.
+
+    A single in-place UPDATE, so concurrent reviews cannot lose increments; runs in
+    the caller's transaction.
+    """
+    bucket = getattr(Product, f"rating_count_{rating}")
+    new_sum = Product.rating_sum + sign * rating
+    new_count = Product.rating_count + sign
+    db.session.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(
+            {
+                Product.rating_sum: new_sum,
+                Product.rating_count: new_count,
+                bucket: bucket + sign,
+                Product.rating_avg: case(
+                    (new_count > 0, cast(new_sum, Float) / new_count), else_=None
+                ),
+            }
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def remove_user_ratings(user_id: int) -> None:
+    """Subtract all of a user's reviews from product aggregates (before the user is deleted)."""
+    for product_id, rating in db.session.query(Review.product_id, Review.rating).filter(
+        Review.user_id == user_id
+    ):
+        _apply_rating(product_id, rating, -1)
+
+
+def recompute_rating_aggregates() -> int:
+    """Batch-rebuild every product's rating aggregates from reviews; return products rated."""
+    rows = (
+        db.session.query(Review.product_id, Review.rating, func.count(Review.id))
+        .group_by(Review.product_id, Review.rating)
+        .all()
+    )
+    stats: dict[int, dict] = {}
+    for product_id, rating, n in rows:
+        s = stats.setdefault(
+            product_id,
+            {"id": product_id, "rating_sum": 0, "rating_count": 0,
+             **{f"rating_count_{star}": 0 for star in range(1, 6)}},
+        )
+        s["rating_sum"] += rating * n
+        s["rating_count"] += n
+        s[f"rating_count_{rating}"] += n
+    for s in stats.values():
+        s["rating_avg"] = s["rating_sum"] / s["rating_count"]
+
+    db.session.execute(
+        update(Product).values(
+            rating_sum=0, rating_count=0, rating_avg=None,
+            **{f"rating_count_{star}": 0 for star in range(1, 6)},
+        ).execution_options(synchronize_session=False)
+    )
+    if stats:
+        # ORM bulk UPDATE by primary key: one executemany
+        db.session.execute(update(Product), list(stats.values()))
+    db.session.commit()
+    invalidate_listing_cache()
+    return len(stats)
+
+
 def create(user_id: int, product_id: int, data: ReviewCreate) -> Review:
     """Create review; only if user has purchased the product (PM-09)."""
     get_product(product_id)
@@ -34,19 +108,29 @@ def create(user_id: int, product_id: int, data: ReviewCreate) -> Review:
         comment=data.comment,
     )
     db.session.add(review)
+    _apply_rating(product_id, data.rating, 1)
     db.session.commit()
+    invalidate_listing_cache(f"product:{product_id}", TAG_RATINGS)
     db.session.refresh(review)
     return review
 
 
-def get_by_product(product_id: int, page: int = 1, per_page: int = 20) -> dict:
-    """List reviews for product; paginated."""
+def get_by_product(
+    product_id: int,
+    page: int = 1,
+    per_page: int = 20,
+    cursor: str | None = None,
+    with_count: bool = True,
+) -> dict:
+    """List reviews for product; paginated (keyset mode when ``cursor`` is not None)."""
     get_product(product_id)
     per_page = min(per_page, 100)
-    q = Review.query.filter_by(product_id=product_id).order_by(Review.created_at.desc())
-    total = q.count()
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
-    pagination = BaseService.pagination_dict(total, page, per_page)
+    q = Review.query.filter_by(product_id=product_id)
+    if cursor is not None:
+        items, pagination = BaseService.keyset_paginate(q, Review, per_page, cursor, with_count)
+    else:
+        q = q.order_by(Review.created_at.desc(), Review.id.desc())
+        items, pagination = BaseService.paginate(q, page, per_page, with_count)
     return {"reviews": items, **pagination}
 
 
@@ -63,5 +147,8 @@ def delete(review_id: int, user_id: int, admin: bool = False) -> None:
     r = get_by_id(review_id)
     if not admin and r.user_id != user_id:
         raise ValidationError("Not authorized to delete this review", field="review_id")
+    product_id = r.product_id
+    _apply_rating(product_id, r.rating, -1)
     db.session.delete(r)
     db.session.commit()
+    invalidate_listing_cache(f"product:{product_id}", TAG_RATINGS)
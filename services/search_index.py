@@ -0,0 +1,208 @@
+"""Product full-text search: SQLite FTS5 table or PostgreSQL tsvector/GIN index.
+
+The index covers ``Product.name`` and ``Product.description``. On PostgreSQL the
+GIN expression index (models/product.py) is maintained by the database; on SQLite
+``products_fts`` is kept in sync by product_service via index_product/remove_product.
+Other backends (or a SQLite database missing the FTS table) fall back to ``ilike``.
+
+Fuzzy (typo-tolerant) search uses ``product_trigrams``, an app-maintained
+pg_trgm-style posting list of name trigrams that works on every backend, and
+ranks by pg_trgm's similarity: shared / (query + name trigrams - shared), with
+the name's count kept in ``Product.name_trigram_count``.
+"""
+
+import re
+import weakref
+from typing import Iterable, Optional
+
+from sqlalchemy import Float, bindparam, cast, delete, func, insert, literal_column, select, text, update
+
+from database import db
+from models import Product, ProductTrigram
+from models.product import PRODUCT_SEARCH_VECTOR
+
+FTS_TABLE = "products_fts"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MAX_TOKENS = 8
+# Minimum trigram similarity for a fuzzy match (pg_trgm's default)
+FUZZY_THRESHOLD = 0.3
+
+# engine -> whether products_fts exists (checked once per engine)
+_fts_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _dialect() -> str:
+    return db.session.get_bind().dialect.name
+
+
+def _tokens(search: str) -> list[str]:
+    """Split user input into word tokens (drops FTS/tsquery operators)."""
+    return _TOKEN_RE.findall(search.lower())[:_MAX_TOKENS]
+
+
+def _sqlite_fts_available() -> bool:
+    engine = db.session.get_bind()
+    if engine not in _fts_ready:
+        row = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        _fts_ready[engine] = row is not None
+    return _fts_ready[engine]
+
+
+def _fts_enabled() -> bool:
+    dialect = _dialect()
+    if dialect == "postgresql":
+        return True
+    if dialect == "sqlite":
+        return _sqlite_fts_available()
+    return False
+
+
+def trigrams(value: str) -> set[str]:
+    """pg_trgm-style trigrams: each lowercased word padded with two spaces before, one after."""
+    grams = set()
+    for word in _TOKEN_RE.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _fts5_query(tokens: Iterable[str]) -> str:
+    """Prefix-match every token, implicit AND: ``"blue"* "wid"*``."""
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _tsquery(tokens: Iterable[str]) -> str:
+    """Prefix-match every token: ``blue:* & wid:*``."""
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def apply(q, search: Optional[str]):
+    """Filter product query ``q`` by ``search`` and order it by relevance (best first)."""
+    if not search:
+        return q
+    tokens = _tokens(search)
+    if not tokens or not _fts_enabled():
+        return q.filter(
+            Product.name.ilike(f"%{search}%") | Product.description.ilike(f"%{search}%")
+        )
+
+    if _dialect() == "postgresql":
+        query = func.to_tsquery(literal_column("'english'::regconfig"), _tsquery(tokens))
+        return q.filter(PRODUCT_SEARCH_VECTOR.op("@@")(query)).order_by(
+            func.ts_rank(PRODUCT_SEARCH_VECTOR, query).desc()
+        )
+
+    fts = literal_column(FTS_TABLE)
+    matches = (
+        select(
+            literal_column("rowid").label("product_id"),
+            func.bm25(fts).label("rank"),
+        )
+        .select_from(text(FTS_TABLE))
+        .where(fts.op("MATCH")(_fts5_query(tokens)))
+        .subquery()
+    )
+    # bm25() is lower-is-better
+    return q.join(matches, Product.id == matches.c.product_id).order_by(matches.c.rank.asc())
+
+
+def apply_fuzzy(q, search: Optional[str], threshold: float = FUZZY_THRESHOLD):
+    """Filter ``q`` to names whose trigram similarity to ``search`` is at least ``threshold``.
+
+    Ordered most similar first, then by id. The posting-list lookup touches only
+    rows for the query's trigrams (primary key prefix), so cost follows the query
+    length and match count, not the catalog size.
+    """
+    grams = trigrams(search or "")
+    if not grams:
+        return q
+    shared = cast(func.count(ProductTrigram.trigram), Float)
+    similarity = shared / (len(grams) + Product.name_trigram_count - shared)
+    matches = (
+        select(ProductTrigram.product_id, similarity.label("similarity"))
+        .join(Product, Product.id == ProductTrigram.product_id)
+        .where(ProductTrigram.trigram.in_(sorted(grams)))
+        .group_by(ProductTrigram.product_id, Product.name_trigram_count)
+        .having(similarity >= threshold)
+        .subquery()
+    )
+    return q.join(matches, Product.id == matches.c.product_id).order_by(
+        matches.c.similarity.desc(), Product.id
+    )
+
+
+def _store_counts(counts: list[dict]) -> None:
+    """Set name_trigram_count from ``{"pid": .., "n": ..}`` rows (updated_at left alone)."""
+    table = Product.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.id == bindparam("pid"))
+        .values(name_trigram_count=bindparam("n"), updated_at=table.c.updated_at),
+        counts,
+    )
+
+
+def index_products(rows: Iterable[tuple[int, str, Optional[str]]]) -> None:
+    """Insert or refresh trigrams and (SQLite) FTS rows for (id, name, description) rows.
+
+    One DELETE and one executemany INSERT per table, whatever the batch size.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    ids = [pid for pid, _, _ in rows]
+    db.session.execute(delete(ProductTrigram).where(ProductTrigram.product_id.in_(ids)))
+    by_product = {pid: trigrams(name) for pid, name, _ in rows}
+    grams = [{"trigram": g, "product_id": pid} for pid, names in by_product.items() for g in names]
+    if grams:
+        db.session.execute(insert(ProductTrigram), grams)
+    _store_counts([{"pid": pid, "n": len(names)} for pid, names in by_product.items()])
+    if _dialect() != "sqlite" or not _sqlite_fts_available():
+        return
+    db.session.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), [{"id": pid} for pid in ids]
+    )
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (:id, :name, :description)"),
+        [{"id": pid, "name": name, "description": description or ""} for pid, name, description in rows],
+    )
+
+
+def index_product(product: Product) -> None:
+    """Insert or refresh a product's trigrams and (SQLite) FTS row."""
+    index_products([(product.id, product.name, product.description)])
+
+
+def remove_product(product_id: int) -> None:
+    """Drop a product's trigrams and SQLite FTS row."""
+    db.session.execute(delete(ProductTrigram).where(ProductTrigram.product_id == product_id))
+    if _dialect() != "sqlite" or not _sqlite_fts_available():
+        return
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": product_id})
+
+
+def rebuild() -> int:
+    """Rebuild the trigram and SQLite FTS tables from ``products``; return products indexed.
+
+    PostgreSQL keeps its full-text expression index current on its own.
+    """
+    db.session.execute(delete(ProductTrigram))
+    by_product = {pid: trigrams(name) for pid, name in db.session.query(Product.id, Product.name)}
+    rows = [{"trigram": g, "product_id": pid} for pid, names in by_product.items() for g in names]
+    if rows:
+        db.session.execute(insert(ProductTrigram), rows)
+    if by_product:
+        _store_counts([{"pid": pid, "n": len(names)} for pid, names in by_product.items()])
+    if _dialect() == "sqlite" and _sqlite_fts_available():
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        db.session.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description) "
+                "SELECT id, name, coalesce(description, '') FROM products"
+            )
+        )
+    db.session.commit()
+    return db.session.query(func.count(Product.id)).scalar() or 0
@@ -0,0 +1,194 @@
+"""Similarity service: content-based "similar products" from name/description TF-IDF.
+
+Each category is a sparse products x terms matrix of sublinear TF-IDF weights
+(smoothed IDF, name terms count double), L2-normalized per row, so cosine
+similarity is a matrix product. Neighbours are computed for BATCH_SIZE targets
+at a time (``M[batch] @ M.T``) and the TOP_K best per row are picked with
+argpartition. They are persisted in ``product_similarities``; serving is a
+lookup.
+
+``rebuild`` recomputes every category (scripts/rebuild_indexes.py). Product
+writes call ``schedule_refresh``, which recomputes the changed products plus the
+products currently listing them in a background thread; ``schedule_rebuild``
+does the same for a full rebuild after bulk imports.
+"""
+
+import re
+from collections import Counter, defaultdict
+from threading import Lock, Thread
+from typing import Callable, Iterable, List
+
+import numpy as np
+from flask import current_app
+from scipy import sparse
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import db
+from exceptions import ProductNotFoundError
+from models import Product, ProductSimilarity
+
+TOP_K = 10
+NAME_WEIGHT = 2
+BATCH_SIZE = 512
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or that the this to with".split()
+)
+_job_lock = Lock()  # one similarity job at a time per process
+
+
+def _tokens(text: str | None) -> list[str]:
+    return [
+        t for t in _TOKEN_RE.findall((text or "").lower())
+        if len(t) > 1 and t not in _STOPWORDS and not t.isdigit()
+    ]
+
+
+def _matrix(rows: Iterable[tuple[int, str, str | None]]) -> tuple[np.ndarray, sparse.csr_matrix]:
+    """Product ids and their L2-normalized TF-IDF matrix for one category's (id, name, description) rows."""
+    ids, indptr, indices, counts = [], [0], [], []
+    vocabulary: dict[str, int] = {}
+    for pid, name, description in rows:
+        tf = Counter(_tokens(description))
+        for t in _tokens(name):
+            tf[t] += NAME_WEIGHT
+        ids.append(pid)
+        for t, c in tf.items():
+            indices.append(vocabulary.setdefault(t, len(vocabulary)))
+            counts.append(c)
+        indptr.append(len(indices))
+    m = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float64), indices, indptr), shape=(len(ids), len(vocabulary))
+    )
+    df = np.bincount(m.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(ids)) / (1 + df)) + 1
+    m.data = (1 + np.log(m.data)) * idf[m.indices]
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return np.asarray(ids, dtype=np.int64), sparse.diags(1 / norms) @ m
+
+
+def _neighbours(ids: np.ndarray, m: sparse.csr_matrix, targets: Iterable[int]) -> list[dict]:
+    """Top-K cosine neighbours of each target, as product_similarities rows."""
+    position = {pid: i for i, pid in enumerate(ids.tolist())}
+    wanted = [position[pid] for pid in targets if pid in position]
+    k = min(TOP_K, len(ids) - 1)
+    if k <= 0:
+        return []
+    mt = m.T.tocsc()
+    rows = []
+    for start in range(0, len(wanted), BATCH_SIZE):
+        batch = wanted[start:start + BATCH_SIZE]
+        sims = (m[batch] @ mt).toarray()
+        sims[np.arange(len(batch)), batch] = 0  # not its own neighbour
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        for r, i in enumerate(batch):
+            cand = top[r]
+            scores = sims[r, cand]
+            order = np.lexsort((ids[cand], -scores))  # best first, then lowest id
+            rank = 0
+            for j in order:
+                if scores[j] <= 0:
+                    break
+                rank += 1
+                rows.append({
+                    "product_id": int(ids[i]), "rank": rank,
+                    "similar_id": int(ids[cand[j]]), "score": round(float(scores[j]), 6),
+                })
+    return rows
+
+
+def _category_rows(category_id: int) -> list:
+    return (
+        db.session.query(Product.id, Product.name, Product.description)
+        .filter(Product.category_id == category_id, Product.is_active == True)
+        .all()
+    )
+
+
+def rebuild() -> int:
+    """Recompute every product's similar list; return rows stored."""
+    db.session.execute(delete(ProductSimilarity))
+    stored = 0
+    for (category_id,) in db.session.query(Product.category_id).distinct():
+        ids, m = _matrix(_category_rows(category_id))
+        rows = _neighbours(ids, m, ids.tolist())
+        if rows:
+            db.session.execute(insert(ProductSimilarity), rows)
+        stored += len(rows)
+    db.session.commit()
+    return stored
+
+
+def refresh_products(product_ids: Iterable[int]) -> None:
+    """Recompute lists for changed products and for products that currently list them.
+
+    Commits. Products the change would newly enter the top-K of catch up on the next ``rebuild``.
+    """
+    changed = set(product_ids)
+    if not changed:
+        return
+    listing = db.session.execute(
+        select(ProductSimilarity.product_id).where(ProductSimilarity.similar_id.in_(changed))
+    ).scalars()
+    targets = changed | set(listing)
+    db.session.execute(
+        delete(ProductSimilarity).where(
+            or_(ProductSimilarity.product_id.in_(targets), ProductSimilarity.similar_id.in_(changed))
+        )
+    )
+    categories = defaultdict(set)
+    for pid, category_id in db.session.query(Product.id, Product.category_id).filter(
+        Product.id.in_(targets)
+    ):
+        categories[category_id].add(pid)
+    for category_id, pids in categories.items():
+        rows = _neighbours(*_matrix(_category_rows(category_id)), pids)
+        if rows:
+            db.session.execute(insert(ProductSimilarity), rows)
+    db.session.commit()
+
+
+def _detached(job: Callable, *args) -> None:
+    """Run ``job`` in a background thread with its own app context (inline if INDEX_REBUILD_IN_BACKGROUND is off)."""
+    app = current_app._get_current_object()
+    if not app.config.get("INDEX_REBUILD_IN_BACKGROUND", True):
+        job(*args)
+        return
+
+    def run() -> None:
+        with _job_lock, app.app_context():
+            try:
+                job(*args)
+            except SQLAlchemyError:
+                db.session.rollback()
+                app.logger.exception("Similar-products refresh failed")
+
+    Thread(target=run, name="similarity-refresh", daemon=True).start()
+
+
+def schedule_refresh(product_ids: Iterable[int]) -> None:
+    """``refresh_products`` off the request path; call after the write is committed."""
+    changed = list(product_ids)
+    if changed:
+        _detached(refresh_products, changed)
+
+
+def schedule_rebuild() -> None:
+    """``rebuild`` off the request path (bulk imports)."""
+    _detached(rebuild)
+
+
+def get_for_product(product_id: int, limit: int = TOP_K) -> List[tuple[Product, float]]:
+    """Active products most similar to ``product_id`` as (product, score), best first."""
+    if db.session.get(Product, product_id) is None:
+        raise ProductNotFoundError(product_id)
+    return (
+        db.session.query(Product, ProductSimilarity.score)
+        .join(ProductSimilarity, ProductSimilarity.similar_id == Product.id)
+        .filter(ProductSimilarity.product_id == product_id, Product.is_active == True)
+        .order_by(ProductSimilarity.rank)
+        .limit(limit)
+        .all()
+    )
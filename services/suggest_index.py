@@ -0,0 +1,294 @@
+"""In-process prefix index for search-as-you-type over product names and SKUs.
+
+Terms (each name word, the whole name and the SKU, lowercased) are kept in a
+sorted list, so a prefix lookup is a bisect plus a scan of the matching run;
+matches are ranked by popularity (units sold). Prefixes of up to SHORT_PREFIX
+characters match most of the catalog, so their SHORT_TOP_K best products are
+kept precomputed and updated by writes instead of scanned per keystroke.
+
+One index per app, built at startup (or on first use if the tables are not there
+yet) and updated by product and order writes in this process. After
+``SUGGEST_INDEX_TTL`` seconds, or a bulk write, a fresh index is built in a
+background thread (so writes made by other workers show up) and swapped in;
+lookups keep using the old one until then.
+"""
+
+import heapq
+import time
+from bisect import bisect_left, insort
+from threading import Lock, Thread
+from typing import Iterable, Optional
+
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import db
+from models import Product
+
+_MEMO_SIZE = 1024
+SHORT_PREFIX = 2
+SHORT_TOP_K = 20  # the /suggest limit cap
+_swap_lock = Lock()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _terms(name: str, sku: str) -> set[str]:
+    name = _normalize(name)
+    return {*name.split(), name, _normalize(sku)} - {""}
+
+
+def _short_prefixes(terms: Iterable[str]) -> set[str]:
+    return {t[:n] for t in terms for n in range(1, min(len(t), SHORT_PREFIX) + 1)}
+
+
+class PrefixIndex:
+    """Sorted-term prefix index with popularity ranking, short-prefix top lists and a per-prefix memo."""
+
+    def __init__(self) -> None:
+        self._terms: list[str] = []
+        self._postings: dict[str, set[int]] = {}
+        self._products: dict[int, tuple[dict, set[str]]] = {}
+        self._popularity: dict[int, float] = {}
+        self._short: dict[str, list[int]] = {}  # short prefix -> best ids, best first
+        self._memo: dict[tuple[str, int], list[dict]] = {}
+        self._lock = Lock()
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, str, str, float]]) -> "PrefixIndex":
+        """Index ``(id, name, sku, popularity)`` rows in bulk; terms are sorted once."""
+        index = cls()
+        buckets: dict[str, list[int]] = {}
+        for pid, name, sku, popularity in rows:
+            terms = _terms(name, sku)
+            index._products[pid] = ({"id": pid, "name": name, "sku": sku}, terms)
+            for term in terms:
+                index._postings.setdefault(term, set()).add(pid)
+            for prefix in _short_prefixes(terms):
+                buckets.setdefault(prefix, []).append(pid)
+            if popularity:
+                index._popularity[pid] = popularity
+        index._terms = sorted(index._postings)
+        index._short = {
+            prefix: heapq.nsmallest(SHORT_TOP_K, ids, key=index._rank) for prefix, ids in buckets.items()
+        }
+        return index
+
+    def _rank(self, product_id: int) -> tuple:
+        return (-self._popularity.get(product_id, 0), product_id)
+
+    def _scan(self, prefix: str, limit: int) -> list[int]:
+        ids: set[int] = set()
+        i = bisect_left(self._terms, prefix)
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            ids |= self._postings[self._terms[i]]
+            i += 1
+        return heapq.nsmallest(limit, ids, key=self._rank)
+
+    def _offer(self, product_id: int, prefixes: Iterable[str]) -> None:
+        """Re-place ``product_id`` in the top lists of ``prefixes`` after it was added or rose."""
+        for prefix in prefixes:
+            top = self._short.get(prefix)
+            if top is None:
+                continue
+            if product_id not in top:
+                # a list shorter than SHORT_TOP_K holds its whole bucket
+                if len(top) >= SHORT_TOP_K and self._rank(product_id) > self._rank(top[-1]):
+                    continue
+                top.append(product_id)
+            top.sort(key=self._rank)
+            del top[SHORT_TOP_K:]
+
+    def _withdraw(self, product_id: int, prefixes: Iterable[str]) -> None:
+        """Drop top lists that ``product_id`` left or fell in; they are refilled by the next lookup."""
+        for prefix in prefixes:
+            top = self._short.get(prefix)
+            if top is not None and product_id in top:
+                del self._short[prefix]
+
+    def _unlink(self, product_id: int) -> set[str]:
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return set()
+        for term in entry[1]:
+            ids = self._postings[term]
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+        return entry[1]
+
+    def add(self, product_id: int, name: str, sku: str) -> None:
+        """Index (or re-index) one product."""
+        terms = _terms(name, sku)
+        with self._lock:
+            old = _short_prefixes(self._unlink(product_id))
+            self._products[product_id] = ({"id": product_id, "name": name, "sku": sku}, terms)
+            for term in terms:
+                ids = self._postings.get(term)
+                if ids is None:
+                    ids = self._postings[term] = set()
+                    insort(self._terms, term)
+                ids.add(product_id)
+            new = _short_prefixes(terms)
+            self._withdraw(product_id, old - new)
+            self._offer(product_id, new)
+            self._memo.clear()
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._withdraw(product_id, _short_prefixes(self._unlink(product_id)))
+            self._memo.clear()
+
+    def bump(self, product_id: int, amount: float = 1) -> None:
+        """Raise (or, negative, lower) a product's popularity, e.g. by units sold."""
+        with self._lock:
+            self._popularity[product_id] = self._popularity.get(product_id, 0) + amount
+            entry = self._products.get(product_id)
+            if entry is not None:
+                prefixes = _short_prefixes(entry[1])
+                if amount < 0:
+                    self._withdraw(product_id, prefixes)
+                else:
+                    self._offer(product_id, prefixes)
+            self._memo.clear()
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Most popular products with a term starting with ``prefix``."""
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        key = (prefix, limit)
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None:
+                return hit
+            if len(prefix) <= SHORT_PREFIX and limit <= SHORT_TOP_K:
+                top = self._short.get(prefix)
+                if top is None:
+                    top = self._short[prefix] = self._scan(prefix, SHORT_TOP_K)
+                top = top[:limit]
+            else:
+                top = self._scan(prefix, limit)
+            result = [self._products[pid][0] for pid in top]
+            if len(self._memo) >= _MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = result
+            return result
+
+
+def _snapshot() -> list:
+    return (
+        db.session.query(Product.id, Product.name, Product.sku, Product.sold_count)
+        .filter(Product.is_active == True)
+        .all()
+    )
+
+
+def _build() -> PrefixIndex:
+    return PrefixIndex.from_rows(_snapshot())
+
+
+def _rebuild(app: Flask) -> None:
+    """Build a fresh index, replay writes made since its snapshot and swap it in.
+
+    Writes are only queued once the snapshot has been read: a sale recorded
+    before that is already in ``sold_count`` and must not be bumped again.
+    """
+    index = None
+    try:
+        with app.app_context():
+            rows = _snapshot()
+            with _swap_lock:
+                app.extensions["suggest_index_pending"] = []
+            index = PrefixIndex.from_rows(rows)
+    except SQLAlchemyError:
+        app.logger.exception("Autocomplete index rebuild failed")
+    finally:
+        with _swap_lock:
+            app.extensions.pop("suggest_index_rebuilding", None)
+            pending = app.extensions.pop("suggest_index_pending", [])
+            if index is not None:
+                for method, args in pending:
+                    getattr(index, method)(*args)
+                app.extensions["suggest_index"] = index
+
+
+def _schedule_rebuild(app: Flask) -> None:
+    """Start a rebuild unless one is already running (inline if INDEX_REBUILD_IN_BACKGROUND is off)."""
+    with _swap_lock:
+        if app.extensions.get("suggest_index_rebuilding"):
+            return
+        app.extensions["suggest_index_rebuilding"] = True
+    if app.config.get("INDEX_REBUILD_IN_BACKGROUND", True):
+        Thread(target=_rebuild, args=(app,), name="suggest-index-rebuild", daemon=True).start()
+    else:
+        _rebuild(app)
+
+
+def _current(build: bool = True) -> Optional[PrefixIndex]:
+    """This app's index; built when missing if ``build``, and refreshed once older than SUGGEST_INDEX_TTL."""
+    app = current_app._get_current_object()
+    index = app.extensions.get("suggest_index")
+    if build and index is None:
+        index = app.extensions["suggest_index"] = _build()
+    elif build and time.monotonic() - index.built_at > app.config.get("SUGGEST_INDEX_TTL", 300):
+        _schedule_rebuild(app)
+        index = app.extensions["suggest_index"]
+    return index
+
+
+def _apply(method: str, *args) -> None:
+    """Call ``method`` on the live index, and on the one being rebuilt (if any) once it is swapped in."""
+    app = current_app._get_current_object()
+    with _swap_lock:
+        index = app.extensions.get("suggest_index")
+        pending = app.extensions.get("suggest_index_pending")
+        if pending is not None:
+            pending.append((method, args))
+    if index is not None:
+        getattr(index, method)(*args)
+
+
+def warm() -> None:
+    """Build the index at startup; skipped (built on first use) if the tables are missing."""
+    try:
+        _current()
+    except SQLAlchemyError:
+        db.session.rollback()
+
+
+def suggest(prefix: str, limit: int = 10) -> list[dict]:
+    """Autocomplete ``prefix`` against product names and SKUs."""
+    return _current().search(prefix, limit)
+
+
+def index_product(product: Product) -> None:
+    """Reflect a created/updated product (inactive products are dropped)."""
+    if product.is_active:
+        _apply("add", product.id, product.name, product.sku)
+    else:
+        _apply("remove", product.id)
+
+
+def reset() -> None:
+    """Rebuild this app's index after bulk writes; lookups use the current one until it is ready."""
+    app = current_app._get_current_object()
+    if "suggest_index" in app.extensions:
+        _schedule_rebuild(app)
+
+
+def remove_product(product_id: int) -> None:
+    _apply("remove", product_id)
+
+
+def record_sales(quantities: Iterable[tuple[int, int]]) -> None:
+    """Add ``(product_id, quantity)`` sales to popularity."""
+    for product_id, quantity in quantities:
+        _apply("bump", product_id, quantity)
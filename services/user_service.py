@@ -3,7 +3,7 @@
 from typing import List, Optional
 from database import db
 from models import User
-from schemas import UserUpdate, UserResponse
+from schemas import UserUpdate, UserResponse, dump_users
 from exceptions import UserNotFoundError
 from services.base_service import BaseService
 
@@ -27,15 +27,22 @@ def update_profile(user_id: int, data: UserUpdate) -> dict:
     return UserResponse.model_validate(user).model_dump()
 
 
-def get_all_paginated(page: int = 1, per_page: int = 20) -> dict:
-    """List users (admin); return items and pagination."""
+def get_all_paginated(
+    page: int = 1,
+    per_page: int = 20,
+    cursor: Optional[str] = None,
+    with_count: bool = True,
+) -> dict:
+    """List users (admin); return items and pagination (keyset mode when ``cursor`` is not None)."""
     per_page = min(per_page, 100)
-    q = User.query.order_by(User.created_at.desc())
-    total = q.count()
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
-    pagination = BaseService.pagination_dict(total, page, per_page)
+    q = User.query
+    if cursor is not None:
+        items, pagination = BaseService.keyset_paginate(q, User, per_page, cursor, with_count)
+    else:
+        q = q.order_by(User.created_at.desc(), User.id.desc())
+        items, pagination = BaseService.paginate(q, page, per_page, with_count)
     return {
-        "users": [UserResponse.model_validate(u).model_dump() for u in items],
+        "users": dump_users(items),
         **pagination,
     }
 
@@ -50,6 +57,10 @@ def set_active(user_id: int, is_active: bool) -> None:
 def delete_user(user_id: int) -> None:
     """Hard delete a user record (admin). Raises UserNotFoundError if not found."""
     user = get_by_id(user_id)
+    from services.product_service import invalidate_listing_cache
+    from services.review_service import remove_user_ratings
+    remove_user_ratings(user_id)  # reviews cascade with the user
     db.session.delete(user)
     db.session.commit()
+    invalidate_listing_cache()
 
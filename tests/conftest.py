@@ -8,6 +8,8 @@ from database import db as _db
 @pytest.fixture
 def app():
     """Create app for testing (in-memory SQLite)."""
+    from middleware.rate_limit import _buckets
+    _buckets.clear()  # rate-limit windows are process-global; reset per test
     app = create_app("testing")
     return app
 
@@ -73,3 +75,29 @@ def admin_headers(client, db):
     assert r.status_code == 200
     token = r.get_json()["data"]["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def count_queries(app, db):
+    """Context manager collecting the SQL statements executed inside it.
+
+    Usage: ``with count_queries() as queries: ...; assert len(queries) == 3``.
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count():
+        queries: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        engine = _db.engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield queries
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+    return _count
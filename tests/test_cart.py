@@ -108,3 +108,134 @@ def test_clear_cart(client, customer_headers, category_and_product):
     assert r.status_code == 200
     get_r = client.get("/api/v1/cart", headers=customer_headers)
     assert get_r.get_json()["data"]["items"] == []
+
+
+def test_get_cart_query_count_independent_of_size(client, customer_headers, admin_headers, category_and_product, count_queries):
+    cat_id, product_id = category_and_product
+    client.post("/api/v1/cart/items", json={"product_id": product_id, "quantity": 2}, headers=customer_headers)
+    with count_queries() as queries:
+        r = client.get("/api/v1/cart", headers=customer_headers)
+    one_line = len(queries)
+    assert r.get_json()["data"]["total"] == "39.98"
+
+    for i in range(3):
+        pid = client.post(
+            "/api/v1/products",
+            json={"name": f"Extra {i}", "price": 1.5, "stock": 10, "sku": f"CART-X{i}", "category_id": cat_id},
+            headers=admin_headers,
+        ).get_json()["data"]["id"]
+        client.post("/api/v1/cart/items", json={"product_id": pid, "quantity": 1}, headers=customer_headers)
+    with count_queries() as queries:
+        r = client.get("/api/v1/cart", headers=customer_headers)
+    data = r.get_json()["data"]
+    assert len(data["items"]) == 4
+    assert data["items"][0]["product"]["price"] == "19.99"
+    assert data["total"] == "44.48"
+    assert len(queries) == one_line
+    assert sum("cart_items" in q for q in queries) == 1
+
+
+def test_add_to_cart_is_single_upsert(app, client, customer_headers, category_and_product, count_queries):
+    _, product_id = category_and_product
+    from models import User
+    from services import cart_service
+    user_id = User.query.filter_by(email="customer@test.com").one().id
+
+    with count_queries() as queries:
+        item = cart_service.add_item(user_id, product_id, 4)
+    assert len(queries) == 1 and "ON CONFLICT" in queries[0]
+    assert item.quantity == 4
+    with count_queries() as queries:
+        item = cart_service.add_item(user_id, product_id, 6)
+    assert len(queries) == 1
+    assert (item.quantity, item.product_id) == (10, product_id)
+
+    # over stock (10): rejected, line unchanged
+    r = client.post("/api/v1/cart/items", json={"product_id": product_id, "quantity": 1}, headers=customer_headers)
+    assert r.status_code == 400 and "available 10, requested 11" in r.get_json()["message"]
+    r = client.post("/api/v1/cart/items", json={"product_id": 9999, "quantity": 1}, headers=customer_headers)
+    assert r.status_code == 404
+    r = client.put(f"/api/v1/cart/items/{item.id}", json={"quantity": 11}, headers=customer_headers)
+    assert r.status_code == 400
+    r = client.put(f"/api/v1/cart/items/{item.id}", json={"quantity": 3}, headers=customer_headers)
+    assert r.get_json()["data"]["quantity"] == 3
+    lines = client.get("/api/v1/cart", headers=customer_headers).get_json()["data"]["items"]
+    assert [(line["product_id"], line["quantity"]) for line in lines] == [(product_id, 3)]
+
+
+def test_cart_stock_guard_uses_each_lines_product(client, customer_headers, admin_headers, category_and_product):
+    cat_id, big = category_and_product  # stock 10
+    small = client.post(
+        "/api/v1/products",
+        json={"name": "Scarce", "price": 1, "stock": 2, "sku": "CART-S", "category_id": cat_id},
+        headers=admin_headers,
+    ).get_json()["data"]["id"]
+    add = lambda pid, q: client.post("/api/v1/cart/items", json={"product_id": pid, "quantity": q}, headers=customer_headers)
+    assert add(big, 1).status_code == 201
+    assert add(small, 2).status_code == 201
+    assert add(small, 1).status_code == 400
+    item_id = add(big, 1).get_json()["data"]["id"]
+    r = client.put(f"/api/v1/cart/items/{item_id}", json={"quantity": 9}, headers=customer_headers)
+    assert r.get_json()["data"]["quantity"] == 9
+
+
+def test_cart_rejected_write_raises_even_if_stock_changed_since(client, customer_headers, category_and_product, monkeypatch):
+    """A guarded statement that matched no row is a stock error, whatever a re-read shows."""
+    from sqlalchemy import literal
+    from services import cart_service
+    _, product_id = category_and_product  # stock 10
+    add = lambda q: client.post("/api/v1/cart/items", json={"product_id": product_id, "quantity": q}, headers=customer_headers)
+    item_id = add(2).get_json()["data"]["id"]
+
+    # stock "dropped" between the statement and the re-read: the guard saw less than the re-read does
+    upsert = cart_service._upsert_statement
+    monkeypatch.setattr(cart_service, "_upsert_statement", lambda u, p, q: upsert(u, p, 10 ** 6))
+    monkeypatch.setattr(cart_service, "_line_stock", lambda: literal(0))
+    r = add(1)
+    assert r.status_code == 400 and "Insufficient stock" in r.get_json()["message"]
+    r = client.put(f"/api/v1/cart/items/{item_id}", json={"quantity": 3}, headers=customer_headers)
+    assert r.status_code == 400 and "Insufficient stock" in r.get_json()["message"]
+    lines = client.get("/api/v1/cart", headers=customer_headers).get_json()["data"]["items"]
+    assert [line["quantity"] for line in lines] == [2]
+
+
+def test_bulk_update_cart(client, customer_headers, admin_headers, category_and_product, count_queries):
+    cat_id, a = category_and_product  # stock 10, price 19.99
+    b, c = (
+        client.post(
+            "/api/v1/products",
+            json={"name": f"Bulk {sku}", "price": 2, "stock": 3, "sku": sku, "category_id": cat_id},
+            headers=admin_headers,
+        ).get_json()["data"]["id"]
+        for sku in ("CART-B", "CART-C")
+    )
+    client.post("/api/v1/cart/items", json={"product_id": a, "quantity": 1}, headers=customer_headers)
+    client.post("/api/v1/cart/items", json={"product_id": c, "quantity": 1}, headers=customer_headers)
+    url = "/api/v1/cart/items"
+
+    # over stock on one line: nothing applied
+    r = client.patch(url, json={"items": [{"product_id": a, "quantity": 2}, {"product_id": b, "quantity": 4}]},
+                     headers=customer_headers)
+    assert r.status_code == 400 and f"Product {b}" in r.get_json()["message"]
+    r = client.patch(url, json={"items": [{"product_id": 9999, "quantity": 1}]}, headers=customer_headers)
+    assert r.status_code == 404
+    assert [i["quantity"] for i in client.get("/api/v1/cart", headers=customer_headers).get_json()["data"]["items"]] == [1, 1]
+
+    ops = [
+        {"product_id": a, "quantity": 2, "op": "add"},
+        {"product_id": b, "quantity": 2},
+        {"product_id": b, "quantity": 1, "op": "add"},
+        {"product_id": c, "op": "remove"},
+    ]
+    with count_queries() as queries:
+        r = client.patch(url, json={"items": ops}, headers=customer_headers)
+    assert r.status_code == 200
+    data = r.get_json()["data"]
+    assert [(i["product_id"], i["quantity"]) for i in data["items"]] == [(a, 3), (b, 3)]
+    assert data["total"] == "65.97"
+    assert sum(q.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")) for q in queries) == 2
+
+    r = client.patch(url, json={"items": [{"product_id": a, "quantity": 0}, {"product_id": b, "op": "remove"}]},
+                     headers=customer_headers)
+    assert r.get_json()["data"] == {"items": [], "total": "0.00"}
+    assert client.patch(url, json={"items": []}, headers=customer_headers).status_code == 400
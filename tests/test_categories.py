@@ -98,3 +98,91 @@ def test_delete_category(client, admin_headers):
 
     get_r = client.get(f"/api/v1/categories/{cat_id}")
     assert get_r.status_code == 404
+
+
+def _cat(client, admin_headers, name, parent_id=None):
+    r = client.post(
+        "/api/v1/categories", json={"name": name, "parent_id": parent_id}, headers=admin_headers
+    )
+    assert r.status_code == 201
+    return r.get_json()["data"]["id"]
+
+
+def _product(client, admin_headers, category_id, sku):
+    r = client.post(
+        "/api/v1/products",
+        json={"name": sku, "price": 1.0, "stock": 1, "sku": sku, "category_id": category_id},
+        headers=admin_headers,
+    )
+    assert r.status_code == 201
+
+
+def _skus(client, category_id):
+    data = client.get(f"/api/v1/products?category_id={category_id}").get_json()["data"]
+    return sorted(p["sku"] for p in data["products"])
+
+
+def test_category_filter_covers_whole_subtree(client, admin_headers):
+    root = _cat(client, admin_headers, "Home")
+    kitchen = _cat(client, admin_headers, "Kitchen", root)
+    knives = _cat(client, admin_headers, "Knives", kitchen)
+    other = _cat(client, admin_headers, "Garden")
+    _product(client, admin_headers, knives, "KNIFE")
+    _product(client, admin_headers, kitchen, "PAN")
+    _product(client, admin_headers, other, "HOSE")
+
+    assert _skus(client, root) == ["KNIFE", "PAN"]
+    assert _skus(client, kitchen) == ["KNIFE", "PAN"]
+    assert _skus(client, knives) == ["KNIFE"]
+
+    # Move Kitchen (with Knives) under Garden
+    r = client.put(f"/api/v1/categories/{kitchen}", json={"parent_id": other}, headers=admin_headers)
+    assert r.status_code == 200
+    assert _skus(client, root) == []
+    assert _skus(client, other) == ["HOSE", "KNIFE", "PAN"]
+
+
+def test_category_cannot_move_under_own_descendant(client, admin_headers):
+    root = _cat(client, admin_headers, "A")
+    child = _cat(client, admin_headers, "B", root)
+    r = client.put(f"/api/v1/categories/{root}", json={"parent_id": child}, headers=admin_headers)
+    assert r.status_code == 400
+
+
+def test_category_tree(client, admin_headers):
+    root = _cat(client, admin_headers, "Sports")
+    bikes = _cat(client, admin_headers, "Bikes", root)
+    _cat(client, admin_headers, "Helmets", bikes)
+    _cat(client, admin_headers, "Music")
+
+    tree = client.get("/api/v1/categories/tree").get_json()["data"]
+    assert [n["name"] for n in tree] == ["Music", "Sports"]
+    assert tree[1]["children"][0]["children"][0]["name"] == "Helmets"
+
+    sub = client.get(f"/api/v1/categories/tree?root_id={bikes}").get_json()["data"]
+    assert len(sub) == 1 and sub[0]["name"] == "Bikes"
+    assert [c["name"] for c in sub[0]["children"]] == ["Helmets"]
+
+
+def test_closure_matches_rebuild_after_moves_and_delete(app, client, admin_headers):
+    from database import db
+    from models import CategoryClosure
+    from services import category_service
+
+    a = _cat(client, admin_headers, "A")
+    b = _cat(client, admin_headers, "B", a)
+    c = _cat(client, admin_headers, "C", b)
+    d = _cat(client, admin_headers, "D")
+    client.put(f"/api/v1/categories/{b}", json={"parent_id": d}, headers=admin_headers)
+    client.delete(f"/api/v1/categories/{d}", headers=admin_headers)
+
+    def rows():
+        return sorted(db.session.query(
+            CategoryClosure.ancestor_id, CategoryClosure.descendant_id, CategoryClosure.depth
+        ).all())
+
+    with app.app_context():
+        incremental = rows()
+        category_service.rebuild_closure()
+        assert rows() == incremental
+        assert (b, c, 1) in incremental and (a, c, 2) not in incremental
@@ -1,5 +1,7 @@
 """Order API tests: create from cart, list, get, admin status update."""
 
+from datetime import datetime
+
 import pytest
 
 
@@ -87,3 +89,117 @@ def test_update_order_status_forbidden_for_customer(client, customer_headers, ca
         headers=customer_headers,
     )
     assert r.status_code == 403
+
+
+def test_list_orders_cursor_mode(client, customer_headers, cart_with_items):
+    client.post("/api/v1/orders", headers=customer_headers)
+    r = client.get("/api/v1/orders?cursor=&include_total=true", headers=customer_headers)
+    assert r.status_code == 200
+    data = r.get_json()["data"]
+    assert data["total"] == 1
+    assert len(data["orders"]) == 1
+    assert data["next_cursor"] is None
+
+
+def test_admin_cancel_order_returns_serialized_order(client, customer_headers, admin_headers, cart_with_items):
+    order = client.post("/api/v1/orders", headers=customer_headers).get_json()["data"]
+    r = client.post(f"/api/v1/admin/orders/{order['id']}/cancel", headers=admin_headers)
+    assert r.status_code == 200
+    data = r.get_json()["data"]
+    assert data["status"] == "cancelled"
+    assert data["total"] == order["total"] == "59.98"
+    assert data["order_items"][0]["price"] == "29.99"
+    assert datetime.fromisoformat(data["created_at"])
+
+
+def _product(client, admin_headers, sku, stock):
+    cat_id = client.post("/api/v1/categories", json={"name": f"Cat {sku}"}, headers=admin_headers).get_json()["data"]["id"]
+    return client.post(
+        "/api/v1/products",
+        json={"name": f"P {sku}", "price": 10, "stock": stock, "sku": sku, "category_id": cat_id},
+        headers=admin_headers,
+    ).get_json()["data"]["id"]
+
+
+def test_create_order_is_set_based(client, customer_headers, admin_headers, count_queries):
+    ids = [_product(client, admin_headers, f"SET-{i}", 5) for i in range(3)]
+    for pid in ids:
+        client.post("/api/v1/cart/items", json={"product_id": pid, "quantity": 2}, headers=customer_headers)
+    with count_queries() as queries:
+        r = client.post("/api/v1/orders", headers=customer_headers)
+    assert r.status_code == 201
+    assert r.get_json()["data"]["total"] == "60.00"
+    statements = [" ".join(q.split()).upper() for q in queries]
+    assert sum(s.startswith("INSERT INTO ORDER_ITEMS") for s in statements) == 1
+    assert sum(s.startswith("UPDATE PRODUCTS SET STOCK") for s in statements) == len(ids)
+    assert sum(s.startswith("DELETE FROM CART_ITEMS") for s in statements) == 1
+    assert sum(s.startswith("SELECT") and "FROM CART_ITEMS JOIN PRODUCTS" in s for s in statements) == 1
+    stocks = [client.get(f"/api/v1/products/{pid}").get_json()["data"]["stock"] for pid in ids]
+    assert stocks == [3, 3, 3]
+
+
+def test_create_order_conditional_decrement_prevents_oversell(
+    app, client, customer_headers, admin_headers, monkeypatch
+):
+    from exceptions import ValidationError
+    from models import Order, User
+    from services import order_service
+    from validators import OrderValidator
+
+    a = _product(client, admin_headers, "OVR-A", 5)
+    b = _product(client, admin_headers, "OVR-B", 1)
+    client.post("/api/v1/cart/items", json={"product_id": a, "quantity": 2}, headers=customer_headers)
+    client.post("/api/v1/cart/items", json={"product_id": b, "quantity": 1}, headers=customer_headers)
+    with app.app_context():
+        from database import db
+        from models import Product
+        db.session.get(Product, b).stock = 0  # another checkout took the last unit
+        db.session.commit()
+        user_id = User.query.filter_by(email="customer@test.com").one().id
+        # stale read: skip the up-front check so only the conditional UPDATE guards stock
+        monkeypatch.setattr(OrderValidator, "validate_cart_stock", staticmethod(lambda lines: None))
+        with pytest.raises(ValidationError) as exc:
+            order_service.create_order(user_id)
+        assert "Insufficient stock for product" in exc.value.message
+        assert db.session.get(Product, a).stock == 5
+        assert db.session.get(Product, b).stock == 0
+        assert Order.query.count() == 0
+    lines = client.get("/api/v1/cart", headers=customer_headers).get_json()["data"]["items"]
+    assert len(lines) == 2
+
+
+def test_create_order_rejects_line_for_deleted_product(app, client, customer_headers, admin_headers):
+    a = _product(client, admin_headers, "GONE-A", 5)
+    b = _product(client, admin_headers, "GONE-B", 5)
+    client.post("/api/v1/cart/items", json={"product_id": a, "quantity": 1}, headers=customer_headers)
+    client.post("/api/v1/cart/items", json={"product_id": b, "quantity": 1}, headers=customer_headers)
+    with app.app_context():
+        from sqlalchemy import text
+        from database import db
+        db.session.execute(text("DELETE FROM products WHERE id = :id"), {"id": b})
+        db.session.commit()
+    r = client.post("/api/v1/orders", headers=customer_headers)
+    assert r.status_code == 400 and f"Product {b} not found" in r.get_json()["message"]
+    assert client.get("/api/v1/orders", headers=customer_headers).get_json()["data"]["orders"] == []
+    lines = client.get("/api/v1/cart", headers=customer_headers).get_json()["data"]["items"]
+    assert [line["product_id"] for line in lines] == [a]  # nothing ordered, cart untouched
+
+
+def test_cancel_via_status_update_restores_stock_and_sold_count(app, client, customer_headers, admin_headers):
+    from database import db
+    from models import Product
+
+    pid = _product(client, admin_headers, "CAN-1", 5)
+    client.post("/api/v1/cart/items", json={"product_id": pid, "quantity": 2}, headers=customer_headers)
+    order_id = client.post("/api/v1/orders", headers=customer_headers).get_json()["data"]["id"]
+    r = client.put(f"/api/v1/orders/{order_id}/status", json={"status": "cancelled"}, headers=admin_headers)
+    assert r.status_code == 200 and r.get_json()["data"]["status"] == "cancelled"
+    with app.app_context():
+        product = db.session.get(Product, pid)
+        assert (product.stock, product.sold_count) == (5, 0)
+    # cancelling twice (any route) must not restore twice
+    r = client.post(f"/api/v1/admin/orders/{order_id}/cancel", headers=admin_headers)
+    assert r.status_code == 400
+    r = client.put(f"/api/v1/orders/{order_id}/status", json={"status": "pending"}, headers=admin_headers)
+    assert r.status_code == 400
+    assert client.get(f"/api/v1/products/{pid}").get_json()["data"]["stock"] == 5
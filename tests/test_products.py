@@ -112,3 +112,449 @@ def test_delete_product(client, admin_headers, category_id):
     assert r.status_code == 204
     get_r = client.get(f"/api/v1/products/{pid}")
     assert get_r.status_code == 404
+
+
+def _create(client, admin_headers, category_id, **fields):
+    payload = {"price": 5.0, "stock": 5, "category_id": category_id, **fields}
+    r = client.post("/api/v1/products", json=payload, headers=admin_headers)
+    assert r.status_code == 201
+    return r.get_json()["data"]["id"]
+
+
+def test_search_matches_description_and_prefix(client, admin_headers, category_id):
+    _create(client, admin_headers, category_id, name="Desk Lamp", sku="LAMP-1",
+            description="Warm LED light with dimmer")
+    _create(client, admin_headers, category_id, name="Office Chair", sku="CHAIR-1")
+    r = client.get("/api/v1/products?q=dimm")
+    names = [p["name"] for p in r.get_json()["data"]["products"]]
+    assert names == ["Desk Lamp"]
+
+
+def test_search_ranks_name_hits_first_and_keeps_filters(client, admin_headers, category_id):
+    _create(client, admin_headers, category_id, name="Cable organiser", sku="ORG-1",
+            description="Keeps every headphone cable and charger cable tidy", price=3.0)
+    _create(client, admin_headers, category_id, name="Studio Headphone Headphone", sku="HP-1",
+            description="Closed-back headphone", price=80.0)
+    r = client.get("/api/v1/products?q=headphone")
+    names = [p["name"] for p in r.get_json()["data"]["products"]]
+    assert names[0] == "Studio Headphone Headphone"
+    assert len(names) == 2
+
+    r = client.get("/api/v1/products?q=headphone&max_price=10")
+    data = r.get_json()["data"]
+    assert [p["name"] for p in data["products"]] == ["Cable organiser"]
+    assert data["total"] == 1
+
+
+def test_search_index_follows_update_and_delete(client, admin_headers, category_id):
+    pid = _create(client, admin_headers, category_id, name="Red Kettle", sku="KET-1")
+    client.put(f"/api/v1/products/{pid}", json={"name": "Green Kettle"}, headers=admin_headers)
+    assert client.get("/api/v1/products?q=red").get_json()["data"]["total"] == 0
+    assert client.get("/api/v1/products?q=green").get_json()["data"]["total"] == 1
+
+    client.delete(f"/api/v1/products/{pid}", headers=admin_headers)
+    assert client.get("/api/v1/products?q=kettle").get_json()["data"]["total"] == 0
+
+
+def test_list_products_cursor_pagination(client, admin_headers, category_id):
+    ids = [
+        _create(client, admin_headers, category_id, name=f"Item {i}", sku=f"CUR-{i}")
+        for i in range(5)
+    ]
+    seen, cursor = [], ""
+    while True:
+        data = client.get(f"/api/v1/products?per_page=2&cursor={cursor}").get_json()["data"]
+        assert data["total"] is None
+        seen += [p["id"] for p in data["products"]]
+        if not data["has_next"]:
+            assert data["next_cursor"] is None
+            break
+        cursor = data["next_cursor"]
+    assert seen == list(reversed(ids))
+
+
+def test_list_products_cursor_mode_not_served_from_offset_cache(client, admin_headers, category_id):
+    for i in range(3):
+        _create(client, admin_headers, category_id, name=f"Item {i}", sku=f"MODE-{i}")
+    offset = client.get("/api/v1/products?per_page=2&include_total=false").get_json()["data"]
+    assert offset["page"] == 1 and "next_cursor" not in offset
+    keyset = client.get("/api/v1/products?per_page=2&cursor=").get_json()["data"]
+    assert keyset["next_cursor"] and keyset["total"] is None
+
+
+def test_list_products_cursor_per_page_zero(client, admin_headers, category_id):
+    _create(client, admin_headers, category_id, name="Only", sku="ZERO-1")
+    r = client.get("/api/v1/products?cursor=&per_page=0")
+    assert r.status_code == 200
+    assert len(r.get_json()["data"]["products"]) == 1
+
+
+def test_list_products_invalid_cursor(client):
+    r = client.get("/api/v1/products?cursor=not-a-cursor")
+    assert r.status_code == 400
+
+
+def test_listing_cache_keeps_cursor_and_sort_verbatim(client, admin_headers, category_id):
+    for i in range(3):
+        _create(client, admin_headers, category_id, name=f"Item {i}", sku=f"CASE-{i}")
+    cursor = client.get("/api/v1/products?per_page=1&cursor=").get_json()["data"]["next_cursor"]
+    page = client.get(f"/api/v1/products?per_page=1&cursor={cursor}")
+    assert page.status_code == 200
+    swapped = client.get(f"/api/v1/products?per_page=1&cursor={cursor.swapcase()}")
+    assert swapped.status_code == 400 or swapped.get_json()["data"] != page.get_json()["data"]
+
+    assert client.get("/api/v1/products?sort=price_asc").status_code == 200
+    assert client.get("/api/v1/products?sort=PRICE_ASC").status_code == 400
+
+
+def test_list_products_without_total(client, admin_headers, category_id):
+    for i in range(3):
+        _create(client, admin_headers, category_id, name=f"NoCount {i}", sku=f"NC-{i}")
+    data = client.get("/api/v1/products?per_page=2&include_total=false").get_json()["data"]
+    assert data["total"] is None
+    assert data["has_next"] is True
+    assert len(data["products"]) == 2
+
+
+def test_list_products_with_facets(client, admin_headers, category_id):
+    other = client.post(
+        "/api/v1/categories", json={"name": "OtherCategory"}, headers=admin_headers
+    ).get_json()["data"]["id"]
+    _create(client, admin_headers, category_id, name="Cheap Mug", sku="F-1", price=10, stock=3)
+    _create(client, admin_headers, category_id, name="Fancy Mug", sku="F-2", price=60, stock=0)
+    _create(client, admin_headers, other, name="Mug Rack", sku="F-3", price=300, stock=1)
+
+    data = client.get("/api/v1/products?q=mug&facets=true").get_json()["data"]
+    facets = data["facets"]
+    assert facets["categories"][0] == {"id": category_id, "name": "TestCategory", "count": 2}
+    assert {c["id"]: c["count"] for c in facets["categories"]} == {category_id: 2, other: 1}
+    assert [b["count"] for b in facets["price"]] == [1, 0, 1, 0, 1]
+    assert facets["price"][-1]["max"] is None
+    assert facets["availability"] == {"in_stock": 2, "out_of_stock": 1}
+
+    narrowed = client.get("/api/v1/products?q=mug&in_stock_only=true&facets=true").get_json()
+    assert narrowed["data"]["facets"]["availability"] == {"in_stock": 2, "out_of_stock": 0}
+    assert "facets" not in client.get("/api/v1/products").get_json()["data"]
+
+
+def test_list_products_etag_and_not_modified(client, admin_headers, category_id):
+    _create(client, admin_headers, category_id, name="Lamp", sku="ETG-1")
+    r = client.get("/api/v1/products?q=lamp")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    r = client.get("/api/v1/products?q=%20LAMP%20", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.data == b""
+
+
+def test_list_products_gzip_keeps_conditional_get(client, admin_headers, category_id):
+    for i in range(10):
+        _create(client, admin_headers, category_id, name=f"Lamp {i}", sku=f"GZ-{i}")
+    r = client.get("/api/v1/products", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    etag = r.headers["ETag"]
+    assert etag.startswith("W/")
+    r = client.get("/api/v1/products", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert r.status_code == 304
+
+
+def test_list_products_expand_uses_constant_queries(client, admin_headers, category_id, count_queries):
+    def add(n):
+        for i in range(n):
+            pid = _create(client, admin_headers, category_id, name=f"Exp {i}", sku=f"EXP-{n}-{i}")
+            for j in range(2):
+                client.post(f"/api/v1/products/{pid}/images", json={"url": f"/img/{pid}-{j}.png", "sort_order": j},
+                            headers=admin_headers)
+
+    def listing():
+        with count_queries() as queries:
+            r = client.get("/api/v1/products?expand=images,category&include_total=false")
+        return r.get_json()["data"]["products"], len(queries)
+
+    add(2)
+    products, few = listing()
+    assert len(products) == 2
+    add(6)  # writes invalidate the cached page
+    products, many = listing()
+    assert len(products) == 8 and many == few
+    assert [img["sort_order"] for img in products[0]["images"]] == [0, 1]
+    assert products[0]["category"]["id"] == category_id
+    assert client.get("/api/v1/products?expand=reviews").status_code == 400
+
+
+def test_list_products_cache_invalidated_by_writes(client, admin_headers, category_id):
+    pid = _create(client, admin_headers, category_id, name="Lamp", sku="ETG-1")
+    etag = client.get("/api/v1/products").headers["ETag"]
+    client.put(f"/api/v1/products/{pid}", json={"name": "Desk Lamp"}, headers=admin_headers)
+    r = client.get("/api/v1/products", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.get_json()["data"]["products"][0]["name"] == "Desk Lamp"
+    assert r.headers["ETag"] != etag
+
+
+def test_list_products_estimated_total(client, admin_headers, category_id):
+    _create(client, admin_headers, category_id, name="Lamp", sku="EST-1")
+    data = client.get("/api/v1/products?include_total=estimate").get_json()["data"]
+    assert (data["total"], data["total_is_estimate"]) == (1, False)
+    _create(client, admin_headers, category_id, name="Desk", sku="EST-2")
+    # Same filter signature within COUNT_CACHE_TTL: count reused, flagged as an estimate
+    data = client.get("/api/v1/products?include_total=estimate").get_json()["data"]
+    assert (data["total"], data["total_is_estimate"]) == (1, True)
+    assert len(data["products"]) == 2
+    data = client.get("/api/v1/products").get_json()["data"]
+    assert (data["total"], data["total_is_estimate"]) == (2, False)
+
+
+def test_batch_products_preserves_order_and_reports_missing(client, admin_headers, category_id):
+    a = _create(client, admin_headers, category_id, name="A", sku="BAT-A")
+    b = _create(client, admin_headers, category_id, name="B", sku="BAT-B")
+    c = _create(client, admin_headers, category_id, name="C", sku="BAT-C")
+    r = client.post(
+        "/api/v1/products/batch",
+        json={"ids": [c, 9999, a, c], "skus": ["BAT-B", "BAT-A", "NOPE"]},
+    )
+    assert r.status_code == 200
+    data = r.get_json()["data"]
+    assert [p["id"] for p in data["products"]] == [c, a, b]
+    assert data["missing"] == {"ids": [9999], "skus": ["NOPE"]}
+
+
+def test_batch_products_limits(client):
+    assert client.post("/api/v1/products/batch", json={}).status_code == 400
+    r = client.post("/api/v1/products/batch", json={"ids": list(range(1, 202))})
+    assert r.status_code == 400
+
+
+def test_suggest_by_prefix_ranked_by_sales(client, admin_headers, customer_headers, category_id):
+    lamp = _create(client, admin_headers, category_id, name="Desk Lamp", sku="LMP-1")
+    light = _create(client, admin_headers, category_id, name="Desk Light", sku="LMP-2")
+    _create(client, admin_headers, category_id, name="Chair", sku="CHR-1")
+    r = client.get("/api/v1/products/suggest?prefix=de")
+    assert [s["id"] for s in r.get_json()["data"]["suggestions"]] == [lamp, light]
+
+    client.post("/api/v1/cart/items", json={"product_id": light, "quantity": 1}, headers=customer_headers)
+    client.post("/api/v1/orders", headers=customer_headers)
+    r = client.get("/api/v1/products/suggest?prefix=DESK%20L")
+    assert [s["id"] for s in r.get_json()["data"]["suggestions"]] == [light, lamp]
+    r = client.get("/api/v1/products/suggest?prefix=chr")
+    assert [s["sku"] for s in r.get_json()["data"]["suggestions"]] == ["CHR-1"]
+
+    client.put(f"/api/v1/products/{light}", json={"is_active": False}, headers=admin_headers)
+    r = client.get("/api/v1/products/suggest?prefix=desk")
+    assert [s["id"] for s in r.get_json()["data"]["suggestions"]] == [lamp]
+
+
+def test_suggest_index_refreshed_after_ttl(app, client, admin_headers, category_id):
+    from database import db
+    from models import Product
+
+    _create(client, admin_headers, category_id, name="Desk Lamp", sku="TTL-1")
+    assert len(client.get("/api/v1/products/suggest?prefix=desk").get_json()["data"]["suggestions"]) == 1
+    # written by "another worker": not in this process's index until it is rebuilt
+    db.session.add(Product(name="Desk Fan", price=5, stock=1, sku="TTL-2", category_id=category_id))
+    db.session.commit()
+    app.config["SUGGEST_INDEX_TTL"] = -1
+    r = client.get("/api/v1/products/suggest?prefix=desk")
+    assert {s["sku"] for s in r.get_json()["data"]["suggestions"]} == {"TTL-1", "TTL-2"}
+
+
+def test_suggest_rebuild_replays_only_writes_after_snapshot(app, client, admin_headers, category_id, monkeypatch):
+    from services import suggest_index
+
+    lamp = _create(client, admin_headers, category_id, name="Desk Lamp", sku="RPL-1")
+    light = _create(client, admin_headers, category_id, name="Desk Light", sku="RPL-2")
+    client.get("/api/v1/products/suggest?prefix=de")
+    snapshot, from_rows = suggest_index._snapshot, suggest_index.PrefixIndex.from_rows
+
+    def snapshot_with_sale():
+        # a sale committed before the read (so in sold_count) but recorded while it runs
+        rows = [(pid, name, sku, sold + 5 if pid == lamp else sold) for pid, name, sku, sold in snapshot()]
+        suggest_index.record_sales([(lamp, 5)])
+        return rows
+
+    def from_rows_with_sale(rows):
+        suggest_index.record_sales([(light, 7)])  # after the snapshot: must be replayed
+        return from_rows(rows)
+
+    monkeypatch.setattr(suggest_index, "_snapshot", snapshot_with_sale)
+    monkeypatch.setattr(suggest_index.PrefixIndex, "from_rows", staticmethod(from_rows_with_sale))
+    suggest_index.reset()
+    index = app.extensions["suggest_index"]
+    assert (index._popularity.get(lamp), index._popularity.get(light)) == (5, 7)
+
+
+def test_fuzzy_search_tolerates_typos(client, admin_headers, category_id):
+    _create(client, admin_headers, category_id, name="Wireless Headphones", sku="FZ-1")
+    _create(client, admin_headers, category_id, name="Headphone Stand", sku="FZ-2")
+    _create(client, admin_headers, category_id, name="Desk Lamp", sku="FZ-3")
+    r = client.get("/api/v1/products?q=hedphones")
+    assert r.get_json()["data"]["products"] == []
+    r = client.get("/api/v1/products?q=hedphones&fuzzy=true")
+    names = [p["name"] for p in r.get_json()["data"]["products"]]
+    assert names == ["Wireless Headphones", "Headphone Stand"]
+
+
+def test_fuzzy_search_ranks_by_normalized_similarity(client, admin_headers, category_id):
+    # both names contain every trigram of the query; the shorter one is more similar
+    _create(client, admin_headers, category_id, name="Lamp Shade Replacement Kit", sku="FZN-1")
+    _create(client, admin_headers, category_id, name="Lamp", sku="FZN-2")
+    _create(client, admin_headers, category_id, name="Lamp Shade", sku="FZN-3")
+    _create(client, admin_headers, category_id, name="Lamp Shade", sku="FZN-4")
+    r = client.get("/api/v1/products?q=lamp&fuzzy=true")
+    skus = [p["sku"] for p in r.get_json()["data"]["products"]]
+    assert skus == ["FZN-2", "FZN-3", "FZN-4"]  # the long name falls below the threshold
+
+
+def test_list_products_sort_options(client, admin_headers, customer_headers, category_id):
+    cheap = _create(client, admin_headers, category_id, name="Cheap", sku="SRT-1", price=1)
+    mid = _create(client, admin_headers, category_id, name="Mid", sku="SRT-2", price=10)
+    dear = _create(client, admin_headers, category_id, name="Dear", sku="SRT-3", price=100)
+
+    def ids(sort):
+        r = client.get(f"/api/v1/products?sort={sort}")
+        assert r.status_code == 200
+        return [p["id"] for p in r.get_json()["data"]["products"]]
+
+    assert ids("price_asc") == [cheap, mid, dear]
+    assert ids("price_desc") == [dear, mid, cheap]
+    assert ids("newest") == [dear, mid, cheap]
+    client.post("/api/v1/cart/items", json={"product_id": mid, "quantity": 2}, headers=customer_headers)
+    client.post("/api/v1/orders", headers=customer_headers)
+    assert ids("popularity")[0] == mid
+    assert client.get("/api/v1/products?sort=bogus").status_code == 400
+    assert client.get("/api/v1/products?sort=price_asc&cursor=").status_code == 400
+
+
+def test_import_products_csv_and_ndjson(client, admin_headers, customer_headers, category_id):
+    import io
+
+    csv_body = (
+        "name,description,price,stock,sku,category_id\n"
+        f"Lamp,Desk lamp,9.99,5,IMP-1,{category_id}\n"
+        f"Chair,,49,,IMP-2,{category_id}\n"
+        f"Broken,,-1,1,IMP-3,{category_id}\n"
+        "Orphan,,5,1,IMP-4,9999\n"
+    )
+    r = client.post(
+        "/api/v1/products/import",
+        data={"file": (io.BytesIO(csv_body.encode()), "catalog.csv")},
+        headers=customer_headers,
+    )
+    assert r.status_code == 403
+    r = client.post(
+        "/api/v1/products/import",
+        data={"file": (io.BytesIO(csv_body.encode()), "catalog.csv")},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200
+    report = r.get_json()["data"]
+    assert (report["processed"], report["created"], report["updated"], report["failed"]) == (4, 2, 0, 2)
+    assert [(e["row"], e["sku"], e["errors"][0]["field"]) for e in report["errors"]] == [
+        (3, "IMP-3", "price"),
+        (4, "IMP-4", "category_id"),
+    ]
+
+    ndjson_body = (
+        f'{{"name": "Desk Lamp", "price": 12.5, "sku": "IMP-1", "category_id": {category_id}}}\n'
+        "not json\n"
+    )
+    r = client.post(
+        "/api/v1/products/import?format=ndjson",
+        data=ndjson_body,
+        content_type="application/x-ndjson",
+        headers=admin_headers,
+    )
+    report = r.get_json()["data"]
+    assert (report["created"], report["updated"], report["failed"]) == (0, 1, 1)
+    products = client.get("/api/v1/products?q=lamp").get_json()["data"]["products"]
+    assert [(p["sku"], p["name"], p["price"]) for p in products] == [("IMP-1", "Desk Lamp", "12.50")]
+
+
+def test_import_partial_row_keeps_omitted_columns(client, admin_headers, category_id):
+    import io
+
+    pid = _create(client, admin_headers, category_id, name="Lamp", sku="IMP-P", stock=40,
+                  description="Warm light", is_active=False)
+    csv_body = f"name,price,sku,category_id\nLamp v2,11,IMP-P,{category_id}\n"
+    r = client.post(
+        "/api/v1/products/import",
+        data={"file": (io.BytesIO(csv_body.encode()), "catalog.csv")},
+        headers=admin_headers,
+    )
+    assert r.get_json()["data"]["updated"] == 1
+    p = client.get(f"/api/v1/products/{pid}").get_json()["data"]
+    assert (p["name"], p["price"], p["stock"], p["description"], p["is_active"]) == (
+        "Lamp v2", "11.00", 40, "Warm light", False,
+    )
+
+
+def test_export_products_streams_filtered_catalog(client, admin_headers, customer_headers, category_id):
+    import csv
+    import io
+    import json
+
+    other = client.post("/api/v1/categories", json={"name": "Other"}, headers=admin_headers).get_json()["data"]["id"]
+    a = _create(client, admin_headers, category_id, name="Lamp", sku="EXP-1", price=9.5)
+    _create(client, admin_headers, other, name="Chair", sku="EXP-2")
+    assert client.get("/api/v1/products/export", headers=customer_headers).status_code == 403
+
+    r = client.get(f"/api/v1/products/export?category_id={category_id}", headers=admin_headers)
+    assert r.status_code == 200 and r.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+    assert [(row["id"], row["sku"], row["price"]) for row in rows] == [(a, "EXP-1", "9.50")]
+
+    r = client.get("/api/v1/products/export?format=csv", headers=admin_headers)
+    assert [row["sku"] for row in csv.DictReader(io.StringIO(r.get_data(as_text=True)))] == ["EXP-1", "EXP-2"]
+    r = client.get("/api/v1/products/export?updated_since=2999-01-01T00:00:00", headers=admin_headers)
+    assert r.get_data() == b""
+    assert client.get("/api/v1/products/export?updated_since=soon", headers=admin_headers).status_code == 400
+    assert client.get("/api/v1/products/export?format=xml", headers=admin_headers).status_code == 400
+
+
+def test_export_updated_since_with_offset_is_utc(client, admin_headers, category_id):
+    from datetime import datetime, timedelta, timezone
+    from urllib.parse import quote
+    from services.export_service import parse_since
+
+    assert parse_since("2026-10-17T12:00:00+02:00") == datetime(2026, 10, 17, 10, 0)
+    assert parse_since("2026-10-17T12:00:00Z") == datetime(2026, 10, 17, 12, 0)
+    _create(client, admin_headers, category_id, name="Lamp", sku="TZ-1")
+    plus_two = timezone(timedelta(hours=2))
+    # 30 minutes ago, written in +02:00 (wall clock 1h30 ahead of UTC)
+    since = (datetime.now(timezone.utc) - timedelta(minutes=30)).astimezone(plus_two).isoformat()
+    r = client.get(f"/api/v1/products/export?updated_since={quote(since)}", headers=admin_headers)
+    assert r.status_code == 200 and b"TZ-1" in r.get_data()
+    since = (datetime.now(timezone.utc) + timedelta(minutes=30)).astimezone(plus_two).isoformat()
+    r = client.get(f"/api/v1/products/export?updated_since={quote(since)}", headers=admin_headers)
+    assert r.get_data() == b""
+
+
+def test_bulk_update_products(client, admin_headers, customer_headers, category_id):
+    a = _create(client, admin_headers, category_id, name="A", sku="BLK-A", price=10, stock=1)
+    b = _create(client, admin_headers, category_id, name="B", sku="BLK-B", price=20, stock=2)
+    items = [
+        {"id": a, "price": 11.5},
+        {"sku": "BLK-B", "stock": 0, "is_active": False},
+        {"sku": "NOPE", "stock": 1},
+        {"id": a, "sku": "BLK-A", "stock": 1},
+        {"id": b, "price": -1},
+        {"id": b},
+        {"id": b, "price": None, "stock": 5},
+    ]
+    assert client.patch("/api/v1/products", json={"items": items}, headers=customer_headers).status_code == 403
+    r = client.patch("/api/v1/products", json={"items": items}, headers=admin_headers)
+    assert r.status_code == 200
+    data = r.get_json()["data"]
+    assert (data["updated"], data["failed"]) == (2, 5)
+    assert [(x["id"], x["status"]) for x in data["results"]] == [
+        (a, "updated"), (b, "updated"), (None, "not_found"),
+        (a, "invalid"), (None, "invalid"), (b, "invalid"), (b, "invalid"),
+    ]
+    assert data["results"][4]["errors"][0]["field"] == "price"
+    assert data["results"][6]["errors"] == [{"field": "price", "message": "May not be null"}]
+
+    pa = client.get(f"/api/v1/products/{a}").get_json()["data"]
+    pb = client.get(f"/api/v1/products/{b}").get_json()["data"]
+    assert (pa["price"], pa["stock"]) == ("11.50", 1)
+    assert (pb["price"], pb["stock"], pb["is_active"]) == ("20.00", 0, False)
+    assert client.patch("/api/v1/products", json={"items": []}, headers=admin_headers).status_code == 400
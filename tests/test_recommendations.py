@@ -0,0 +1,108 @@
+"""Recommendation tests: frequently bought together (rebuild, refresh) and similar products."""
+
+import pytest
+
+
+@pytest.fixture
+def products(client, admin_headers):
+    """Create a category and four products; return their ids."""
+    cat_r = client.post("/api/v1/categories", json={"name": "RecCat"}, headers=admin_headers)
+    cat_id = cat_r.get_json()["data"]["id"]
+    ids = []
+    for i in range(4):
+        r = client.post(
+            "/api/v1/products",
+            json={"name": f"Rec{i}", "price": 1.0, "stock": 50, "sku": f"REC-{i}", "category_id": cat_id},
+            headers=admin_headers,
+        )
+        ids.append(r.get_json()["data"]["id"])
+    return ids
+
+
+def _order(client, headers, product_ids):
+    for pid in product_ids:
+        client.post("/api/v1/cart/items", json={"product_id": pid, "quantity": 1}, headers=headers)
+    assert client.post("/api/v1/orders", headers=headers).status_code == 201
+
+
+def _recommended(client, product_id):
+    r = client.get(f"/api/v1/products/{product_id}/recommendations")
+    assert r.status_code == 200
+    return [(p["id"], p["score"]) for p in r.get_json()["data"]["recommendations"]]
+
+
+def test_recommendations_rebuild_and_refresh(app, client, customer_headers, products):
+    from services import recommendation_service
+
+    a, b, c, d = products
+    _order(client, customer_headers, [a, b])
+    _order(client, customer_headers, [a, b, c])
+    with app.app_context():
+        assert recommendation_service.rebuild() == 6  # (a,b) (a,c) (b,c), both directions
+    assert _recommended(client, a) == [(b, 2), (c, 1)]
+    assert _recommended(client, d) == []
+
+    _order(client, customer_headers, [a, c])
+    _order(client, customer_headers, [a, c, d])
+    with app.app_context():
+        assert recommendation_service.refresh() == 2
+        assert recommendation_service.refresh() == 0
+    assert _recommended(client, a) == [(c, 3), (b, 2), (d, 1)]
+    assert _recommended(client, d) == [(a, 1), (c, 1)]
+
+
+def test_recommendations_refresh_counts_orders_committed_out_of_id_order(app, client, customer_headers, products):
+    from database import db
+    from models import Order, OrderItem
+    from services import recommendation_service
+
+    a, b, c, d = products
+    _order(client, customer_headers, [c, d])
+    with app.app_context():
+        recommendation_service.refresh()
+        # an order holding a lower id than one already counted, committed only now
+        user_id = db.session.get(Order, 1).user_id
+        late = Order(id=0, user_id=user_id, status="pending", total=2)
+        late.order_items = [OrderItem(product_id=a, quantity=1, price=1), OrderItem(product_id=b, quantity=1, price=1)]
+        db.session.add(late)
+        db.session.commit()
+        assert recommendation_service.refresh() == 1
+    assert _recommended(client, a) == [(b, 1)]
+
+
+def test_recommendations_unknown_product(client):
+    assert client.get("/api/v1/products/9999/recommendations").status_code == 404
+
+
+def test_similar_products_follow_text_updates(app, client, admin_headers):
+    cat_id = client.post("/api/v1/categories", json={"name": "SimCat"}, headers=admin_headers).get_json()["data"]["id"]
+
+    def create(name, description, sku):
+        r = client.post(
+            "/api/v1/products",
+            json={"name": name, "description": description, "price": 5, "sku": sku, "category_id": cat_id},
+            headers=admin_headers,
+        )
+        return r.get_json()["data"]["id"]
+
+    def similar(pid):
+        r = client.get(f"/api/v1/products/{pid}/similar")
+        assert r.status_code == 200
+        return [p["id"] for p in r.get_json()["data"]["similar"]]
+
+    a = create("Noise cancelling headphones", "Wireless over-ear headphones", "SIM-1")
+    b = create("Wireless earbuds", "Compact wireless earbuds with case", "SIM-2")
+    c = create("Studio headphones", "Wired over-ear studio headphones", "SIM-3")
+    d = create("Coffee mug", "Ceramic mug", "SIM-4")
+    with app.app_context():
+        from services import similarity_service
+        similarity_service.rebuild()
+    assert similar(a) == [c, b]
+    assert similar(d) == []
+
+    # Changing the text recomputes the product and those listing it
+    client.put(f"/api/v1/products/{c}", json={"name": "Espresso mug", "description": "Ceramic espresso mug"},
+               headers=admin_headers)
+    assert similar(c) == [d]
+    assert similar(a) == [b]
+    assert client.get("/api/v1/products/9999/similar").status_code == 404
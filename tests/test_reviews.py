@@ -81,3 +81,43 @@ def test_list_reviews_after_create(client, customer_headers, admin_headers, prod
     assert r.status_code == 200
     reviews = r.get_json()["data"]["reviews"]
     assert len(reviews) >= 1
+
+
+def _purchase_and_review(client, headers, product_id, rating):
+    client.post("/api/v1/cart/items", json={"product_id": product_id, "quantity": 1}, headers=headers)
+    client.post("/api/v1/orders", headers=headers)
+    r = client.post(
+        f"/api/v1/products/{product_id}/reviews", json={"rating": rating}, headers=headers
+    )
+    assert r.status_code == 201
+    return r.get_json()["data"]["id"]
+
+
+def test_review_updates_product_rating_aggregates(client, customer_headers, product_for_review):
+    review_id = _purchase_and_review(client, customer_headers, product_for_review, 4)
+    product = client.get(f"/api/v1/products/{product_for_review}").get_json()["data"]
+    assert product["rating_count"] == 1
+    assert product["rating_avg"] == 4.0
+
+    assert client.get("/api/v1/products?min_rating=4").get_json()["data"]["total"] == 1
+    assert client.get("/api/v1/products?min_rating=4.5").get_json()["data"]["total"] == 0
+
+    client.delete(f"/api/v1/products/{product_for_review}/reviews/{review_id}", headers=customer_headers)
+    product = client.get(f"/api/v1/products/{product_for_review}").get_json()["data"]
+    assert product["rating_count"] == 0
+    assert product["rating_avg"] is None
+
+
+def test_recompute_rating_aggregates(app, client, customer_headers, product_for_review):
+    from database import db
+    from models import Product
+    from services import review_service
+
+    _purchase_and_review(client, customer_headers, product_for_review, 3)
+    with app.app_context():
+        db.session.query(Product).update({"rating_sum": 0, "rating_count": 0, "rating_avg": None})
+        db.session.commit()
+        assert review_service.recompute_rating_aggregates() == 1
+        p = db.session.get(Product, product_for_review)
+        assert (p.rating_sum, p.rating_count, p.rating_avg) == (3, 1, 3.0)
+        assert p.rating_histogram == {1: 0, 2: 0, 3: 1, 4: 0, 5: 0}
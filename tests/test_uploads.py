@@ -0,0 +1,113 @@
+"""Tests for serving uploaded files under /uploads."""
+
+import hashlib
+import io
+
+import pytest
+
+from database import db
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return tmp_path
+
+
+def test_serve_upload_conditional_and_range(client, upload_dir):
+    (upload_dir / "product_1_a.png").write_bytes(b"0123456789")
+    r = client.get("/uploads/product_1_a.png")
+    assert r.status_code == 200
+    assert r.data == b"0123456789"
+    assert r.headers["Accept-Ranges"] == "bytes"
+    assert r.headers["Last-Modified"]
+    assert "no-cache" in r.headers["Cache-Control"]
+    etag = r.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    assert client.get("/uploads/product_1_a.png", headers={"If-None-Match": etag}).status_code == 304
+    r = client.get("/uploads/product_1_a.png", headers={"Range": "bytes=2-5"})
+    assert r.status_code == 206
+    assert r.data == b"2345"
+    assert r.headers["Content-Range"] == "bytes 2-5/10"
+
+
+def test_serve_upload_immutable_name(client, upload_dir):
+    name = "0123456789abcdef0123456789abcdef.jpg"
+    (upload_dir / name).write_bytes(b"img")
+    r = client.get(f"/uploads/{name}")
+    assert r.status_code == 200
+    assert r.headers["ETag"] == '"0123456789abcdef0123456789abcdef"'
+    cc = r.headers["Cache-Control"]
+    assert "immutable" in cc and "max-age=31536000" in cc
+
+
+def test_serve_upload_missing_or_outside(client, upload_dir):
+    assert client.get("/uploads/nope.png").status_code == 404
+    assert client.get("/uploads/../conftest.py").status_code == 404
+
+
+def _product(client, admin_headers, sku):
+    cat = client.post("/api/v1/categories", json={"name": f"Pics {sku}"}, headers=admin_headers).get_json()["data"]
+    return client.post(
+        "/api/v1/products",
+        json={"name": "P", "price": 1, "stock": 1, "sku": sku, "category_id": cat["id"]},
+        headers=admin_headers,
+    ).get_json()["data"]["id"]
+
+
+def _upload(client, admin_headers, product_id, data, filename):
+    return client.post(
+        f"/api/v1/products/{product_id}/images",
+        data={"file": (io.BytesIO(data), filename)},
+        headers=admin_headers,
+        content_type="multipart/form-data",
+    )
+
+
+def test_uploaded_image_is_content_addressed(client, admin_headers, upload_dir):
+    a = _product(client, admin_headers, "UP-1")
+    b = _product(client, admin_headers, "UP-2")
+    r = _upload(client, admin_headers, a, b"\x89PNG data", "shot.png")
+    assert r.status_code == 201
+    url = r.get_json()["data"]["url"]
+    digest = hashlib.sha256(b"\x89PNG data").hexdigest()
+    assert url == f"/uploads/{digest[:2]}/{digest}.png"
+    served = client.get(url)
+    assert served.data == b"\x89PNG data"
+    assert "immutable" in served.headers["Cache-Control"]
+
+    # same bytes under another name and product: stored once, two references
+    assert _upload(client, admin_headers, b, b"\x89PNG data", "other.png").get_json()["data"]["url"] == url
+    stored = upload_dir / digest[:2] / f"{digest}.png"
+    assert [p.name for p in upload_dir.rglob("*") if p.is_file()] == [stored.name]
+    with client.application.app_context():
+        from models import StoredImage
+        assert db.session.get(StoredImage, digest).ref_count == 2
+
+    assert client.delete(f"/api/v1/products/{a}", headers=admin_headers).status_code == 204
+    assert stored.exists()
+    assert client.delete(f"/api/v1/products/{b}", headers=admin_headers).status_code == 204
+    assert not stored.exists()
+    with client.application.app_context():
+        assert db.session.get(StoredImage, digest) is None
+
+
+def test_purge_keeps_file_re_referenced_after_release(client, upload_dir):
+    from models import StoredImage
+    from services import image_store
+
+    data = b"\x89PNG shared"
+    digest = hashlib.sha256(data).hexdigest()
+    with client.application.app_context():
+        image_store.store(io.BytesIO(data), "png")
+        db.session.commit()
+        unreferenced = image_store.release([digest])
+        db.session.commit()
+        assert unreferenced == [digest]
+        # a concurrent upload of the same bytes lands between release and purge
+        image_store.store(io.BytesIO(data), "png")
+        db.session.commit()
+        image_store.purge(unreferenced)
+        assert db.session.get(StoredImage, digest).ref_count == 1
+    assert (upload_dir / digest[:2] / f"{digest}.png").exists()
@@ -0,0 +1,27 @@
+"""Unit tests for utils.cache: TTL/LRU behaviour and filter signatures."""
+
+from utils.cache import TTLCache, filter_signature
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now most recent
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache(maxsize=2, ttl=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.get_or_set("a", lambda: 5) == 5
+
+
+def test_filter_signature_normalizes():
+    assert filter_signature(q=" Blue  Mug", min_price=5, in_stock_only=False) == filter_signature(
+        q="blue mug", min_price=5.0, category_id=None
+    )
+    assert filter_signature(min_price=0) != filter_signature()
@@ -0,0 +1,70 @@
+"""Unit tests for middleware.compression.CompressionMiddleware."""
+
+import gzip
+
+from flask import Flask, Response, stream_with_context
+from werkzeug.test import Client
+
+from middleware.compression import CompressionMiddleware, _accepted
+
+BIG = {"items": ["x" * 50] * 100}
+
+
+def _client():
+    app = Flask(__name__)
+
+    @app.route("/json")
+    def big_json():
+        resp = app.json.response(BIG)
+        resp.set_etag("abc")
+        return resp
+
+    @app.route("/small")
+    def small():
+        return {"ok": True}
+
+    @app.route("/png")
+    def png():
+        return Response(b"\x89PNG" * 1000, mimetype="image/png")
+
+    @app.route("/stream")
+    def stream():
+        def gen():
+            for i in range(3):
+                yield f'{{"row":{i}}}\n' * 200
+        return Response(stream_with_context(gen()), mimetype="application/x-ndjson")
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=500)
+    return Client(app)
+
+
+def test_accept_encoding_parsing():
+    assert _accepted("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+
+def test_compresses_large_json_and_weakens_etag():
+    r = _client().get("/json", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert r.headers["ETag"] == 'W/"abc"'
+    raw = r.get_data()
+    assert int(r.headers["Content-Length"]) == len(raw)
+    assert b'"items"' in gzip.decompress(raw)
+
+
+def test_skips_small_uncompressible_and_unaccepted():
+    c = _client()
+    r = c.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in r.headers and r.headers["Vary"] == "Accept-Encoding"
+    r = c.get("/png", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in r.headers and "Vary" not in r.headers
+    r = c.get("/json", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in r.headers and r.headers["ETag"] == '"abc"'
+
+
+def test_streams_without_content_length():
+    r = _client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in r.headers
+    lines = gzip.decompress(r.get_data()).decode().splitlines()
+    assert len(lines) == 600 and lines[-1] == '{"row":2}'
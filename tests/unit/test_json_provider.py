@@ -0,0 +1,22 @@
+"""Unit tests for utils.json_provider.FastJSONProvider."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Flask
+
+from utils.json_provider import FastJSONProvider
+
+
+def test_fast_json_provider_encodes_decimal_and_datetime():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    obj = {"price": Decimal("19.90"), "at": datetime(2026, 10, 17, 12, 30, 5), "on": date(2026, 1, 2), 3: [1]}
+    assert app.json.loads(app.json.dumps(obj)) == {
+        "price": "19.90", "at": "2026-10-17T12:30:05", "on": "2026-01-02", "3": [1],
+    }
+    with app.app_context():
+        resp = app.json.response(obj)
+    assert resp.mimetype == "application/json"
+    assert resp.get_json()["price"] == "19.90"
+    assert app.json.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
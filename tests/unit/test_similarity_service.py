@@ -0,0 +1,24 @@
+"""Unit tests for services.similarity_service TF-IDF neighbours."""
+
+from services import similarity_service
+from services.similarity_service import _matrix, _neighbours
+
+
+def test_neighbours_ranked_by_cosine_and_capped(monkeypatch):
+    monkeypatch.setattr(similarity_service, "BATCH_SIZE", 2)  # exercise several batches
+    rows = [
+        (1, "Noise cancelling headphones", "Wireless over-ear headphones"),
+        (2, "Wireless earbuds", "Compact wireless earbuds with case"),
+        (3, "Studio headphones", "Wired over-ear studio headphones"),
+        (4, "Coffee mug", "Ceramic mug"),
+        (5, "", None),
+    ]
+    ids, m = _matrix(rows)
+    result = _neighbours(ids, m, [1, 4, 5, 99])
+    by_product = {}
+    for row in result:
+        by_product.setdefault(row["product_id"], []).append(row)
+    assert [r["similar_id"] for r in by_product[1]] == [3, 2]
+    assert [r["rank"] for r in by_product[1]] == [1, 2]
+    assert by_product[1][0]["score"] > by_product[1][1]["score"] > 0
+    assert 4 not in by_product and 5 not in by_product  # nothing shared, no self match
@@ -0,0 +1,47 @@
+"""Unit tests for services.suggest_index.PrefixIndex."""
+
+from services.suggest_index import PrefixIndex
+
+
+def test_prefix_index_add_remove_and_rank():
+    index = PrefixIndex()
+    index.add(1, "Blue Shirt", "SH-1")
+    index.add(2, "Blouse", "BL-2")
+    index.add(3, "Red Shirt", "SH-3")
+    assert [p["id"] for p in index.search("bl")] == [1, 2]
+    index.bump(2, 5)
+    assert [p["id"] for p in index.search("bl")] == [2, 1]
+    assert [p["id"] for p in index.search("sh")] == [1, 3]
+    index.add(1, "Green Shirt", "SH-1")  # rename drops the old terms
+    assert [p["id"] for p in index.search("blue")] == []
+    index.remove(3)
+    assert [p["id"] for p in index.search("shirt")] == [1]
+    assert index.search("  ") == [] and len(index) == 2
+
+
+def test_prefix_index_from_rows_matches_incremental_build():
+    rows = [(1, "Blue Shirt", "SH-1", 0), (2, "Blouse", "BL-2", 5), (3, "Red Shirt", "SH-3", None)]
+    bulk = PrefixIndex.from_rows(rows)
+    incremental = PrefixIndex()
+    for pid, name, sku, sold in rows:
+        incremental.add(pid, name, sku)
+        if sold:
+            incremental.bump(pid, sold)
+    for prefix in ("bl", "sh", "shirt", "red s", "sh-3"):
+        assert bulk.search(prefix) == incremental.search(prefix)
+    assert bulk._terms == sorted(bulk._terms) and len(bulk) == 3
+
+
+def test_prefix_index_short_prefix_top_lists_track_writes():
+    index = PrefixIndex.from_rows([(i, f"Item {i}", f"SK-{i}", i % 7) for i in range(1, 60)])
+    index.add(100, "Apex", "AP-1")
+    index.bump(100, 50)
+    index.bump(6, -6)
+    index.add(13, "Zed", "ZD-13")  # rename out of the "it" bucket
+    index.remove(12)
+    for prefix in ("i", "it", "a", "s", "sk", "z"):
+        for limit in (1, 10, 20):
+            expected = [index._products[pid][0] for pid in index._scan(prefix, limit)]
+            assert index.search(prefix, limit) == expected
+    assert index.search("a", 1)[0]["id"] == 100
+    assert {p["id"] for p in index.search("it", 20)}.isdisjoint({12, 13})
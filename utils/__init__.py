@@ -1,6 +1,14 @@
-"""Utilities: security, responses."""
+"""Utilities: security, responses, pagination."""
 
 from .security import hash_password, check_password
-from .responses import success_response, error_response
+from .responses import success_response, error_response, field_errors
+from .pagination import pagination_args
 
-__all__ = ["hash_password", "check_password", "success_response", "error_response"]
+__all__ = [
+    "hash_password",
+    "check_password",
+    "success_response",
+    "error_response",
+    "field_errors",
+    "pagination_args",
+]
@@ -0,0 +1,129 @@
+"""In-process result cache: LRU-bounded, TTL-expiring, tag-invalidated, thread-safe (single process)."""
+
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable
+
+from flask import current_app
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries also expire after ``ttl`` seconds.
+
+    Entries may carry tags; ``invalidate(tag, ...)`` drops every entry with any of them.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any, frozenset]]" = OrderedDict()
+        self._tags: dict[Hashable, set] = {}
+        self._lock = Lock()
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = ()) -> None:
+        """Store ``value`` under ``tags``; evict the least recently used entry when full."""
+        tags = frozenset(tags)
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._drop(next(iter(self._data)))
+
+    def get_or_set(
+        self, key: Hashable, factory: Callable[[], Any], tags: Iterable[Hashable] = ()
+    ) -> Any:
+        """Return the cached value, computing and storing it with ``factory()`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, tags)
+        return value
+
+    def invalidate(self, *tags: Hashable) -> int:
+        """Drop every entry carrying any of ``tags``; return how many were dropped."""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def app_cache(name: str, ttl: float | None = None) -> TTLCache:
+    """Per-app named cache (stored on ``app.extensions``), sized from app config.
+
+    Uses ``CACHE_MAXSIZE`` / ``CACHE_TTL`` config values; ``ttl`` overrides the
+    latter when the cache is first created.
+    """
+    caches = current_app.extensions.setdefault("ttl_caches", {})
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches[name] = TTLCache(
+            maxsize=current_app.config.get("CACHE_MAXSIZE", 512),
+            ttl=ttl if ttl is not None else current_app.config.get("CACHE_TTL", 60),
+        )
+    return cache
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return str(Decimal(str(value)).normalize())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(_normalize(v) for v in value))
+    return value
+
+
+def filter_signature(**params: Any) -> tuple:
+    """Canonical, hashable key for a set of filter params.
+
+    Unset values (None, "", False) are dropped and strings/numbers normalized, so
+    ``q=" Blue "`` and ``q="blue"`` (or ``min_price=5`` and ``5.0``) share a key.
+    """
+    return tuple(
+        sorted(
+            (k, _normalize(v))
+            for k, v in params.items()
+            if v is not None and v is not False and v != ""
+        )
+    )
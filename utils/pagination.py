@@ -0,0 +1,25 @@
+"""Pagination query-string parsing shared by API list routes."""
+
+from typing import Any
+from flask import request
+
+# include_total / with_count value selecting a cached or planner-estimated total
+COUNT_ESTIMATE = "estimate"
+
+
+def pagination_args(default_per_page: int = 20) -> dict[str, Any]:
+    """Read page/per_page/cursor/include_total from the query string.
+
+    ``?cursor=`` (even empty) switches a listing to keyset mode; follow
+    ``next_cursor`` for subsequent pages. ``include_total`` defaults to true
+    for page-number mode and false for keyset mode; ``include_total=estimate``
+    accepts a cached or planner-estimated total (flagged ``total_is_estimate``).
+    """
+    cursor = request.args.get("cursor")
+    include_total = request.args.get("include_total", "false" if cursor is not None else "true")
+    return {
+        "page": request.args.get("page", 1, type=int),
+        "per_page": request.args.get("per_page", default_per_page, type=int),
+        "cursor": cursor.strip() if cursor is not None else None,
+        "with_count": COUNT_ESTIMATE if include_total.lower() == COUNT_ESTIMATE else include_total.lower() == "true",
+    }
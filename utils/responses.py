@@ -29,3 +29,11 @@ def error_response(
     if errors is not None:
         body["errors"] = errors
     return jsonify(body), status
+
+
+def field_errors(exc) -> list[dict]:
+    """Flatten a pydantic ValidationError into JSON-safe ``{"field", "message"}`` dicts."""
+    return [
+        {"field": ".".join(str(p) for p in err["loc"]), "message": err["msg"]}
+        for err in exc.errors()
+    ]
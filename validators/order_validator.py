@@ -1,9 +1,8 @@
 """Order business rules: cart and stock validation."""
 
-from typing import List
+from typing import Iterable, List
 
-from database import db
-from models import CartItem, Product
+from models import CartItem
 
 from validators.base_validator import BaseValidator
 
@@ -18,14 +17,21 @@ class OrderValidator(BaseValidator):
             BaseValidator._raise("Cart is empty", field="cart")
 
     @staticmethod
-    def validate_cart_stock(cart_items: List[CartItem]) -> None:
-        """Raise ValidationError if any cart item exceeds product stock."""
-        for ci in cart_items:
-            product = db.session.get(Product, ci.product_id)
-            if not product:
-                BaseValidator._raise(f"Product {ci.product_id} not found", field="product_id")
-            if product.stock < ci.quantity:
+    def validate_products_exist(missing_product_ids: Iterable[int]) -> None:
+        """Raise ValidationError if any cart line points at a product that no longer exists."""
+        for product_id in missing_product_ids:
+            BaseValidator._raise(f"Product {product_id} not found", field="product_id")
+
+    @staticmethod
+    def validate_cart_stock(lines: Iterable) -> None:
+        """Raise ValidationError if any line exceeds its product's stock.
+
+        ``lines`` have ``product_id``, ``quantity`` and ``stock``, e.g. rows of a
+        cart/products join.
+        """
+        for line in lines:
+            if line.stock < line.quantity:
                 BaseValidator._raise(
-                    f"Insufficient stock for product {ci.product_id}",
+                    f"Insufficient stock for product {line.product_id}",
                     field="stock",
                 )